@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Benchmark suite of the simulation: micro-benchmarks of the elements and of the property and friction kernels,
+end-to-end runs of the Tests/ scenarios and runs of generated networks of 10 to 10 000 elements.
+Run from the scripts folder :
+python benchmark.py --output ../benchmarks/current
+python benchmark.py --output ../benchmarks/new --baseline ../benchmarks/current
+
+The results are written inside the output folder: benchmark.json (timings, machine and versions) and
+trajectories.npz (outputs of every element of every run, the reference trajectories of a later comparison).
+With a baseline folder, the timings are compared with the baseline and the trajectories are checked for numerical
+drift; the script exits with 1 when a timing is slower than time_tolerance or a trajectory drifts more than
+drift_tolerance (values_storage.benchmark_parameters)
+
+Functions :
+time_call(function, nb_calls, repeat)
+- Best time of one call of a function [s] over repeat series of nb_calls calls
+
+micro_benchmarks(nb_calls, repeat)
+- Time update() of every element type and the kernels they use (CoolProp states, saturation table, tank
+temperature solver, Colebrook-White solver)
+
+generate_network(nb_elements, path)
+- Write a scenario file of nb_elements elements: a central tank and its output pipe (as the Tank scenario), a
+splitter feeding parallel branches of pipes, a mixer and a substation tank (about sqrt(nb_elements) / 2 branches,
+15 m of pipes in every branch)
+
+run_benchmark_scenario(path, nb_steps)
+- Load and run a scenario, returns its timings and the trajectories of its elements
+
+run_benchmarks(sizes, nb_steps, network_steps, nb_calls, repeat)
+- Run the three parts of the suite, returns the results and the trajectories
+
+compare_with_baseline(results, trajectories, baseline_path, time_tolerance, drift_tolerance)
+- Return the timing ratios and the largest relative drift of every run compared with a baseline folder (the runs
+missing from the baseline are not compared), and the list of the regressions
+
+main()
+- Command line of the suite
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+import values_storage
+
+
+# Scenarios of the end-to-end runs
+tests_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Tests')
+decks = {name: os.path.join(tests_path, name) for name in ('Tank', 'Pipeline', 'Exchanger')}
+
+# Constructor parameters of the elements of the micro-benchmarks and of the generated networks (values of Tests/)
+tank_central_parameters = {'x': 0.7, 'T': 298.15, 'V': 1.0, 'ts': 0.5}
+tank_substation_parameters = {'x': 0.7, 'T': 288.15, 'V': 1.0, 'ts': 0.5, 'Q_dot': 30000.0}
+pipe_parameters = {'L': 15.0, 'd': 0.03, 'k': 0.00001}
+inlet_parameters = {'m_dot_in': 0.5, 'p_in': 64.35, 'T_in': 10.0}
+
+
+def time_call(function, nb_calls, repeat=3):
+    best = float('inf')
+    for series in range(repeat):
+        start = time.perf_counter()
+        for call in range(nb_calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / nb_calls)
+
+    return best
+
+
+def micro_benchmarks(nb_calls=1000, repeat=3):
+    from exchanger import classExchanger
+    from fluid_properties import classFluidState
+    from friction import classFrictionSolver, colebrook_white, friction_factors
+    from mixer import classMixer
+    from pipeline import classPipes
+    from saturation_table import get_saturation_table
+    from splitter import classSplitter
+    from tank_central import classTankC
+    from tank_solver import classTankStateSolver
+    from tank_substation import classTankS
+
+    timings = {}
+
+    # Saturated vapour stream of the Tank scenario
+    fluid = classFluidState('R744')
+    T_in = 283.15  # [K]
+    p_in = fluid.TQ(T_in, 1.0, 'P')  # [Pa]
+
+    # Elements
+    pipe = classPipes(**pipe_parameters)
+    timings['classPipes.update'] = time_call(lambda: pipe.update(0.5, p_in, T_in, 1.0), nb_calls, repeat)
+
+    # Superheated gas stream of the Exchanger scenario
+    exchanger = classExchanger(1000.0)
+    timings['classExchanger.update'] = time_call(lambda: exchanger.update(0.5, 1.0e6, 287.5, -1.0), nb_calls, repeat)
+
+    splitter = classSplitter(0.5, 0.5)
+    timings['classSplitter.split'] = time_call(lambda: splitter.split(0.5, p_in, T_in, 1.0), nb_calls, repeat)
+
+    mixer = classMixer(0.0)
+    streams = [(0.25, p_in, T_in, 1.0), (0.25, p_in - 1000.0, T_in, 1.0)]
+    timings['classMixer.mix'] = time_call(lambda: mixer.mix(streams), nb_calls, repeat)
+
+    # The tanks change their state at every call: a few steps of a small network from its initial state
+    substation = classTankS(**tank_substation_parameters)
+    central = classTankC(**tank_central_parameters)
+    central.set_neighbours(pipe, substation)
+    central.set_delta_pressure(substation.p)
+    nb_tank_calls = max(nb_calls // 10, 1)
+    central_state, substation_state = central.get_state(), substation.get_state()
+
+    def reset_tanks():
+        central.set_state(central_state)
+        substation.set_state(substation_state)
+
+    timings['classTankC.update'] = time_call(lambda: central.update(0.5, p_in, T_in, 1.0), nb_tank_calls, 1)
+    reset_tanks()
+    timings['classTankS.update'] = time_call(lambda: substation.update(0.5, p_in, T_in, 1.0), nb_tank_calls, 1)
+    reset_tanks()
+
+    # Kernels
+    timings['classFluidState.TQ'] = time_call(lambda: fluid.TQ(T_in, 1.0, 'D', 'V'), nb_calls, repeat)
+    timings['classFluidState.PT'] = time_call(lambda: fluid.PT(3.0e6, T_in, 'H'), nb_calls, repeat)
+    timings['classFluidState.HP'] = time_call(lambda: fluid.HP(4.5e5, 3.0e6, 'T'), nb_calls, repeat)
+
+    saturation = get_saturation_table('R744')
+    timings['saturation_table.saturated'] = time_call(lambda: saturation.saturated(T_in), nb_calls, repeat)
+
+    solver = classTankStateSolver()
+    m, U, V = central.m, central.U, central.V
+    timings['classTankStateSolver.solve'] = time_call(lambda: solver.solve(m, U, V, central.T + 0.5), nb_calls,
+                                                      repeat)
+
+    timings['friction.colebrook_white'] = time_call(lambda: colebrook_white(1.0e5, 1.0e-5, 0.03), nb_calls, repeat)
+    friction = classFrictionSolver()
+    timings['classFrictionSolver.friction_factor'] = time_call(lambda: friction.friction_factor(1.0e5, 1.0e-5, 0.03),
+                                                               nb_calls, repeat)
+    Re = np.linspace(1.0e4, 1.0e6, 1000)
+    timings['friction.friction_factors (1000 pipes)'] = time_call(lambda: friction_factors(Re, 1.0e-5, 0.03),
+                                                                  max(nb_calls // 10, 1), repeat)
+
+    return timings
+
+
+def generate_network(nb_elements, path):
+    from scenario import scenario_version, write_scenario
+
+    nb_pipes = max(nb_elements - 5, 1)  # [-] pipes of the branches
+    nb_branches = max(int(nb_pipes ** 0.5) // 2, 1)
+
+    elements = [{'name': 'tankC_1', 'class': 'classTankC', 'parameters': dict(tank_central_parameters)},
+                {'name': 'pipe_1', 'class': 'classPipes', 'parameters': dict(pipe_parameters)},
+                {'name': 'splitter_1', 'class': 'classSplitter', 'parameters': {'fractions': [1.0] * nb_branches}}]
+    connections = [['tankC_1', 'pipe_1'], ['pipe_1', 'splitter_1']]
+
+    # Pipes shared between the branches, 15 m of pipes in every branch
+    pipe_number = 1
+    for branch in range(nb_branches):
+        nb_branch_pipes = nb_pipes // nb_branches + (1 if branch < nb_pipes % nb_branches else 0)
+        previous = 'splitter_1'
+        for pipe in range(nb_branch_pipes):
+            pipe_number += 1
+            name = f'pipe_{pipe_number}'
+            elements.append({'name': name, 'class': 'classPipes',
+                             'parameters': {**pipe_parameters, 'L': pipe_parameters['L'] / nb_branch_pipes}})
+            connections.append([previous, name])
+            previous = name
+        connections.append([previous, 'mixer_1'])
+
+    elements.append({'name': 'mixer_1', 'class': 'classMixer', 'parameters': {'delta_p': 0.0}})
+    elements.append({'name': 'tankS_1', 'class': 'classTankS', 'parameters': dict(tank_substation_parameters)})
+    connections += [['mixer_1', 'tankS_1'], ['tankS_1', 'tankC_1']]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_scenario({'version': scenario_version, 'parameters': dict(inlet_parameters), 'elements': elements,
+                    'connections': connections}, path)
+
+    return path
+
+
+def run_benchmark_scenario(path, nb_steps):
+    from simulation import classSimulation
+
+    start = time.perf_counter()
+    simulation = classSimulation(path, os.path.join(os.path.dirname(os.path.abspath(path)), 'results'))
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = simulation.run(nb_steps)
+    run_time = time.perf_counter() - start
+
+    nb_elements = len(simulation.created_instances)
+    timings = {'elements': nb_elements,
+               'steps': nb_steps,
+               'load_time': load_time,
+               'run_time': run_time,
+               'step_time': run_time / nb_steps,
+               'element_step_time': run_time / nb_steps / nb_elements}
+
+    return timings, results
+
+
+def run_benchmarks(sizes, nb_steps, network_steps, nb_calls=1000, repeat=3, networks_path=None):
+    import CoolProp
+
+    results = {'version': 1,
+               'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+               'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                           'python': sys.version.split()[0], 'numpy': np.__version__,
+                           'coolprop': CoolProp.__version__, 'property_backend': values_storage.property_backend},
+               'micro': {}, 'decks': {}, 'networks': {}}
+    trajectories = {}
+
+    print('Micro-benchmarks [us per call]')
+    results['micro'] = micro_benchmarks(nb_calls, repeat)
+    for name, duration in results['micro'].items():
+        print(f'{name:>40} | {duration * 1e6:10.3f}')
+
+    print(f'\nScenarios ({nb_steps} steps)')
+    for name, path in decks.items():
+        results['decks'][name], outputs = run_benchmark_scenario(path, nb_steps)
+        trajectories.update({f'decks/{name}/{element}/{channel}': values
+                             for element, channels in outputs.items() for channel, values in channels.items()})
+        print(f"{name:>40} | {results['decks'][name]['run_time']:8.3f} s | "
+              f"{results['decks'][name]['step_time'] * 1e3:8.3f} ms per step")
+
+    print(f'\nGenerated networks ({network_steps} steps)')
+    networks_path = networks_path or os.path.join(values_storage.results_path, 'networks')
+    for nb_elements in sizes:
+        path = generate_network(nb_elements, os.path.join(networks_path, f'network_{nb_elements}.json'))
+        timings, outputs = run_benchmark_scenario(path, network_steps)
+        results['networks'][str(nb_elements)] = timings
+        trajectories.update({f'networks/{nb_elements}/{element}/{channel}': values
+                             for element, channels in outputs.items() for channel, values in channels.items()})
+        print(f"{nb_elements:>40} | load {timings['load_time']:8.3f} s | {timings['step_time'] * 1e3:10.3f} ms per "
+              f"step | {timings['element_step_time'] * 1e6:8.3f} us per element and step")
+
+    return results, trajectories
+
+
+def relative_drift(reference, values):
+    reference = np.asarray(reference, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if reference.shape != values.shape:
+        return float('inf')
+
+    # NaN (no output of an element at a step) must stay NaN
+    nan_reference, nan_values = np.isnan(reference), np.isnan(values)
+    if np.any(nan_reference != nan_values):
+        return float('inf')
+
+    scale = np.max(np.abs(reference[~nan_reference]), initial=0.0)
+    difference = np.max(np.abs(values[~nan_values] - reference[~nan_reference]), initial=0.0)
+    return difference / scale if scale > 0.0 else difference
+
+
+def compare_with_baseline(results, trajectories, baseline_path, time_tolerance=None, drift_tolerance=None):
+    parameters = values_storage.benchmark_parameters
+    time_tolerance = parameters['time_tolerance'] if time_tolerance is None else time_tolerance
+    drift_tolerance = parameters['drift_tolerance'] if drift_tolerance is None else drift_tolerance
+
+    with open(os.path.join(baseline_path, 'benchmark.json')) as bf:
+        baseline = json.load(bf)
+    with np.load(os.path.join(baseline_path, 'trajectories.npz')) as data:
+        reference = {name: data[name] for name in data.files}
+
+    comparison = {'micro': {}, 'decks': {}, 'networks': {}, 'drift': {}}
+    regressions = []
+
+    # Ratio of the time of every benchmark to its baseline (> 1 is slower)
+    for name, duration in results['micro'].items():
+        if name in baseline['micro']:
+            comparison['micro'][name] = duration / baseline['micro'][name]
+    for part in ('decks', 'networks'):
+        for name, timings in results[part].items():
+            if name in baseline[part]:
+                comparison[part][name] = timings['step_time'] / baseline[part][name]['step_time']
+
+    for part in ('micro', 'decks', 'networks'):
+        for name, ratio in comparison[part].items():
+            if ratio > 1.0 + time_tolerance:
+                regressions.append(f'{part} {name}: {ratio:.2f} times the baseline time')
+
+    # Largest relative drift of the trajectories of every run of the baseline
+    runs = {'/'.join(name.split('/')[:2]) for name in reference}
+    for name, values in trajectories.items():
+        run = '/'.join(name.split('/')[:2])
+        if run in runs:
+            drift = relative_drift(reference[name], values) if name in reference else float('inf')
+            comparison['drift'][run] = max(comparison['drift'].get(run, 0.0), drift)
+
+    for run, drift in comparison['drift'].items():
+        if drift > drift_tolerance:
+            regressions.append(f'{run}: relative drift {drift:.3e} of the trajectories')
+
+    return comparison, regressions
+
+
+def main():
+    parameters = values_storage.benchmark_parameters
+
+    parser = argparse.ArgumentParser(description='Benchmark suite of the simulation')
+    parser.add_argument('--output', default=os.path.join(values_storage.results_path, 'benchmark'),
+                        help='folder of the results (benchmark.json and trajectories.npz)')
+    parser.add_argument('--baseline', default=None, help='folder of the results of a previous run of the suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=parameters['sizes'],
+                        help='number of elements of the generated networks')
+    parser.add_argument('--steps', type=int, default=parameters['nb_steps'], help='time steps of the scenarios')
+    parser.add_argument('--network-steps', type=int, default=parameters['network_steps'],
+                        help='time steps of the generated networks')
+    parser.add_argument('--calls', type=int, default=parameters['nb_calls'], help='calls of each micro-benchmark')
+    parser.add_argument('--time-tolerance', type=float, default=parameters['time_tolerance'],
+                        help='slowdown reported as a regression (0.2 = 20 %%)')
+    parser.add_argument('--drift-tolerance', type=float, default=parameters['drift_tolerance'],
+                        help='relative drift of the trajectories reported as a regression')
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output, exist_ok=True)
+    results, trajectories = run_benchmarks(arguments.sizes, arguments.steps, arguments.network_steps,
+                                           arguments.calls, parameters['repeat'],
+                                           os.path.join(arguments.output, 'networks'))
+
+    regressions = []
+    if arguments.baseline is not None:
+        results['comparison'], regressions = compare_with_baseline(results, trajectories, arguments.baseline,
+                                                                   arguments.time_tolerance, arguments.drift_tolerance)
+        results['regressions'] = regressions
+
+        print(f'\nComparison with {arguments.baseline} (time ratios, > 1 is slower)')
+        for part in ('micro', 'decks', 'networks'):
+            for name, ratio in results['comparison'][part].items():
+                print(f'{part:>8} {name:>40} | {ratio:6.3f}')
+        for run, drift in results['comparison']['drift'].items():
+            print(f'{"drift":>8} {run:>40} | {drift:.3e}')
+        for regression in regressions:
+            print(f'Regression: {regression}')
+
+    with open(os.path.join(arguments.output, 'benchmark.json'), 'w') as bf:
+        json.dump(results, bf, indent=4)
+    np.savez_compressed(os.path.join(arguments.output, 'trajectories.npz'), **trajectories)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
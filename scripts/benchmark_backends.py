@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Micro-benchmark of the CoolProp backends that can be selected with values_storage.property_backend.
+Run from the scripts folder : python benchmark_backends.py [nb_steps]
+
+Functions :
+benchmark_kernels(backend, nb_calls)
+- Time the property updates used by the elements (TQ, PT and HP inputs) for one backend
+
+run_scenario(data_path, backend, nb_steps)
+- Run one of the Tests/ scenarios with the given backend and return its outputs and duration
+
+compare_outputs(reference, outputs)
+- Return the maximum relative difference between the outputs of two runs of the same scenario
+
+main(nb_steps)
+- Run all the scenarios with all the backends and print speed and accuracy compared to HEOS
+"""
+
+
+import sys
+import time
+
+import values_storage
+from fluid_properties import classFluidState
+from simulation import classSimulation
+
+
+backends = ['HEOS', 'BICUBIC&HEOS', 'TTSE&HEOS']
+scenarios = ['../Tests/Tank/', '../Tests/Pipeline/', '../Tests/Exchanger/']
+
+
+def benchmark_kernels(backend, nb_calls=10000):
+    fluid = classFluidState('R744', backend)
+    timings = {}
+
+    # Saturated states (pipes and tanks)
+    start = time.perf_counter()
+    for i in range(nb_calls):
+        fluid.TQ(280.0 + 20.0 * i / nb_calls, 1.0, 'D', 'V')
+    timings['TQ'] = (time.perf_counter() - start) / nb_calls
+
+    # Single phase states (exchangers)
+    start = time.perf_counter()
+    for i in range(nb_calls):
+        fluid.PT(3.0e6, 280.0 + 20.0 * i / nb_calls, 'H')
+    timings['PT'] = (time.perf_counter() - start) / nb_calls
+
+    start = time.perf_counter()
+    for i in range(nb_calls):
+        fluid.HP(4.5e5 + 5.0e4 * i / nb_calls, 3.0e6, 'T')
+    timings['HP'] = (time.perf_counter() - start) / nb_calls
+
+    return timings
+
+
+def run_scenario(data_path, backend, nb_steps):
+    values_storage.property_backend = backend
+    simulation = classSimulation(data_path)
+
+    start = time.perf_counter()
+    results = simulation.run(nb_steps)
+    duration = time.perf_counter() - start
+
+    # Outputs of every element at every step
+    outputs = []
+    for step in range(nb_steps):
+        for element in simulation.elements_with_no_extension:
+            outputs.append((results[element]['m_dot'][step], results[element]['p'][step], results[element]['T'][step]))
+
+    return outputs, duration
+
+
+def compare_outputs(reference, outputs):
+    error = 0.0
+    for reference_values, values in zip(reference, outputs):
+        for reference_value, value in zip(reference_values, values):
+            if reference_value != 0.0:
+                error = max(error, abs(value / reference_value - 1.0))
+
+    return error
+
+
+def main(nb_steps=50):
+    print('Property kernels [us per call]')
+    for backend in backends:
+        timings = benchmark_kernels(backend)
+        print(f'{backend:>14} | ' + ' | '.join(f'{name} {value * 1e6:8.3f}' for name, value in timings.items()))
+
+    print(f'\nScenarios ({nb_steps} steps) [s] and maximum relative difference with HEOS')
+    for data_path in scenarios:
+        reference = None
+        for backend in backends:
+            outputs, duration = run_scenario(data_path, backend, nb_steps)
+            if reference is None:
+                reference = outputs
+            print(f'{data_path:>20} | {backend:>14} | {duration:8.4f} s | {compare_outputs(reference, outputs):.3e}')
+
+    values_storage.property_backend = 'HEOS'
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Functions :
+write_checkpoint(path, header, arrays)
+- Write a checkpoint: a small JSON header (version, time, step, positions...) and named NumPy arrays (states of the
+elements, streams, profiles, results) inside one binary .npz file; the file is written next to the previous one
+and replaces it atomically, so an interrupted write never corrupts the last checkpoint
+
+read_checkpoint(path)
+- Read a checkpoint and check its version, returns the header and the arrays
+
+The content of the checkpoints of a simulation is described in simulation.py (checkpoint() and resume())
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+
+# Version of the content of the checkpoints, increased when the content changes
+checkpoint_version = 1
+
+
+def write_checkpoint(path, header, arrays):
+    header = {**header, 'version': checkpoint_version}
+    encoded = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # Temporary file flushed to the disk before replacing the previous checkpoint
+    with open(path + '.tmp', 'wb') as cf:
+        np.savez(cf, header=encoded, **arrays)
+        cf.flush()
+        os.fsync(cf.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def read_checkpoint(path):
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(data['header'].tobytes().decode('utf-8'))
+        arrays = {name: data[name] for name in data.files if name != 'header'}
+
+    if header.get('version') != checkpoint_version:
+        raise ValueError(f"Checkpoint {path} has version {header.get('version')}, "
+                         f"version {checkpoint_version} is expected")
+
+    return header, arrays
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classEnthalpyTable
+
+Functions :
+__init__()
+- Initialization of the table parameters (fluid, pressure and enthalpy ranges, number of points)
+
+build()
+- Evaluate T(h, p) with CoolProp (HP flash) on a uniform (h, p) grid and compute the node derivatives used by the
+bicubic Hermite interpolation; the phase of every node is kept
+
+derivative(values, axis)
+- Second order differences of the node values along one axis that only use nodes of the same phase group (the
+saturation lines are kinks of T(h, p)): central differences, one-sided ones next to another phase group
+
+check_accuracy(nb_points)
+- Compare the interpolation with CoolProp in the middle of every cell, and on nb_points x nb_points points of the cells
+with a corner next to another phase group: a cell whose corners are not in the same phase, with a node outside of
+the fluid range, or with an error larger than tolerance is marked invalid; stores the maximum error found in the
+valid cells inside error_bound
+
+temperature(h, p)
+- Return the temperature at the enthalpy h and the pressure p (HP flash of CoolProp outside the table range, in an
+invalid cell or when use_coolprop is True)
+
+evaluate(h, p)
+- Vectorized interpolation for NumPy arrays of enthalpies and pressures (without the CoolProp fallback)
+
+get_enthalpy_table(fluid)
+- Return the table shared by all the exchangers of the simulation, building it on the first call (not built when
+use_coolprop is True)
+"""
+
+
+import numpy as np
+
+import values_storage
+from fluid_properties import classFluidState, load_coolprop
+
+
+class classEnthalpyTable:
+
+    def __init__(self, fluid='R744', p_min=6e5, p_max=100e5, h_min=80e3, h_max=600e3, nb_p=60, nb_h=120,
+                 tolerance=0.01, use_coolprop=False):
+
+        self.fluid = fluid  # [-] CoolProp fluid name
+        self.p_min = p_min  # [Pa] lowest pressure of the table (above the triple point)
+        self.p_max = p_max  # [Pa] highest pressure of the table
+        self.h_min = h_min  # [J/kg] lowest enthalpy of the table
+        self.h_max = h_max  # [J/kg] highest enthalpy of the table
+        self.nb_p = int(nb_p)  # [-] number of nodes along the pressure
+        self.nb_h = int(nb_h)  # [-] number of nodes along the enthalpy
+        self.tolerance = tolerance  # [K] largest error of a valid cell
+        self.use_coolprop = use_coolprop  # [-] bypass the table and call CoolProp (accuracy check)
+
+        self.dp = (self.p_max - self.p_min) / (self.nb_p - 1)  # [Pa] distance between two nodes
+        self.dh = (self.h_max - self.h_min) / (self.nb_h - 1)  # [J/kg] distance between two nodes
+        self.values = None  # [K] node temperatures, shape (nb_h, nb_p), NaN outside of the fluid range
+        self.slopes = None  # Node derivatives dT/dh * dh, dT/dp * dp and d2T/dhdp * dh * dp
+        self.phases = None  # Phase group of every node
+        self.valid = None  # Cells interpolated by the table, shape (nb_h - 1, nb_p - 1)
+        self.error_bound = None  # [K] maximum error of the valid cells, filled by check_accuracy()
+
+        self.fluid_state = classFluidState(fluid)  # CoolProp state of the fallback
+        CP = load_coolprop()
+        self.state = CP.AbstractState('HEOS', fluid)  # CoolProp state used to build the table
+        self.inputs = CP.HmassP_INPUTS  # CoolProp input pair of the HP flash
+
+        # Phases of CoolProp grouped by smooth region of T(h, p)
+        self.phase_groups = {
+            CP.iphase_liquid: 0,
+            CP.iphase_twophase: 1,
+            CP.iphase_gas: 2,
+            CP.iphase_supercritical: 3,
+            CP.iphase_supercritical_gas: 3,
+            CP.iphase_supercritical_liquid: 3,
+        }
+
+    def flash(self, h, p):
+        try:
+            self.state.update(self.inputs, h, p)
+            return self.state.T(), self.phase_groups.get(self.state.phase(), -1)
+        except ValueError:
+            return np.nan, -1
+
+    def build(self, check=True):
+        h_nodes = np.linspace(self.h_min, self.h_max, self.nb_h)
+        p_nodes = np.linspace(self.p_min, self.p_max, self.nb_p)
+
+        self.values = np.empty((self.nb_h, self.nb_p))
+        self.phases = np.empty((self.nb_h, self.nb_p), dtype=int)
+        for i, h in enumerate(h_nodes):
+            for j, p in enumerate(p_nodes):
+                self.values[i, j], self.phases[i, j] = self.flash(h, p)
+
+        # Second order differences (in grid units) inside each phase group, NaN next to the nodes outside of the fluid
+        # range
+        T_h = self.derivative(self.values, 0)
+        T_p = self.derivative(self.values, 1)
+        T_hp = self.derivative(T_h, 1)
+        self.slopes = (T_h, T_p, T_hp)
+
+        # Cells of nodes of the same phase
+        corners = (self.phases[:-1, :-1], self.phases[1:, :-1], self.phases[:-1, 1:], self.phases[1:, 1:])
+        self.valid = (corners[0] >= 0) & np.all([corner == corners[0] for corner in corners[1:]], axis=0)
+        for array in (self.values,) + self.slopes:
+            self.valid &= ~np.isnan(array[:-1, :-1]) & ~np.isnan(array[1:, :-1])
+            self.valid &= ~np.isnan(array[:-1, 1:]) & ~np.isnan(array[1:, 1:])
+
+        if check:
+            self.check_accuracy()
+
+        # Python lists are faster than NumPy arrays to index with scalars
+        self._values = self.values.tolist()
+        self._slopes = [slope.tolist() for slope in self.slopes]
+        self._valid = self.valid.tolist()
+
+        return self
+
+    def derivative(self, values, axis):
+        # Nodes along the first axis, with two missing nodes of group -2 on each side of the table
+        values = np.moveaxis(values, axis, 0)
+        phases = np.moveaxis(self.phases, axis, 0)
+        padding = ((2, 2), (0, 0))
+        T = np.pad(values, padding, constant_values=np.nan)
+        groups = np.pad(phases, padding, constant_values=-2)
+        n = len(values)
+
+        def node(k):
+            return T[2 + k:2 + k + n]
+
+        def same(k):
+            return groups[2 + k:2 + k + n] == phases
+
+        # Central differences when both neighbours are in the phase group of the node, one-sided differences
+        # otherwise (second order with two nodes of the same group on that side, first order with one)
+        result = np.full(values.shape, np.nan)
+        cases = (
+            (same(-1) & same(1), (node(1) - node(-1)) / 2),
+            (same(1) & same(2), (-3 * node(0) + 4 * node(1) - node(2)) / 2),
+            (same(-1) & same(-2), (3 * node(0) - 4 * node(-1) + node(-2)) / 2),
+            (same(1), node(1) - node(0)),
+            (same(-1), node(0) - node(-1)),
+        )
+        for selected, difference in reversed(cases):
+            result = np.where(selected, difference, result)
+
+        return np.moveaxis(result, 0, axis)
+
+    def check_accuracy(self, nb_points=3):
+        # The error of a bicubic Hermite interpolation is the largest in the middle of the cells where T(h, p) is
+        # smooth; next to a saturation line (a corner of the cell with a one-sided difference) the error is checked on
+        # a grid of nb_points x nb_points points of the cell
+        one_sided = np.zeros(self.phases.shape, dtype=bool)
+        for axis in (0, 1):
+            phases = np.moveaxis(self.phases, axis, 0)
+            side = np.moveaxis(one_sided, axis, 0)
+            side[0] = side[-1] = True
+            side[1:-1] |= (phases[:-2] != phases[1:-1]) | (phases[2:] != phases[1:-1])
+        near = one_sided[:-1, :-1] | one_sided[1:, :-1] | one_sided[:-1, 1:] | one_sided[1:, 1:]
+
+        offsets = (np.arange(nb_points) + 0.5) / nb_points
+        points = []
+        for i, j in zip(*np.nonzero(self.valid)):
+            if near[i, j]:
+                points += [(i, j, u, v) for u in offsets for v in offsets]
+            else:
+                points.append((i, j, 0.5, 0.5))
+        i, j, u, v = np.array(points).T if points else np.zeros((4, 0))
+        i = i.astype(int)
+        j = j.astype(int)
+        h = self.h_min + (i + u) * self.dh
+        p = self.p_min + (j + v) * self.dp
+
+        reference = np.array([self.flash(h_point, p_point)[0] for h_point, p_point in zip(h, p)])
+        error = np.abs(self.evaluate(h, p) - reference)
+
+        # Largest error of each cell, a failed flash invalidates its cell
+        cell_error = np.zeros(self.valid.shape)
+        np.maximum.at(cell_error, (i, j), np.where(np.isnan(error), np.inf, error))
+        self.valid &= cell_error <= self.tolerance
+        self.error_bound = float(np.max(cell_error[self.valid])) if np.any(self.valid) else np.nan
+
+        return self.error_bound
+
+    def temperature(self, h, p):
+        x = (h - self.h_min) / self.dh
+        y = (p - self.p_min) / self.dp
+
+        # Outside of the table, in a cell crossed by a saturation line (or in check mode) the HP flash of CoolProp
+        # is used
+        if self.use_coolprop or not (0.0 <= x < self.nb_h - 1 and 0.0 <= y < self.nb_p - 1):
+            return self.fluid_state.HP(h, p, 'T')
+        i = int(x)
+        j = int(y)
+        if not self._valid[i][j]:
+            return self.fluid_state.HP(h, p, 'T')
+
+        # Cubic Hermite basis functions along both axes
+        u = x - i
+        u2 = u * u
+        u3 = u2 * u
+        hu = (2 * u3 - 3 * u2 + 1, u3 - 2 * u2 + u, -2 * u3 + 3 * u2, u3 - u2)
+        v = y - j
+        v2 = v * v
+        v3 = v2 * v
+        hv = (2 * v3 - 3 * v2 + 1, v3 - 2 * v2 + v, -2 * v3 + 3 * v2, v3 - v2)
+
+        T, T_h, T_p = self._values, self._slopes[0], self._slopes[1]
+        T_hp = self._slopes[2]
+        T_out = 0.0
+        for a, b in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            k, m = i + a, j + b
+            T_out += (hu[2 * a] * (hv[2 * b] * T[k][m] + hv[2 * b + 1] * T_p[k][m])
+                      + hu[2 * a + 1] * (hv[2 * b] * T_h[k][m] + hv[2 * b + 1] * T_hp[k][m]))
+
+        return T_out
+
+    def evaluate(self, h, p):
+        h = np.asarray(h, dtype=float)
+        p = np.asarray(p, dtype=float)
+        x = (h - self.h_min) / self.dh
+        y = (p - self.p_min) / self.dp
+        i = np.clip(x.astype(int), 0, self.nb_h - 2)
+        j = np.clip(y.astype(int), 0, self.nb_p - 2)
+
+        u = x - i
+        v = y - j
+        hu = ((2 * u ** 3 - 3 * u ** 2 + 1), (u ** 3 - 2 * u ** 2 + u), (-2 * u ** 3 + 3 * u ** 2), (u ** 3 - u ** 2))
+        hv = ((2 * v ** 3 - 3 * v ** 2 + 1), (v ** 3 - 2 * v ** 2 + v), (-2 * v ** 3 + 3 * v ** 2), (v ** 3 - v ** 2))
+
+        T, (T_h, T_p, T_hp) = self.values, self.slopes
+        result = np.zeros(np.broadcast(h, p).shape)
+        for a, b in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            k, m = i + a, j + b
+            result += (hu[2 * a] * (hv[2 * b] * T[k, m] + hv[2 * b + 1] * T_p[k, m])
+                       + hu[2 * a + 1] * (hv[2 * b] * T_h[k, m] + hv[2 * b + 1] * T_hp[k, m]))
+
+        return result
+
+
+# Tables already built in this process, one per fluid
+enthalpy_tables = {}
+
+
+def get_enthalpy_table(fluid='R744'):
+    if fluid not in enthalpy_tables:
+        parameters = {name: value for name, value in values_storage.enthalpy_table_parameters.items()
+                      if name != 'enabled'}
+        table = classEnthalpyTable(fluid, **parameters)
+
+        # In check mode every temperature is an HP flash of CoolProp, the table is not built
+        enthalpy_tables[fluid] = table if table.use_coolprop else table.build()
+
+    return enthalpy_tables[fluid]
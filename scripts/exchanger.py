@@ -16,29 +16,45 @@ __init__()
 - Initialization of the exchanger parameters
 
 compute_output_evap()
-- Calculate the output temperate for the evaporation
+- Calculate the output temperate for the evaporation (T(h, p) interpolated inside the table of enthalpy_table.py)
 
 compute_output_cond()
-- Calculate the output temperate for the condensation
+- Calculate the output temperate for the condensation (T(h, p) interpolated inside the table of enthalpy_table.py)
+
+compute_output_two_phase()
+- Calculate the output temperature and quality of a two-phase input (e.g. the output of a mixer) with the HP flash
+of CoolProp, the quality is -1 when the output leaves the saturation dome
 
 setQdot()
 - Function to modify the Qdot of each exchanger at each timestep
 
 update()
-- update function using new parameters
+- update function using new parameters (saturated liquid or gas, two-phase input with its quality, or single phase
+input with x = -1)
 """
 
-import CoolProp.CoolProp as CP
+import values_storage
+from enthalpy_table import get_enthalpy_table
+from fluid_properties import classFluidState
+from state_arrays import add_state_fields, new_state
 
 
 class classExchanger:
 
-    Qdot = 0
+    # Internal values recorded at every step with the outputs (see recorder.py)
+    state_channels = {'Qdot': 'Qdot'}
 
     def __init__(self, Qdot):
 
+       self.state = new_state(self)  # Row of the element, moved to the state table of its simulation by load()
+
        self.Qdot = Qdot
 
+       self.fluid = classFluidState('R744')  # CoolProp state reused by the exchanger
+
+       # T(h, p) table shared by the exchangers (None to call the HP flash of CoolProp)
+       self.table = get_enthalpy_table('R744') if values_storage.enthalpy_table_parameters['enabled'] else None
+
     # Method that is used when we have liquid that need to be evaporated
     def compute_output_evap(self, m_dot_in, p_in, T_in, x_in):
 
@@ -47,11 +63,14 @@ class classExchanger:
         if m_dot_in > 0:
 
             # Add 100 Pa to be sure that we are not in the saturation pressure
-            H_in = CP.PropsSI('H', 'T', T_in, 'P', p_in+100, 'R744')
+            H_in = self.fluid.PT(p_in+100, T_in, 'H')
 
             H = self.Qdot / m_dot_in + H_in
 
-            T_out = CP.PropsSI('T', 'H', H, 'P', p_in, 'R744')
+            if self.table is not None:
+                T_out = self.table.temperature(H, p_in)
+            else:
+                T_out = self.fluid.HP(H, p_in, 'T')
 
         return m_dot_in, p_in, T_out, 1
 
@@ -61,13 +80,27 @@ class classExchanger:
         T_out = T_in
         if m_dot_in > 0:
 
-            H_out = CP.PropsSI('H', 'T', T_in, 'P', p_in, 'R744')
+            H_out = self.fluid.PT(p_in, T_in, 'H')
             H = -self.Qdot / m_dot_in + H_out
 
             # Add 100 Pa to be sure that we are not in the saturation pressure
-            T_out = CP.PropsSI('T', 'H', H, 'P', p_in+100, 'R744')
+            if self.table is not None:
+                T_out = self.table.temperature(H, p_in+100)
+            else:
+                T_out = self.fluid.HP(H, p_in+100, 'T')
         return m_dot_in, p_in, T_out, 0
 
+    # Method that is used when the input is a mix of liquid and gas
+    def compute_output_two_phase(self, m_dot_in, p_in, T_in, x_in):
+
+        if m_dot_in <= 0:
+            return m_dot_in, p_in, T_in, x_in
+
+        H = self.Qdot / m_dot_in + self.fluid.TQ(T_in, x_in, 'H')
+        T_out, x_out = self.fluid.HP(H, p_in, 'T', 'Q')
+
+        return m_dot_in, p_in, T_out, x_out
+
     # Method that can be used while reading power for a file
     def setQdot(self,Qdot):
         self.Qdot = Qdot
@@ -80,11 +113,17 @@ class classExchanger:
             result = list(classExchanger.compute_output_evap(self, m_dot, p, T, x))
         elif 1.0 - 1e-4 < x < 1.0 + 1e-4:
             result = list(classExchanger.compute_output_cond(self, m_dot, p, T, x))
+        elif 0.0 < x < 1.0:
+            result = list(self.compute_output_two_phase(m_dot, p, T, x))
         elif x == -1.0:
-            phase = CP.PhaseSI('P', p, 'T', T, 'R744')
+            phase = self.fluid.phase(p, T)
             if phase == 'liquid':
                 result = list(classExchanger.compute_output_evap(self, m_dot, p, T, x))
             elif phase == 'gas':
                 result = list(classExchanger.compute_output_cond(self, m_dot, p, T, x))
 
-        return result
\ No newline at end of file
+        return result
+
+
+# Simulation variables of the exchangers, one row per exchanger in the table of their simulation (see state_arrays.py)
+add_state_fields(classExchanger, {'Qdot': 0.0})
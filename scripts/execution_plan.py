@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classExecutionPlan
+
+Functions :
+__init__()
+- Compile the network of a classSimulation once its elements are loaded and their state tables attached: check the
+elements and their connections, bind the output pipe and the substation tank of every central tank, and build the
+flat list of the callables computing one step (one per element or chain of pipes, in the order of evaluation)
+
+find_pipe_chains()
+- Return the chains of pipes in series (each pipe feeds the next one only) evaluated by a classPipeBank, as lists of
+element ids (values_storage.pipe_bank_parameters)
+
+find_downstream(element_id, element_class)
+- Return the first element of a class downstream of an element (following the connections of topology.txt)
+
+bind_update(element_id, update, input_slot, output_slots) / bind_splitter(...) / bind_mixer(...)
+- Build the callable of an element: it reads its input stream(s) inside the slots, calls the element and writes
+its output stream(s) inside the slots of its connections (a ValueError names the element when its update() has no
+output for its input stream)
+
+bind_pipe_chain(chain, input_slot, output_slots)
+- Build the callable of a chain of pipes: one vectorized step of the bank, the variables of the pipes written into
+their rows of the state table in one array operation
+
+run()
+- Compute one step: call every callable of the plan (each one keeps the outputs of its elements), returns the outputs
+of every element in the order of main.txt
+
+couple_pressures()
+- Give the pressure of its substation tank to every central tank (explicit coupling, pairs resolved at compile time)
+
+The streams (m_dot, p, T, x) between the elements are kept inside slots: for the chain of main.txt every element
+reads and writes the slot 0 (the output of the last element is the input of the first one on the next step), with a
+topology.txt each connection has its own slot and the slot 0 keeps the inlet stream of default_parameters.txt
+"""
+
+
+import numpy as np
+
+from mixer import classMixer
+from pipe_bank import classPipeBank
+from pipeline import classPipes
+from splitter import classSplitter
+from tank_central import classTankC
+from tank_substation import classTankS
+import values_storage
+
+
+class classExecutionPlan:
+
+    def __init__(self, simulation):
+
+        self.names = list(simulation.elements_with_no_extension)  # Names of the elements (main.txt)
+        self.instances = list(simulation.created_instances)  # Elements, in the same order
+        self.graph = simulation.graph  # Connections of topology.txt (None for the chain of main.txt)
+
+        # Elements that could not be created from their file
+        for name, instance in zip(self.names, self.instances):
+            if instance is None:
+                raise ValueError(f'Element {name} could not be created, check the values of {name}.txt')
+            if not callable(getattr(instance, 'update', None)):
+                raise ValueError(f'Element {name} has no update() method')
+
+        # Slot 0: stream of default_parameters.txt
+        inlet = (simulation.parameters['m_dot_in'], simulation.parameters['p_in'],
+                 simulation.parameters['T_in'], simulation.parameters['x_in'])
+
+        self.outputs = [None] * len(self.instances)
+
+        # Chains of pipes evaluated by a bank, the first pipe of a chain computes the whole chain
+        chains = {chain[0]: chain for chain in self.find_pipe_chains()}
+        banked = {element_id for chain in chains.values() for element_id in chain[1:]}
+
+        if self.graph is None:
+            self.order = list(range(len(self.instances)))
+            self.slots = [inlet]
+            self.operations = []
+            for element_id in self.order:
+                if element_id in chains:
+                    self.operations.append(self.bind_pipe_chain(chains[element_id], 0, (0,)))
+                elif element_id not in banked:
+                    self.operations.append(self.bind_update(element_id, self.instances[element_id].update, 0, (0,)))
+        else:
+            self.order = list(self.graph.order)
+            self.slots = [inlet] + [inlet] * len(self.graph.connections)
+            slot = {connection: index + 1 for index, connection in enumerate(self.graph.connections)}
+
+            self.operations = []
+            for element_id in self.order:
+                if element_id in banked:
+                    continue
+                instance = self.instances[element_id]
+                input_slots = [slot[connection] for connection in self.graph.inputs[element_id]] or [0]
+                last = chains[element_id][-1] if element_id in chains else element_id
+                output_slots = [slot[connection] for connection in self.graph.outputs[last]]
+
+                if element_id in chains:
+                    self.operations.append(self.bind_pipe_chain(chains[element_id], input_slots[0], output_slots))
+                elif isinstance(instance, classMixer) and len(input_slots) > 1:
+                    self.operations.append(self.bind_mixer(element_id, instance.mix, input_slots, output_slots))
+                elif isinstance(instance, classSplitter):
+                    self.operations.append(self.bind_splitter(element_id, instance.update, instance.split,
+                                                              input_slots[0], output_slots))
+                else:
+                    self.operations.append(self.bind_update(element_id, instance.update, input_slots[0],
+                                                            output_slots))
+
+        # Output pipe and substation tank of every central tank
+        self.couplings = []
+        for element_id, (name, instance) in enumerate(zip(self.names, self.instances)):
+            if not isinstance(instance, classTankC):
+                continue
+
+            if self.graph is None:
+                # Chain of main.txt: the last pipe and the last substation tank, as searched by the tank
+                pipes = [element for element in self.instances if isinstance(element, classPipes)]
+                substations = [element for element in self.instances if isinstance(element, classTankS)]
+                pipe = pipes[-1] if pipes else None
+                substation = substations[-1] if substations else None
+            else:
+                pipe = self.find_downstream(element_id, classPipes)
+                substation = self.find_downstream(element_id, classTankS)
+
+            if pipe is None:
+                raise ValueError(f'Central tank {name} has no output pipe')
+            if substation is None:
+                raise ValueError(f'Central tank {name} has no substation tank')
+
+            instance.set_neighbours(pipe, substation)
+            self.couplings.append((instance, substation))
+
+    def find_downstream(self, element_id, element_class):
+        visited = {element_id}
+        queue = [element_id]
+
+        # Breadth-first search over the connections
+        while queue:
+            source = queue.pop(0)
+            for _, target in self.graph.outputs[source]:
+                if isinstance(self.instances[target], element_class):
+                    return self.instances[target]
+                if target not in visited:
+                    visited.add(target)
+                    queue.append(target)
+
+        return None
+
+    def find_pipe_chains(self):
+        parameters = values_storage.pipe_bank_parameters
+        if not parameters['enabled']:
+            return []
+
+        def is_pipe(element_id):
+            return isinstance(self.instances[element_id], classPipes)
+
+        chains = []
+        if self.graph is None:
+            # Chain of main.txt: consecutive pipes
+            chain = []
+            for element_id in range(len(self.instances)):
+                if is_pipe(element_id):
+                    chain.append(element_id)
+                else:
+                    chains.append(chain)
+                    chain = []
+            chains.append(chain)
+        else:
+            # Pipe feeding only one pipe which has no other input, through a connection of the same step
+            def next_pipe(element_id):
+                if len(self.graph.outputs[element_id]) != 1:
+                    return None
+                connection = self.graph.outputs[element_id][0]
+                target = connection[1]
+                if connection in self.graph.lagged or not is_pipe(target) or len(self.graph.inputs[target]) != 1:
+                    return None
+                return target
+
+            following = {}
+            for element_id in self.graph.order:
+                if is_pipe(element_id):
+                    target = next_pipe(element_id)
+                    if target is not None:
+                        following[element_id] = target
+
+            followers = set(following.values())
+            for element_id in self.graph.order:
+                if not is_pipe(element_id) or element_id in followers:
+                    continue
+                chain = [element_id]
+                while chain[-1] in following:
+                    chain.append(following[chain[-1]])
+                chains.append(chain)
+
+        # The variables of the pipes of a chain are written into one state table
+        return [chain for chain in chains if len(chain) >= max(parameters['min_pipes'], 2) and
+                len({self.instances[element_id].state.table for element_id in chain}) == 1]
+
+    def bind_update(self, element_id, update, input_slot, output_slots):
+        slots = self.slots
+        outputs = self.outputs
+        name = self.names[element_id]
+
+        def operation():
+            result = update(*slots[input_slot])
+            if result is None:
+                raise ValueError(f'Element {name} has no output for the input stream (m_dot, p, T, x) = '
+                                 f'{tuple(slots[input_slot])}')
+            for output_slot in output_slots:
+                slots[output_slot] = result
+            outputs[element_id] = result
+
+        return operation
+
+    def bind_splitter(self, element_id, update, split, input_slot, output_slots):
+        slots = self.slots
+        outputs = self.outputs
+        name = self.names[element_id]
+
+        def operation():
+            result = update(*slots[input_slot])
+            if result is None:
+                raise ValueError(f'Element {name} has no output for the input stream (m_dot, p, T, x) = '
+                                 f'{tuple(slots[input_slot])}')
+            for output_slot, stream in zip(output_slots, split(*result)):
+                slots[output_slot] = stream
+            outputs[element_id] = result
+
+        return operation
+
+    def bind_mixer(self, element_id, mix, input_slots, output_slots):
+        slots = self.slots
+        outputs = self.outputs
+
+        def operation():
+            result = mix([slots[input_slot] for input_slot in input_slots])
+            for output_slot in output_slots:
+                slots[output_slot] = result
+            outputs[element_id] = result
+
+        return operation
+
+    def bind_pipe_chain(self, chain, input_slot, output_slots):
+        slots = self.slots
+        outputs = self.outputs
+        name = self.names[chain[0]]
+        pipes = [self.instances[element_id] for element_id in chain]
+        bank = classPipeBank.from_pipes(pipes, use_table=False)
+
+        # Rows and columns of the variables of the pipes inside their state table
+        table = pipes[0].state.table
+        fields = ('m_dot_in', 'p_in', 'T_in', 'x_in', 'rho', 'fd')
+        cells = np.ix_([pipe.state.row for pipe in pipes], [table.columns[field] for field in fields])
+        variables = np.empty((len(chain), len(fields)))
+
+        def operation():
+            m_dot, p, T, x = slots[input_slot]
+            x = bank.quality(p, T, x)
+            if x is None:
+                raise ValueError(f'Element {name} has no output for the input stream (m_dot, p, T, x) = '
+                                 f'{tuple(slots[input_slot])}')
+            p_in, p_out = bank.compute_output_chain(m_dot, p, T, x)
+
+            variables[:, 0] = m_dot
+            variables[:, 1] = p_in
+            variables[:, 2] = T
+            variables[:, 3] = x
+            variables[:, 4] = bank.rho
+            variables[:, 5] = bank.fd
+            table.values[cells] = variables
+
+            for element_id, p_out_pipe in zip(chain, p_out.tolist()):
+                outputs[element_id] = [m_dot, p_out_pipe, T, x]
+            for output_slot in output_slots:
+                slots[output_slot] = outputs[chain[-1]]
+
+        return operation
+
+    def run(self):
+        for operation in self.operations:
+            operation()
+
+        return list(self.outputs)
+
+    def couple_pressures(self):
+        for central, substation in self.couplings:
+            central.set_delta_pressure(substation.p)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classFluidState
+
+Functions :
+load_coolprop()
+- Import CoolProp and fill the tables of its constants, called by the first classFluidState (importing this module
+does not import CoolProp)
+
+__init__()
+- Creation of the CoolProp AbstractState reused by one element (the backend is read from values_storage when it is
+not given, e.g. 'HEOS', 'BICUBIC&HEOS' or 'TTSE&HEOS')
+
+TQ(T, Q, *outputs), PQ(p, Q, *outputs), PT(p, T, *outputs), HP(h, p, *outputs)
+- Update the state once with the given inputs and return all the requested outputs ('D', 'V', 'U', 'H', 'P', 'T',
+'Q'); a single output is returned as a float, several outputs as a tuple
+
+phase(p, T)
+- Return the phase of the fluid with the same names as CoolProp.PhaseSI ('liquid', 'gas', ...)
+
+cached(inputs, a, b, outputs)
+- Read the outputs from the shared property cache (see property_cache.py) when it is enabled in values_storage,
+computing and storing them on a miss
+"""
+
+
+import values_storage
+from property_cache import get_property_cache
+
+
+# CoolProp module, imported by the first state (the import initializes the fluid library and takes seconds, see
+# python -m roadmap importtime)
+CP = None
+
+# Output names accepted by classFluidState and the matching CoolProp parameters
+outputs_parameters = {}
+
+# CoolProp input pairs and the names of their two variables in the cache quantization
+inputs_pairs = {}
+
+# Phase names returned by CoolProp.PhaseSI
+phases_names = {}
+
+
+def load_coolprop():
+    global CP
+
+    if CP is None:
+        import CoolProp.CoolProp as coolprop
+
+        outputs_parameters.update({
+            'D': coolprop.iDmass,
+            'V': coolprop.iviscosity,
+            'U': coolprop.iUmass,
+            'H': coolprop.iHmass,
+            'P': coolprop.iP,
+            'T': coolprop.iT,
+            'Q': coolprop.iQ,
+        })
+        inputs_pairs.update({
+            'TQ': (coolprop.QT_INPUTS, 'Q', 'T'),
+            'PQ': (coolprop.PQ_INPUTS, 'P', 'Q'),
+            'PT': (coolprop.PT_INPUTS, 'P', 'T'),
+            'HP': (coolprop.HmassP_INPUTS, 'H', 'P'),
+            'phase': (coolprop.PT_INPUTS, 'P', 'T'),
+        })
+        phases_names.update({
+            coolprop.iphase_liquid: 'liquid',
+            coolprop.iphase_gas: 'gas',
+            coolprop.iphase_twophase: 'twophase',
+            coolprop.iphase_supercritical: 'supercritical',
+            coolprop.iphase_supercritical_gas: 'supercritical_gas',
+            coolprop.iphase_supercritical_liquid: 'supercritical_liquid',
+            coolprop.iphase_critical_point: 'critical_point',
+        })
+        CP = coolprop
+
+    return CP
+
+
+class classFluidState:
+
+    def __init__(self, fluid='R744', backend=None):
+
+        self.fluid = fluid  # [-] CoolProp fluid name
+        self.backend = values_storage.property_backend if backend is None else backend  # [-] CoolProp backend
+        self.state = load_coolprop().AbstractState(self.backend, fluid)
+
+        # Shared property cache, only used when it is enabled
+        self.cache = get_property_cache() if values_storage.property_cache_parameters['enabled'] else None
+
+    def outputs(self, outputs):
+        values = []
+        for output in outputs:
+            value = self.state.keyed_output(outputs_parameters[output])
+
+            # Single phase qualities are -1 with HEOS but -1000 with the tabular backends
+            if output == 'Q' and not 0.0 <= value <= 1.0:
+                value = -1.0
+            values.append(value)
+
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def cached(self, inputs, a, b, outputs):
+        pair, name_a, name_b = inputs_pairs[inputs]
+        a = self.cache.quantize(name_a, a)
+        b = self.cache.quantize(name_b, b)
+
+        key = (self.fluid, self.backend, inputs, a, b, outputs)
+        values = self.cache.get(key)
+        if values is None:
+            self.state.update(pair, a, b)
+            if inputs == 'phase':
+                values = phases_names.get(self.state.phase(), 'unknown')
+            else:
+                values = self.outputs(outputs)
+            self.cache.put(key, values)
+
+        return values
+
+    def TQ(self, T, Q, *outputs):
+        if self.cache is not None:
+            return self.cached('TQ', Q, T, outputs)
+
+        self.state.update(CP.QT_INPUTS, Q, T)
+        return self.outputs(outputs)
+
+    def PQ(self, p, Q, *outputs):
+        if self.cache is not None:
+            return self.cached('PQ', p, Q, outputs)
+
+        self.state.update(CP.PQ_INPUTS, p, Q)
+        return self.outputs(outputs)
+
+    def PT(self, p, T, *outputs):
+        if self.cache is not None:
+            return self.cached('PT', p, T, outputs)
+
+        self.state.update(CP.PT_INPUTS, p, T)
+        return self.outputs(outputs)
+
+    def HP(self, h, p, *outputs):
+        if self.cache is not None:
+            return self.cached('HP', h, p, outputs)
+
+        self.state.update(CP.HmassP_INPUTS, h, p)
+        return self.outputs(outputs)
+
+    def phase(self, p, T):
+        if self.cache is not None:
+            return self.cached('phase', p, T, ())
+
+        self.state.update(CP.PT_INPUTS, p, T)
+        return phases_names.get(self.state.phase(), 'unknown')
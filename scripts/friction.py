@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classFrictionSolver
+
+Functions :
+friction_factor(Re, k, d)
+- Darcy friction factor of the Colebrook-White equation, seeded with the explicit Swamee-Jain approximation and
+finished with Newton steps on 1/sqrt(fd)
+
+colebrook_white(Re, k, d)
+- Same solve as friction_factor, returns the friction factor and the number of Newton steps
+
+friction_factors(Re, k, d)
+- Vectorized version of friction_factor for NumPy arrays of Re (k and d can be arrays of the same shape or floats)
+
+classFrictionSolver.__init__()
+- Initialization of the memory of the last friction factor computed by an element
+
+classFrictionSolver.friction_factor(Re, k, d)
+- Return the friction factor, reusing the last result when Re, k and d did not change
+
+classFrictionSolver.get_statistics()
+- Return the number of calls, solves (calls with new inputs) and Newton steps of the solver
+"""
+
+
+from math import log, log10
+
+import numpy as np
+
+
+# Constant of the Newton derivative of log10
+ln10 = log(10.0)
+
+# Maximum number of Newton steps after the explicit seed (two steps are enough in practice)
+max_newton_steps = 4
+tolerance = 1e-12
+
+
+def friction_factor(Re, k, d):
+    return colebrook_white(Re, k, d)[0]
+
+
+def colebrook_white(Re, k, d):
+    a = k / 3.71 / d
+    b = 2.51 / Re
+
+    # Explicit seed (Swamee-Jain) for x = 1 / sqrt(fd)
+    x = -2.0 * log10(k / 3.7 / d + 5.74 / Re ** 0.9)
+
+    # Newton steps on g(x) = x + 2 log10(a + b x) = 0
+    for step in range(1, max_newton_steps + 1):
+        argument = a + b * x
+        dx = (x + 2.0 * log10(argument)) / (1.0 + 2.0 * b / (ln10 * argument))
+        x -= dx
+        if abs(dx) < tolerance * x:
+            break
+
+    return 1.0 / (x * x), step
+
+
+def friction_factors(Re, k, d):
+    Re = np.asarray(Re, dtype=float)
+    a = np.asarray(k, dtype=float) / 3.71 / np.asarray(d, dtype=float)
+    b = 2.51 / Re
+
+    x = -2.0 * np.log10(np.asarray(k, dtype=float) / 3.7 / np.asarray(d, dtype=float) + 5.74 / Re ** 0.9)
+
+    for step in range(max_newton_steps):
+        argument = a + b * x
+        dx = (x + 2.0 * np.log10(argument)) / (1.0 + 2.0 * b / (ln10 * argument))
+        x = x - dx
+        if np.all(np.abs(dx) < tolerance * x):
+            break
+
+    return 1.0 / (x * x)
+
+
+class classFrictionSolver:
+
+    # Statistics saved and restored by the implicit network solver around its trial evaluations
+    counters = ('nb_calls', 'nb_solves', 'nb_iterations')
+
+    def __init__(self):
+
+        # Inputs and result of the last call
+        self.Re = None
+        self.k = None
+        self.d = None
+        self.fd = None
+
+        # Statistics of the solver
+        self.nb_calls = 0
+        self.nb_solves = 0
+        self.nb_iterations = 0
+
+    def friction_factor(self, Re, k, d):
+        self.nb_calls += 1
+        if Re != self.Re or k != self.k or d != self.d:
+            self.Re = Re
+            self.k = k
+            self.d = d
+            self.fd, steps = colebrook_white(Re, k, d)
+            self.nb_solves += 1
+            self.nb_iterations += steps
+
+        return self.fd
+
+    def get_statistics(self):
+        return {'calls': self.nb_calls,
+                'solves': self.nb_solves,
+                'iterations': self.nb_iterations,
+                'mean_iterations': self.nb_iterations / self.nb_solves if self.nb_solves else 0.0}
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classInstrumentation
+-classProgressReporter
+
+Functions :
+classInstrumentation.__init__()
+- Initialization of the timers, counters and trace events of a profiled run (nothing is measured before start())
+
+classInstrumentation.start(classes, methods)
+- Replace the methods of the element classes (and of the tank and friction solvers) by timed versions (wall time
+per element type and method, nested calls are included in the time of their caller) and the property methods of
+classFluidState (TQ, PQ, PT, HP, phase) and CoolProp.PropsSI by counted versions (number of calls per call site);
+the simulation must be loaded after start(), the execution plan binds the methods of the elements when it is built
+
+classInstrumentation.stop()
+- Put the original methods back (without start(), the simulation runs without any instrumentation cost)
+
+classInstrumentation.collect(simulation)
+- Read the statistics the solvers of the elements always keep (tank temperature solver, mass/energy passes,
+Colebrook-White solver, implicit network solver)
+
+classInstrumentation.get_summary() / export_summary(path) / export_trace(path)
+- Return the summary of the run (timers, property calls, solver statistics), write it as JSON, or write the timed
+calls as a Chrome trace-event file (chrome://tracing or https://ui.perfetto.dev)
+
+classProgressReporter.__init__()
+- Initialization of the console reporter of a run: level 0 prints nothing, level 1 a progress line (step, simulation
+time, steps per second, remaining time), level 2 also the outputs of every element, level 3 the outputs of every step;
+levels 1 and 2 print at most once per interval of wall time
+
+classProgressReporter.start(nb_steps) / report(simulation, outputs_list) / finish(simulation)
+- Called by classSimulation at the start of a run, after every step and at the end of the run
+"""
+
+
+import json
+import os
+import sys
+import time
+
+import values_storage
+
+
+class classInstrumentation:
+
+    def __init__(self, trace=None, max_events=None):
+        parameters = values_storage.instrumentation_parameters
+
+        self.trace = parameters['trace'] if trace is None else trace  # Keep every timed call for the trace file
+        self.max_events = int(parameters['max_events'] if max_events is None else max_events)  # [-]
+
+        self.timers = {}  # [calls, wall time [s]] of each element type and method
+        self.property_calls = {}  # Number of property calls of each call site
+        self.statistics = {}  # Statistics of the solvers of each element
+        self.events = []  # (name, element type, start, duration) of the timed calls
+        self.originals = []  # (owner, name, original attribute) of the replaced methods
+
+        self.origin = time.perf_counter()  # [s] origin of the times of the trace
+        self.sites = {}  # Name of the call site of each code object
+
+    def start(self, classes=None, methods=None):
+        from fluid_properties import classFluidState
+        from friction import classFrictionSolver
+        from main_functions import known_classes
+        from tank_solver import classTankStateSolver
+        import CoolProp.CoolProp as CP
+
+        parameters = values_storage.instrumentation_parameters
+        if classes is None:
+            classes = list(known_classes.values()) + [classTankStateSolver, classFrictionSolver]
+        methods = parameters['methods'] if methods is None else methods
+
+        self.origin = time.perf_counter()
+        for element_class in classes:
+            for name in methods:
+                if name in vars(element_class):
+                    self.replace(element_class, name, self.timed(element_class.__name__, name,
+                                                                 vars(element_class)[name]))
+
+        for name in ('TQ', 'PQ', 'PT', 'HP', 'phase'):
+            self.replace(classFluidState, name, self.counted(name, vars(classFluidState)[name]))
+        self.replace(CP, 'PropsSI', self.counted('PropsSI', CP.PropsSI))
+
+        return self
+
+    def stop(self):
+        for owner, name, original in reversed(self.originals):
+            setattr(owner, name, original)
+        self.originals = []
+
+    def replace(self, owner, name, function):
+        self.originals.append((owner, name, getattr(owner, name) if not isinstance(owner, type)
+                               else vars(owner)[name]))
+        setattr(owner, name, function)
+
+    def timed(self, class_name, name, function):
+        timer = self.timers.setdefault(f'{class_name}.{name}', [0, 0.0])
+        events = self.events if self.trace else None
+        max_events = self.max_events
+        perf_counter = time.perf_counter
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                duration = perf_counter() - start
+                timer[0] += 1
+                timer[1] += duration
+                if events is not None and len(events) < max_events:
+                    events.append((name, class_name, start, duration))
+
+        timed_function.__wrapped__ = function
+        return timed_function
+
+    def counted(self, name, function):
+        calls = self.property_calls
+        sites = self.sites
+
+        def counted_function(*args, **kwargs):
+            # Call site: function of the caller (module.function)
+            code = sys._getframe(1).f_code
+            site = sites.get(code)
+            if site is None:
+                site = sites[code] = f'{os.path.splitext(os.path.basename(code.co_filename))[0]}.{code.co_name}'
+            key = f'{site}:{name}'
+            calls[key] = calls.get(key, 0) + 1
+
+            return function(*args, **kwargs)
+
+        counted_function.__wrapped__ = function
+        return counted_function
+
+    def collect(self, simulation):
+        for element, instance in zip(simulation.elements_with_no_extension, simulation.created_instances):
+            statistics = {}
+            if hasattr(instance, 'solver'):
+                statistics['temperature_solver'] = instance.solver.get_statistics()
+            if hasattr(instance, 'iteration'):
+                statistics['mass_energy_passes'] = instance.iteration.get_statistics()
+            if hasattr(instance, 'friction'):
+                statistics['colebrook_white'] = instance.friction.get_statistics()
+            if statistics:
+                self.statistics[element] = statistics
+
+        if simulation.network_solver is not None:
+            self.statistics['network_solver'] = simulation.network_solver.get_statistics()
+
+    def get_summary(self):
+        timers = {name: {'calls': calls, 'time': duration, 'mean_time': duration / calls if calls else 0.0}
+                  for name, (calls, duration) in sorted(self.timers.items(), key=lambda item: -item[1][1])}
+
+        return {'timers': timers,
+                'property_calls': dict(sorted(self.property_calls.items(), key=lambda item: -item[1])),
+                'total_property_calls': sum(self.property_calls.values()),
+                'solvers': self.statistics,
+                'nb_events': len(self.events)}
+
+    def export_summary(self, path):
+        with open(path, 'w') as sf:
+            json.dump(self.get_summary(), sf, indent=4)
+
+    def export_trace(self, path):
+        pid = os.getpid()
+        events = [{'name': f'{class_name}.{name}', 'cat': class_name, 'ph': 'X', 'pid': pid, 'tid': 0,
+                   'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6}
+                  for name, class_name, start, duration in self.events]
+
+        with open(path, 'w') as tf:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, tf)
+
+
+class classProgressReporter:
+
+    def __init__(self, level=None, interval=None, stream=None):
+        parameters = values_storage.instrumentation_parameters
+
+        self.level = int(parameters['progress_level'] if level is None else level)  # [-] 0 to 3
+        self.interval = parameters['progress_interval'] if interval is None else interval  # [s] between two reports
+        self.stream = sys.stdout if stream is None else stream
+
+        self.nb_steps = None  # [-] last step of the run (None when unknown)
+        self.start_time = time.perf_counter()
+        self.start_step = 0
+        self.last_report = 0.0
+
+    def start(self, first_step=0, nb_steps=None):
+        self.start_time = self.last_report = time.perf_counter()
+        self.start_step = first_step
+        self.nb_steps = nb_steps
+
+    def report(self, simulation, outputs_list, message=''):
+        now = time.perf_counter()
+        if self.level < 3 and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+
+        self.print_progress(simulation, now, message)
+        if self.level >= 2:
+            for element, outputs in zip(simulation.elements_with_no_extension, outputs_list):
+                print(f'Step: {simulation.step_index} Element: {element} | Output result:', *outputs,
+                      file=self.stream)
+
+    def print_progress(self, simulation, now, message=''):
+        nb_done = simulation.step_index - self.start_step
+        rate = nb_done / (now - self.start_time) if now > self.start_time else 0.0
+
+        line = f'Step {simulation.step_index}'
+        if self.nb_steps:
+            line += f'/{self.nb_steps}'
+        line += f' | time {simulation.time:.2f} s | {rate:.1f} steps/s'
+        if self.nb_steps and rate > 0:
+            line += f' | remaining {(self.nb_steps - simulation.step_index) / rate:.1f} s'
+        if message:
+            line += f' | {message}'
+
+        print(line, file=self.stream, flush=True)
+
+    def finish(self, simulation):
+        if self.level:
+            self.print_progress(simulation, time.perf_counter())
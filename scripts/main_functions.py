@@ -9,7 +9,7 @@ Jessen Page
 Florian Desmons
 
 Functions :
-read_main(path: str)
+read_main(path: str, network=values_storage)
 - Reads main.txt and gets name of element's .txt file and class that should be used along with .txt file
 and creates two lists of elements: one without extension that will be used for error_writer script;
 and the second list is used to give data to schema_painter to draw an image of schema
@@ -17,20 +17,35 @@ and the second list is used to give data to schema_painter to draw an image of s
 create_class_instance(params_file, class_name)
 - Based on name of element's .txt file and class that should be used along with .txt file, it creates an element of
 Class named after .txt file and uses values inside it to initialize new Class of type from main.txt
+(a ValueError is raised when the file cannot be read or the class cannot be created with its values)
 
-main_reader_script()
+main_reader_script(network=values_storage, verbose=True)
 - Main script that starts both function described above and shows result with values in console
 
+get_instance_parameters(instance)
+- Return the attributes of an element with the values of its state fields (kept in the state table of the simulation,
+see state_arrays.py) in place of its state view, for the console
+
 split_float(number: float, sep: str = ".", number_of_digits: int = 6)
 - Modifies float values, leaving only {number_of_digits} after the coma
 
-get_default_parameters()
+get_default_parameters(network=values_storage, verbose=True)
 - Reads file default_parameters.txt to get initial values to start the simulation
+
+set_default_parameters(parameters, network=values_storage, verbose=True)
+- Set the inlet stream of the simulation from values in the units of default_parameters.txt ([kg/s], [bar], [°C]),
+also used by the scenario files (see scenario.py)
+
+The network argument is the object holding the simulation data (data_path, created_instances, elements,
+elements_with_no_extension, parameters): the values_storage module by default, or a classSimulation
+instance (see simulation.py)
 """
 
 # Importing classes for elements
 from exchanger import classExchanger
+from mixer import classMixer
 from pipeline import classPipes
+from splitter import classSplitter
 from tank_central import classTankC
 from tank_substation import classTankS
 
@@ -49,15 +64,12 @@ known_classes = {
     "classTankC": classTankC,
     "classExchanger": classExchanger,
     "classTankS": classTankS,
+    "classSplitter": classSplitter,
+    "classMixer": classMixer,
 }
 
-# Create results directory if it doesn't exist
-if not os.path.exists(values_storage.results_path):
-    os.makedirs(values_storage.results_path)
-
-
 # Read and parse the main.txt file to get file names and class names
-def read_main(path: str) -> dict[str, str]:
+def read_main(path: str, network=values_storage) -> dict[str, str]:
     file_and_class_data = {}
 
     # Read the contents of main.txt file
@@ -71,8 +83,8 @@ def read_main(path: str) -> dict[str, str]:
     for line in lines:
         file_name, class_name = line.split()
         file_and_class_data[file_name] = class_name
-        values_storage.elements_with_no_extension.append(''.join(re.sub(r'.txt$', '', file_name)))
-        values_storage.elements.append(''.join(re.sub(r'_\d\.txt$', '', file_name)))  # Remove index from file name
+        network.elements_with_no_extension.append(''.join(re.sub(r'.txt$', '', file_name)))
+        network.elements.append(''.join(re.sub(r'_\d\.txt$', '', file_name)))  # Remove index from file name
 
     return file_and_class_data
 
@@ -89,33 +101,47 @@ def create_class_instance(params_file, class_name):
 
     # Extract parameter values
     for line in lines:
-        _, param_value = line.split()
-        params_list.append(float(param_value))
+        try:
+            _, param_value = line.split()
+            params_list.append(float(param_value))
+        except ValueError as e:
+            raise ValueError(f"Error reading {params_file}, line '{line}': {e}") from e
 
     try:
         # Create instance of the class using parameter values
         instance = known_classes[class_name](*params_list)
-        return instance
     except Exception as e:
-        print(f"Error creating class {class_name} with parameters {params_list}: {repr(e)}")
+        raise ValueError(f"Error creating class {class_name} with parameters {params_list}: {repr(e)}") from e
+
+    return instance
 
 
-def main_reader_script():
+def main_reader_script(network=values_storage, verbose=True):
     # Path to main.txt file
-    main_file_path = values_storage.data_path + "main.txt"
+    main_file_path = os.path.join(network.data_path, "main.txt")
 
     # Read main.txt and get file names and class names
-    param_files_and_classes = read_main(main_file_path)
+    param_files_and_classes = read_main(main_file_path, network)
 
     # Create instances of classes mentioned in main.txt
     for params_file, class_name in param_files_and_classes.items():
-        path = values_storage.data_path + params_file
+        path = os.path.join(network.data_path, params_file)
         result = create_class_instance(path, class_name)
-        values_storage.created_instances.append(result)
+        network.created_instances.append(result)
 
     # Print information about created instances
-    for ci in values_storage.created_instances:
-        print(f"Instance type: {type(ci)}\nInstance parameters: {vars(ci)}")
+    if verbose:
+        for ci in network.created_instances:
+            print(f"Instance type: {type(ci)}\nInstance parameters: {get_instance_parameters(ci)}")
+
+
+# Attributes of an element, with the dynamic variables of its row in the state table
+def get_instance_parameters(instance):
+    parameters = dict(vars(instance))
+    if 'state' in parameters:
+        parameters.update(parameters.pop('state').as_dict())
+
+    return parameters
 
 
 # Function to split float number and limit number of decimal digits
@@ -126,21 +152,28 @@ def split_float(number: float, sep: str = ".", number_of_digits: int = 6) -> flo
 
 
 # Function to get default parameters from default_parameters.txt file
-def get_default_parameters():
-    # Importing the CoolProp for calculation
-    import CoolProp.CoolProp as CP
-
-    with open(values_storage.data_path+'\default_parameters.txt') as dp:
+def get_default_parameters(network=values_storage, verbose=True):
+    parameters = {}
+    with open(os.path.join(network.data_path, 'default_parameters.txt')) as dp:
         lines = dp.read().split('\n')
         for line in lines:
             temp1, temp2 = line.split()
-            values_storage.parameters[temp1] = float(temp2)
+            parameters[temp1] = float(temp2)
+
+    set_default_parameters(parameters, network, verbose)
+
+
+# Function to set the inlet stream of the simulation from the values of default_parameters.txt
+def set_default_parameters(parameters, network=values_storage, verbose=True):
+    # Importing the CoolProp state for calculation
+    from fluid_properties import classFluidState
+
+    network.parameters.update(parameters)
 
-        print("************* ",values_storage.parameters['T_in'])
-        values_storage.parameters['T_in'] += 273.15 # From Celsius to Kelvin
-        print("************* ",values_storage.parameters['T_in'])
-        values_storage.parameters['p_in'] *= 1e5 # From Bar to Pascal
+    network.parameters['T_in'] += 273.15 # From Celsius to Kelvin
+    network.parameters['p_in'] *= 1e5 # From Bar to Pascal
 
-        values_storage.parameters['x_in'] = CP.PropsSI('Q', 'T', values_storage.parameters['T_in'], 'P',
-                                                       values_storage.parameters['p_in'], 'R744')
-        print('Default parameters:', values_storage.parameters)
+    network.parameters['x_in'] = classFluidState('R744').PT(network.parameters['p_in'],
+                                                            network.parameters['T_in'], 'Q')
+    if verbose:
+        print('Default parameters:', network.parameters)
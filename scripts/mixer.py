@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classMixer
+
+Functions :
+__init__()
+- Initialization of the mixer with its pressure drop
+
+enthalpy()
+- Specific enthalpy of an input stream (from T and x in the two-phase region, from p and T otherwise)
+
+mix()
+- Merge several input streams: the mass flow rates are added, the enthalpy is the mass-weighted mean of the inputs,
+the pressure is the lowest input pressure minus the pressure drop; saturated inputs stay saturated at the
+saturation temperature of the output pressure, otherwise the temperature and quality come from (h, p)
+
+update()
+- update function using new parameters (single input, only the pressure drop is applied)
+"""
+
+from fluid_properties import classFluidState
+
+
+class classMixer:
+
+    delta_p = 0
+
+    def __init__(self, delta_p):  # [Pa]
+
+        self.delta_p = delta_p  # [Pa] pressure drop of the mixer
+
+        self.fluid = classFluidState('R744')  # CoolProp state reused by the mixer
+
+    def enthalpy(self, p, T, x):
+        if 0.0 <= x <= 1.0:
+            return self.fluid.TQ(T, x, 'H')
+        return self.fluid.PT(p, T, 'H')
+
+    def mix(self, streams):
+        m_dot = sum(stream[0] for stream in streams)  # [kg/s]
+        p = min(stream[1] for stream in streams) - self.delta_p  # [Pa]
+
+        # Without flow, the mixer keeps the temperature of the first input
+        if m_dot <= 0:
+            return [m_dot, p, streams[0][2], streams[0][3]]
+
+        # Energy balance of the junction
+        h = sum(stream[0] * self.enthalpy(*stream[1:]) for stream in streams) / m_dot  # [J/kg]
+
+        # Saturated inputs give a saturated output: its temperature is given by the output pressure
+        if all(0.0 <= stream[3] <= 1.0 for stream in streams):
+            T, h_liquid = self.fluid.PQ(p, 0.0, 'T', 'H')  # [K], [J/kg]
+            h_gas = self.fluid.PQ(p, 1.0, 'H')  # [J/kg]
+            x = (h - h_liquid) / (h_gas - h_liquid)
+            if -1e-9 <= x <= 1.0 + 1e-9:
+                return [m_dot, p, T, min(max(x, 0.0), 1.0)]
+
+        T, x = self.fluid.HP(h, p, 'T', 'Q')
+
+        return [m_dot, p, T, x]
+
+    def update(self, m_dot, p, T, x):
+        return [m_dot, p - self.delta_p, T, x]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classNetworkGraph
+
+Functions :
+__init__()
+- Initialization of a network graph whose nodes are the elements of main.txt (names and instances)
+
+add_connection(source, target)
+- Add a directed connection: the output stream of the source element is an input stream of the target element
+
+read_topology(path)
+- Read the topology.txt file of a scenario: one connection per line, "source target" (e.g. "pipe_1 splitter_1")
+
+validate()
+- Check the connections: only a mixer may have several inputs and only a splitter several outputs (one output per
+fraction of the splitter)
+
+schedule()
+- Order the evaluation of the elements by topological sort; a cycle is broken at a storage element (an element
+with get_state(), e.g. the tanks): its inputs inside the cycle are taken from the previous step
+
+The steps are computed by the execution plan built from the order of schedule() (see execution_plan.py)
+"""
+
+
+import heapq
+
+from mixer import classMixer
+from splitter import classSplitter
+
+
+class classNetworkGraph:
+
+    def __init__(self, names, instances):
+
+        self.names = list(names)  # Names of the elements (main.txt without extension)
+        self.instances = list(instances)  # Elements, in the same order
+        self.ids = {name: element_id for element_id, name in enumerate(self.names)}
+
+        # Connections (source id, target id) and the connections of each element
+        self.connections = []
+        self.inputs = [[] for name in self.names]
+        self.outputs = [[] for name in self.names]
+
+        self.order = []  # Element ids in the order of evaluation
+        self.lagged = set()  # Connections whose stream comes from the previous step
+
+    def add_connection(self, source, target):
+        for name in (source, target):
+            if name not in self.ids:
+                raise ValueError(f'Unknown element {name} in connection {source} -> {target}')
+
+        connection = (self.ids[source], self.ids[target])
+        self.connections.append(connection)
+        self.outputs[connection[0]].append(connection)
+        self.inputs[connection[1]].append(connection)
+
+    def read_topology(self, path):
+        with open(path) as tf:
+            lines = [line.split() for line in tf.read().split('\n') if line.strip()]
+
+        for source, target in lines:
+            self.add_connection(source, target)
+
+    def validate(self):
+        for element_id, (name, instance) in enumerate(zip(self.names, self.instances)):
+            nb_inputs = len(self.inputs[element_id])
+            nb_outputs = len(self.outputs[element_id])
+
+            if nb_inputs > 1 and not isinstance(instance, classMixer):
+                raise ValueError(f'{name} has {nb_inputs} inputs, a mixer is required to merge streams')
+            if isinstance(instance, classSplitter):
+                if nb_outputs != len(instance.fractions):
+                    raise ValueError(f'{name} has {nb_outputs} outputs for {len(instance.fractions)} fractions')
+            elif nb_outputs > 1:
+                raise ValueError(f'{name} has {nb_outputs} outputs, a splitter is required to divide a stream')
+
+    def schedule(self):
+        self.validate()
+
+        in_degree = [len(inputs) for inputs in self.inputs]
+        remaining = set(range(len(self.names)))
+        self.order = []
+        self.lagged = set()
+
+        # Elements ready to be evaluated, in the order of main.txt
+        ready = [element_id for element_id in remaining if in_degree[element_id] == 0]
+        heapq.heapify(ready)
+
+        while remaining:
+            if not ready:
+                # Every remaining element is inside a cycle: the first storage element starts from its state
+                storages = [element_id for element_id in sorted(remaining)
+                            if hasattr(self.instances[element_id], 'get_state')]
+                if not storages:
+                    cycle = ', '.join(self.names[element_id] for element_id in sorted(remaining))
+                    raise ValueError(f'Cycle without storage element (tank) between {cycle}')
+
+                for connection in self.inputs[storages[0]]:
+                    if connection[0] in remaining:
+                        self.lagged.add(connection)
+                        in_degree[storages[0]] -= 1
+                heapq.heappush(ready, storages[0])
+                continue
+
+            element_id = heapq.heappop(ready)
+            self.order.append(element_id)
+            remaining.remove(element_id)
+            for connection in self.outputs[element_id]:
+                if connection not in self.lagged:
+                    in_degree[connection[1]] -= 1
+                    if in_degree[connection[1]] == 0:
+                        heapq.heappush(ready, connection[1])
+
+        return [self.names[element_id] for element_id in self.order]
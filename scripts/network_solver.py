@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classNetworkSolver
+
+Functions :
+__init__()
+- Initialization of the implicit solver of a classSimulation: each central tank is paired with the substation tank
+it feeds (resolved by the execution plan, see execution_plan.py) and the unknowns sharing a substation get different
+colors for the Jacobian
+
+residual(delta_p, state)
+- Compute the step from the saved state with the pressure difference of every central tank fixed to delta_p and
+return delta_p - (p central - p substation) at the end of the step (zero when the coupling is implicit); the
+statistics of the solvers of the elements are set back to the start of the step before the evaluation, so that a
+step only counts its accepted evaluation (see classSimulation.save_counters())
+
+jacobian(delta_p, residual, state)
+- Sparse finite-difference Jacobian of the residual: one evaluation of the step per color, returns the values of the
+non-zero entries
+
+solve_linear(values, residual)
+- Solve the sparse linear system of the Newton step
+
+solve()
+- Compute one step with a damped Newton method on the pressure-flow balance of all the central tanks (instead of
+the pressure of the substation of the previous step), returns the outputs of every element; when 8 halvings of the
+Newton step do not decrease the residual, the step is computed again at the current iterate and counted as a failure
+
+The sparse linear systems use scipy.sparse when it is installed, otherwise a dense NumPy solve
+"""
+
+
+import numpy as np
+
+import values_storage
+
+
+class classNetworkSolver:
+
+    def __init__(self, simulation, tolerance=None, max_iterations=None, perturbation=None):
+        parameters = values_storage.network_solver_parameters
+
+        self.simulation = simulation  # classSimulation computing the steps
+        self.tolerance = parameters['tolerance'] if tolerance is None else tolerance  # [Pa] residual tolerance
+        self.max_iterations = int(parameters['max_iterations'] if max_iterations is None else max_iterations)
+        self.perturbation = parameters['perturbation'] if perturbation is None else perturbation  # [Pa]
+
+        # Central tank and substation tank of each unknown
+        self.centrals = [central for central, substation in simulation.plan.couplings]
+        self.substations = [substation for central, substation in simulation.plan.couplings]
+        for central in self.centrals:
+            central.implicit_coupling = True
+
+        # Non-zero entries of the Jacobian: the unknowns of the central tanks feeding the same substation
+        self.rows, self.columns = [], []
+        for row, substation in enumerate(self.substations):
+            for column, other in enumerate(self.substations):
+                if other is substation:
+                    self.rows.append(row)
+                    self.columns.append(column)
+
+        # Greedy coloring: the unknowns of one color are perturbed together
+        self.colors = []
+        for unknown, substation in enumerate(self.substations):
+            for color in self.colors:
+                if all(self.substations[other] is not substation for other in color):
+                    color.append(unknown)
+                    break
+            else:
+                self.colors.append([unknown])
+
+        self.step_counters = None  # Statistics of the solvers of the elements at the start of the current step
+
+        # Statistics of the solver
+        self.nb_solves = 0
+        self.nb_iterations = 0
+        self.nb_evaluations = 0
+        self.nb_failures = 0
+
+    def residual(self, delta_p, state):
+        self.simulation.restore_state(state)
+        if self.step_counters is not None:
+            self.simulation.restore_counters(self.step_counters)
+        for central, value in zip(self.centrals, delta_p):
+            central.delta_p = value
+
+        outputs_list = self.simulation.compute_elements()
+        self.nb_evaluations += 1
+
+        pressures = np.array([central.p - substation.p
+                              for central, substation in zip(self.centrals, self.substations)])
+
+        return delta_p - pressures, outputs_list
+
+    def jacobian(self, delta_p, residual, state):
+        values = np.zeros(len(self.rows))
+        for color in self.colors:
+            step = np.zeros(len(delta_p))
+            step[color] = self.perturbation * np.maximum(1.0, np.abs(delta_p[color]) * 1e-6)
+            perturbed, _ = self.residual(delta_p + step, state)
+
+            # Each row only depends on one unknown of the color
+            for entry, (row, column) in enumerate(zip(self.rows, self.columns)):
+                if step[column] != 0.0:
+                    values[entry] = (perturbed[row] - residual[row]) / step[column]
+
+        return values
+
+    def solve_linear(self, values, residual):
+        try:
+            from scipy.sparse import csc_matrix
+            from scipy.sparse.linalg import spsolve
+        except ImportError:
+            matrix = np.zeros((len(residual), len(residual)))
+            matrix[self.rows, self.columns] = values
+            return np.linalg.solve(matrix, residual)
+
+        matrix = csc_matrix((values, (self.rows, self.columns)), shape=(len(residual), len(residual)))
+        return np.atleast_1d(spsolve(matrix, residual))
+
+    def solve(self):
+        state = self.simulation.save_state()
+        self.step_counters = self.simulation.save_counters()
+
+        # The pressure differences of the previous step are the first guess
+        delta_p = np.array([central.delta_p for central in self.centrals], dtype=float)
+        residual, outputs_list = self.residual(delta_p, state)
+        norm = np.max(np.abs(residual), initial=0.0)
+        counters = self.simulation.save_counters()  # Statistics of the accepted evaluation
+
+        converged = norm < self.tolerance
+        iteration = 0
+        while not converged and iteration < self.max_iterations:
+            iteration += 1
+            step = self.solve_linear(self.jacobian(delta_p, residual, state), residual)
+
+            # Damped Newton step: the step is halved until the residual decreases
+            damping = 1.0
+            for halving in range(8):
+                candidate = delta_p - damping * step
+                candidate_residual, candidate_outputs = self.residual(candidate, state)
+                candidate_norm = np.max(np.abs(candidate_residual))
+                if candidate_norm < norm:
+                    break
+                damping /= 2
+            else:
+                # No step decreases the residual: the step keeps the current iterate
+                residual, outputs_list = self.residual(delta_p, state)
+                counters = self.simulation.save_counters()
+                break
+
+            delta_p, residual, outputs_list, norm = candidate, candidate_residual, candidate_outputs, candidate_norm
+            counters = self.simulation.save_counters()
+            converged = norm < self.tolerance
+
+        # The state of the last evaluation is the state of the step, counted once
+        self.simulation.restore_counters(counters)
+        self.step_counters = None
+        for central, substation in zip(self.centrals, self.substations):
+            central.p_tankS = substation.p
+
+        self.nb_solves += 1
+        self.nb_iterations += iteration
+        if not converged:
+            self.nb_failures += 1
+
+        return outputs_list
+
+    def get_statistics(self):
+        return {'solves': self.nb_solves,
+                'iterations': self.nb_iterations,
+                'evaluations': self.nb_evaluations,
+                'failures': self.nb_failures,
+                'mean_iterations': self.nb_iterations / self.nb_solves if self.nb_solves else 0.0}
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Parameter sweep and Monte-Carlo runner over scenario folders.
+Run from the scripts folder : python parameter_sweep.py ../Tests/Tank/ sweep.json ../Tests/Tank/sweep --workers 8
+
+The sweep file is a JSON file with either a grid or random distributions of parameters. The parameters are named
+'<element file>:<parameter name>' as written inside the scenario folder, for example :
+{"grid": {"tankC_1.txt:Vtot_CO2_tank1_param": [0.5, 1.0, 2.0], "default_parameters.txt:m_dot_in": [0.3, 0.5]}}
+{"random": {"pipe_1.txt:d": ["uniform", 0.02, 0.05], "tankS_1.txt:Q_in": ["normal", 30000, 3000]},
+ "nb_runs": 100, "seed": 0}
+
+Functions :
+grid_variants(grid)
+- Return the list of all the combinations of the values of a grid
+
+random_variants(distributions, nb_runs, seed)
+- Return nb_runs variants drawn from 'uniform', 'normal' or 'choice' distributions
+
+write_variant(base_path, variant, variant_path)
+- Copy the files of the base scenario into variant_path and change the values of the variant, raise a ValueError
+when a parameter of the variant is not in the files of the scenario
+
+init_worker(backend)
+- Initializer of the worker processes: select the CoolProp backend and build the saturation table once per process
+
+run_variant(run_id, base_path, variant, variant_path, nb_steps, timeout)
+- Run one variant inside a worker and return its status and its results as rows of the combined table
+
+run_sweep(base_path, variants, output_path, nb_steps, nb_workers, timeout, backend)
+- Run all the variants over a process pool, appending the results to results.csv and the status of each run to
+runs.csv; the runs already done inside output_path are skipped (resume after a failure or an interruption)
+"""
+
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import values_storage
+
+
+def grid_variants(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_variants(distributions, nb_runs, seed=None):
+    rng = np.random.default_rng(seed)
+    variants = [{} for run in range(nb_runs)]
+
+    for name, distribution in distributions.items():
+        kind, *arguments = distribution
+        if kind == 'uniform':
+            values = rng.uniform(arguments[0], arguments[1], nb_runs)
+        elif kind == 'normal':
+            values = rng.normal(arguments[0], arguments[1], nb_runs)
+        elif kind == 'choice':
+            values = rng.choice(arguments, nb_runs)
+        else:
+            raise ValueError(f"Unknown distribution {kind} for parameter {name}")
+
+        for variant, value in zip(variants, values):
+            variant[name] = float(value)
+
+    return variants
+
+
+def write_variant(base_path, variant, variant_path):
+    os.makedirs(variant_path, exist_ok=True)
+
+    # Changed values of each file of the scenario
+    changes = {}
+    for name, value in variant.items():
+        file_name, parameter = name.split(':')
+        changes.setdefault(file_name, {})[parameter] = value
+
+    files = {}
+    applied = set()
+    for file_name in os.listdir(base_path):
+        if not file_name.endswith('.txt'):
+            continue
+
+        with open(os.path.join(base_path, file_name)) as bf:
+            lines = bf.read().split('\n')
+
+        if file_name in changes and file_name != 'main.txt':
+            for index, line in enumerate(lines):
+                if not line.strip():
+                    continue
+                parameter, _ = line.split()
+                if parameter in changes[file_name]:
+                    lines[index] = f'{parameter} {changes[file_name][parameter]}'
+                    applied.add(f'{file_name}:{parameter}')
+
+        files[file_name] = lines
+
+    # A parameter that is not in the scenario would run the base case under the name of the variant
+    missing = [name for name in variant if name not in applied]
+    if missing:
+        raise ValueError(f"Parameters {', '.join(missing)} not found in the scenario {base_path}")
+
+    for file_name, lines in files.items():
+        with open(os.path.join(variant_path, file_name), 'w') as vf:
+            vf.write('\n'.join(lines))
+
+
+def init_worker(backend):
+    from saturation_table import get_saturation_table
+
+    values_storage.property_backend = backend
+    get_saturation_table('R744')
+
+
+def run_variant(run_id, base_path, variant, variant_path, nb_steps, timeout=None):
+    from simulation import classSimulation
+
+    start = time.perf_counter()
+    try:
+        write_variant(base_path, variant, variant_path)
+        simulation = classSimulation(variant_path, variant_path)
+
+        for step in range(nb_steps):
+            simulation.step()
+            if timeout is not None and time.perf_counter() - start > timeout:
+                raise TimeoutError(f'Run {run_id} stopped after {step + 1} steps ({timeout} s)')
+
+        # One row per step and element
+        rows = []
+        for element, outputs in simulation.results().items():
+            for step in range(nb_steps):
+                rows.append({'run_id': run_id, 'step': step, 'element': element,
+                             **{channel: values[step] for channel, values in outputs.items()}})
+
+        return {'run_id': run_id, 'status': 'done', 'error': '', 'duration': time.perf_counter() - start}, rows
+
+    except Exception as e:
+        status = 'timeout' if isinstance(e, TimeoutError) else 'failed'
+        return {'run_id': run_id, 'status': status, 'error': ''.join(traceback.format_exception_only(e)).strip(),
+                'duration': time.perf_counter() - start}, []
+
+
+def run_sweep(base_path, variants, output_path, nb_steps, nb_workers=None, timeout=None, backend='HEOS'):
+    os.makedirs(output_path, exist_ok=True)
+    runs_path = os.path.join(output_path, 'runs.csv')
+    results_path = os.path.join(output_path, 'results.csv')
+
+    # Runs already done by a previous call
+    done = set()
+    if os.path.exists(runs_path):
+        runs = pd.read_csv(runs_path)
+        done = set(runs.loc[runs['status'] == 'done', 'run_id'])
+
+    pending = [(run_id, variant) for run_id, variant in enumerate(variants) if run_id not in done]
+    print(f'{len(variants)} runs, {len(done)} already done, {len(pending)} to compute')
+
+    with ProcessPoolExecutor(nb_workers, initializer=init_worker, initargs=(backend,)) as executor:
+        futures = {executor.submit(run_variant, run_id, base_path, variant,
+                                   os.path.join(output_path, 'variants', f'run_{run_id:06d}'), nb_steps, timeout):
+                   (run_id, variant) for run_id, variant in pending}
+
+        for future in as_completed(futures):
+            run_id, variant = futures[future]
+            run, rows = future.result()
+
+            # Results are appended as soon as a run finishes, so an interrupted sweep can be resumed
+            if rows:
+                table = pd.DataFrame(rows)
+                for name, value in variant.items():
+                    table[name] = value
+                table.to_csv(results_path, mode='a', header=not os.path.exists(results_path), index=False)
+
+            pd.DataFrame([{**run, **variant}]).to_csv(runs_path, mode='a', header=not os.path.exists(runs_path),
+                                                      index=False)
+            print(f"Run {run_id}: {run['status']} ({run['duration']:.2f} s) {run['error']}")
+
+    return pd.read_csv(results_path) if os.path.exists(results_path) else pd.DataFrame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parameter sweep and Monte-Carlo runs of a scenario folder')
+    parser.add_argument('base_path', help='folder of the base scenario (main.txt, element files, default parameters)')
+    parser.add_argument('sweep_file', help='JSON file with a "grid" or "random" description of the variants')
+    parser.add_argument('output_path', help='folder of the combined results (results.csv, runs.csv)')
+    parser.add_argument('--steps', type=int, default=50, help='number of time steps of each run')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (all the cores by default)')
+    parser.add_argument('--timeout', type=float, default=None, help='maximum duration of one run [s]')
+    parser.add_argument('--backend', default=values_storage.property_backend, help='CoolProp backend')
+    arguments = parser.parse_args()
+
+    with open(arguments.sweep_file) as sf:
+        sweep = json.load(sf)
+
+    if 'grid' in sweep:
+        variants = grid_variants(sweep['grid'])
+    else:
+        variants = random_variants(sweep['random'], sweep['nb_runs'], sweep.get('seed'))
+
+    # Keep the description of the sweep next to its results
+    os.makedirs(arguments.output_path, exist_ok=True)
+    shutil.copyfile(arguments.sweep_file, os.path.join(arguments.output_path, 'sweep.json'))
+
+    run_sweep(arguments.base_path, variants, arguments.output_path, arguments.steps, arguments.workers,
+              arguments.timeout, arguments.backend)
+
+
+if __name__ == "__main__":
+    main()
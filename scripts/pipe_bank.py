@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classPipeBank
+
+Functions :
+__init__()
+- Initialization of the parameters of all the pipes of the bank as NumPy arrays
+
+from_pipes(pipes)
+- Create a bank from a list of classPipes instances
+
+compute_properties(T_in, x_in)
+- Return the densities and viscosities of all the pipes (saturation table for saturated liquid or vapour, one
+CoolProp call per pipe for two-phase inputs or when use_table is False)
+
+compute_output_bank(m_dot_in, p_in, T_in, x_in)
+- Compute a step of all the pipes in one vectorized call, with the same model as classPipes.compute_output_pipe
+
+update(m_dot, p, T, x)
+- update function using new parameters (arrays or floats), selecting the state of each pipe as classPipes.update
+does
+
+quality(p, T, x)
+- Return the quality used by classPipes.update for an input stream (0, 1 or the two-phase quality), None when the
+state is not handled
+
+compute_output_chain(m_dot_in, p_in, T_in, x_in)
+- Compute a step of pipes in series (the output of each pipe is the input of the next one) with one property call:
+returns the inlet and outlet pressures of every pipe, as classPipes.compute_output_pipe called pipe after pipe
+"""
+
+
+from math import pi
+
+import numpy as np
+
+from fluid_properties import classFluidState
+from friction import friction_factors
+from saturation_table import get_saturation_table
+
+
+class classPipeBank:
+
+    def __init__(self, L, d, k, use_table=True):  # [m], [m], [m]
+
+        self.L = np.asarray(L, dtype=float)  # pipes length [m]
+        self.d = np.asarray(d, dtype=float)  # pipes diameter [m]
+        self.r = self.d / 2  # pipes radius [m]
+        self.k = np.asarray(k, dtype=float)  # pipes roughness [m]
+        self.nb_pipes = len(self.L)
+
+        self.use_table = use_table  # [-] use the saturation table instead of one CoolProp call per pipe
+        self.saturation = get_saturation_table('R744') if use_table else None
+        self.fluid = classFluidState('R744')
+
+        # Results of the last step
+        self.rho = np.zeros(self.nb_pipes)
+        self.fd = np.zeros(self.nb_pipes)
+
+    @classmethod
+    def from_pipes(cls, pipes, use_table=True):
+        return cls([pipe.L for pipe in pipes], [pipe.d for pipe in pipes], [pipe.k for pipe in pipes], use_table)
+
+    def compute_properties(self, T_in, x_in):
+        if not self.use_table:
+            properties = np.array([self.fluid.TQ(T, x, 'D', 'V') for T, x in zip(T_in, x_in)])
+            return properties[:, 0], properties[:, 1]
+
+        # Saturated liquid (x = 0) or vapour (x = 1) from the table
+        liquid = x_in < 0.5
+        rho = np.where(liquid, self.saturation.evaluate('rho_l', T_in), self.saturation.evaluate('rho_v', T_in))
+        mu = np.where(liquid, self.saturation.evaluate('mu_l', T_in), self.saturation.evaluate('mu_v', T_in))
+
+        # Two-phase inputs (e.g. the output of a mixer) from CoolProp at their quality
+        for i in np.flatnonzero((x_in > 0.0) & (x_in < 1.0)):
+            rho[i], mu[i] = self.fluid.TQ(T_in[i], x_in[i], 'D', 'V')
+
+        return rho, mu
+
+    def compute_output_bank(self, m_dot_in, p_in, T_in, x_in):
+        m_dot_in = np.broadcast_to(np.asarray(m_dot_in, dtype=float), (self.nb_pipes,))
+        p_in = np.broadcast_to(np.asarray(p_in, dtype=float), (self.nb_pipes,))
+        T_in = np.broadcast_to(np.asarray(T_in, dtype=float), (self.nb_pipes,))
+        x_in = np.broadcast_to(np.asarray(x_in, dtype=float), (self.nb_pipes,))
+
+        self.rho, mu = self.compute_properties(T_in, x_in)
+
+        # Reynolds number of each pipe (1000 when there is no flow, as in classPipes)
+        V = m_dot_in / self.rho / (pi * self.r ** 2)
+        Re = np.where(m_dot_in < 1e-10, 1000.0, self.rho * V * self.d / mu)
+
+        self.fd = friction_factors(Re, self.k, self.d)
+
+        # Calculation of the pressure loss inside the pipes
+        deltaP = m_dot_in ** 2 * (self.fd * self.L) / (4 * pi * self.rho * self.r ** 5)
+        p_out = p_in - deltaP
+
+        return m_dot_in, p_out, T_in, x_in
+
+    def update(self, m_dot, p, T, x):
+        p = np.broadcast_to(np.asarray(p, dtype=float), (self.nb_pipes,))
+        T = np.broadcast_to(np.asarray(T, dtype=float), (self.nb_pipes,))
+        x = np.broadcast_to(np.asarray(x, dtype=float), (self.nb_pipes,))
+
+        # Same selection of the state as classPipes.update (nan when the state is not handled)
+        x_state = np.full(self.nb_pipes, np.nan)
+        x_state[np.abs(x) < 1e-4] = 0.0
+        x_state[np.abs(x - 1.0) < 1e-4] = 1.0
+        two_phase = np.isnan(x_state) & (x > 0.0) & (x < 1.0)
+        x_state[two_phase] = x[two_phase]
+
+        for i in np.flatnonzero(x == -1.0):
+            phase = self.fluid.phase(p[i], T[i])
+            if phase == 'liquid':
+                x_state[i] = 0.0
+            elif phase == 'gas':
+                x_state[i] = 1.0
+
+        handled = ~np.isnan(x_state)
+        results = self.compute_output_bank(m_dot, p, T, np.where(handled, x_state, 1.0))
+
+        return [np.where(handled, result, np.nan) for result in results]
+
+    def quality(self, p, T, x):
+        if 0.0 - 1e-4 < x < 0.0 + 1e-4:
+            return 0.0
+        if 1.0 - 1e-4 < x < 1.0 + 1e-4:
+            return 1.0
+        if 0.0 < x < 1.0:
+            return x
+
+        if x == -1.0:
+            phase = self.fluid.phase(p, T)
+            if phase == 'liquid':
+                return 0.0
+            if phase == 'gas':
+                return 1.0
+
+        return None
+
+    def compute_output_chain(self, m_dot_in, p_in, T_in, x_in):
+        # In series the stream only loses pressure: m_dot, T and x, so the density and viscosity, are the same
+        # inside every pipe
+        rho, mu = self.fluid.TQ(T_in, x_in, 'D', 'V')
+        self.rho = np.full(self.nb_pipes, rho)
+
+        # Reynolds number of each pipe (1000 when there is no flow, as in classPipes)
+        if m_dot_in < 1e-10:
+            Re = np.full(self.nb_pipes, 1000.0)
+        else:
+            V = m_dot_in / rho / (pi * self.r ** 2)
+            Re = rho * V * self.d / mu
+
+        self.fd = friction_factors(Re, self.k, self.d)
+
+        # Pressure loss of each pipe, subtracted pipe after pipe from the inlet pressure of the chain
+        deltaP = m_dot_in ** 2 * (self.fd * self.L) / (4 * pi * rho * self.r ** 5)
+        p = np.subtract.accumulate(np.concatenate(([p_in], deltaP)))
+
+        return p[:-1], p[1:]
@@ -16,7 +16,7 @@ __init__()
 - Initialization of the pipe parameters
 
 compute_fd_colebrook_white()
-- compute the colebrook white model to calculate the fd parameter
+- compute the colebrook white model to calculate the fd parameter (shared solver of friction.py)
 
 compute_output_pipe()
 - Compute a step of the pipeline instance with the input values
@@ -25,11 +25,14 @@ get_pipe_parameters()
 - Return the pipe parameters needed into the tank central class
 
 update()
-- update function using new parameters
+- update function using new parameters (saturated liquid or gas, two-phase input with its quality, or single phase
+input with x = -1)
 """
 
 
-import CoolProp.CoolProp as CP
+from fluid_properties import classFluidState
+from friction import classFrictionSolver
+from state_arrays import add_state_fields, new_state
 
 
 class classPipes():
@@ -39,36 +42,24 @@ class classPipes():
     d = 0
     r = 0
     k = 0
-    rho = 0
-    fd = 0
 
-    # Simulation variables
-    m_dot_in = 0
-    p_in = 0
-    T_in = 0
-    x_in = 0
+    # Internal values recorded at every step with the outputs (see recorder.py)
+    state_channels = {'fd': 'fd'}
 
     def __init__(self, L, d, k):  # [m], [m], [m]
+        self.state = new_state(self)  # Row of the element, moved to the state table of its simulation by load()
+
         self.L = L    # pipe length [m]
         self.d = d    # pipe diameter [m]
         self.r = d/2  # pipe radius [m]
         self.k = k    # pipe roughness [m]
 
-    def compute_fd_colebrook_white(self, k, Re):
-        from math import log10
-
-        lamda_n = 0.0
-        lamda_np1 = 0.05
+        self.fluid = classFluidState('R744')  # CoolProp state reused by the pipe
+        self.friction = classFrictionSolver()  # Friction factor solver reused by the pipe
 
-        count = 0
-        while abs(lamda_n - lamda_np1) / lamda_np1 > 1e-9 and count < 1000:
-            count += 1
-            lamda_n = lamda_np1
-            lamda_np1 = -2 * log10(2.51 / Re / lamda_n ** 0.5 + k / 3.71 / self.d)
-            lamda_np1 = lamda_np1 ** 2
-            lamda_np1 = 1.0 / lamda_np1
-
-        return lamda_np1
+    def compute_fd_colebrook_white(self, k, Re):
+        # Shared Colebrook-White solver (explicit seed and Newton steps, see friction.py)
+        return self.friction.friction_factor(Re, k, self.d)
 
     def compute_output_pipe(self, m_dot_in, p_in, T_in, x_in):
         from math import pi
@@ -79,23 +70,17 @@ class classPipes():
         self.T_in = T_in
         self.x_in = x_in
 
-        self.rho = CP.PropsSI('D', 'T', T_in, 'Q', x_in, 'R744')
-        mu = CP.PropsSI('V', 'T', T_in, 'Q', x_in, 'R744')
+        self.rho, mu = self.fluid.TQ(T_in, x_in, 'D', 'V')
 
         # Pressure loss in the pipe
-        # Loop to converge to the real result of fd
-        for step in range(10):
+        # The Reynolds number only depends on the inlet values, fd is solved once
+        if m_dot_in < 1e-10:
+            Re = 1000
+        else:
+            V = m_dot_in / self.rho / (pi * self.r ** 2)
+            Re = self.rho * V * self.d / mu
 
-            if m_dot_in < 1e-10 and step == 0:
-                Re = 1000
-            elif step == 0:
-                V = m_dot_in / self.rho / (pi * self.r ** 2)
-                Re = self.rho * V * self.d / mu
-            else:
-                V = m_dot_in / self.rho / (pi * self.r ** 2)
-                Re = self.rho * V * self.d / mu
-
-            self.fd = self.compute_fd_colebrook_white(self.k, Re)
+        self.fd = self.compute_fd_colebrook_white(self.k, Re)
 
         # Calculation of the pressure loss inside the pipe
         deltaP = m_dot_in ** 2 * (self.fd * self.L) / (4 * pi * self.rho * self.r ** 5)
@@ -117,8 +102,12 @@ class classPipes():
         elif 1.0 - 1e-4 < x < 1.0 + 1e-4:
             result = list(self.compute_output_pipe(m_dot, p, T, 1.0))
 
+        elif 0.0 < x < 1.0:
+            # Two-phase input (e.g. the output of a mixer), the density and viscosity are taken at its quality
+            result = list(self.compute_output_pipe(m_dot, p, T, x))
+
         elif x == -1.0:
-            phase = CP.PhaseSI('P', p, 'T', T, 'R744')
+            phase = self.fluid.phase(p, T)
             if phase == 'liquid':
                 result = list(self.compute_output_pipe(m_dot, p, T, 0.0))
 
@@ -126,3 +115,7 @@ class classPipes():
                 result = list(self.compute_output_pipe(m_dot, p, T, 1.0))
 
         return result
+
+
+# Simulation variables of the pipes, one row per pipe in the table of their simulation (see state_arrays.py)
+add_state_fields(classPipes, {'m_dot_in': 0.0, 'p_in': 0.0, 'T_in': 0.0, 'x_in': 0.0, 'rho': 0.0, 'fd': 0.0})
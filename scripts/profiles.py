@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classProfile
+-classProfileBinding
+
+Functions :
+classProfile.__init__()
+- Initialization of a time-series read lazily from a CSV or xlsx file (one column of values, and a time column in
+seconds or dates, or a constant time_step between the rows); the dates are date cells of the xlsx files, ISO 8601
+texts or texts in one of date_formats (e.g. 31.12.2023 23:45 or 31/12/2023 23:45)
+
+classProfile.read_chunks()
+- Generator of the (times, values) NumPy arrays of the file, chunk_size rows at a time
+
+classProfile.next_chunk()
+- Move to the next chunk of the file: repeated times keep their last value, times going backwards raise a
+ValueError
+
+classProfile.value(t)
+- Value of the profile at the time t [s], linearly interpolated (the first and last values are held outside of the
+file); the time must not go backwards
+
+classProfile.get_cursor() / set_cursor(cursor)
+- Save and restore the reading position inside the file (rows already read and current chunk), used by the
+checkpoints of classSimulation
+
+classProfileBinding.__init__()
+- Link between a profile and the setter of an element (e.g. classExchanger.setQdot or classTankS.set_m_dot_out)
+
+classProfileBinding.apply(t)
+- Call the setter of the element with the value of the profile at the time t
+
+read_profiles_file(path)
+- Read the profiles.txt file of a scenario: one line per binding with the element name, the setter, the data file,
+the column and optionally the time column, e.g. "exchanger_1 setQdot heat_demand.csv Qdot_1 time"
+"""
+
+
+import os
+from datetime import datetime
+
+import numpy as np
+
+
+# Formats of the dates written as text (ISO 8601 dates are read directly), tried in this order
+date_formats = ('%d.%m.%Y %H:%M', '%d.%m.%Y %H:%M:%S', '%d.%m.%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y',
+                '%Y/%m/%d %H:%M', '%Y/%m/%d %H:%M:%S')
+
+
+class classProfile:
+
+    def __init__(self, path, column, time_column=None, time_step=60.0, sheet=None, chunk_size=10000, scale=1.0):
+
+        self.path = path  # CSV or xlsx file of the profile
+        self.column = column  # Name of the column of the values
+        self.time_column = time_column  # Name of the column of the times (None to use time_step)
+        self.time_step = time_step  # [s] time between two rows when there is no time column
+        self.sheet = sheet  # Sheet of the xlsx file (None for the active sheet)
+        self.chunk_size = int(chunk_size)  # [-] number of rows read at a time
+        self.scale = scale  # [-] factor applied to the values (e.g. kW to W)
+        self.date_format = None  # Format of the dates written as text, found on the first chunk
+
+        self.rewind()
+
+    def rewind(self):
+        self.chunks = self.read_chunks()
+        self.t0 = None  # First date of the file, when the times are dates
+        self.nb_rows = 0  # [-] rows already read
+
+        # Current chunk, starting with the last interval of the previous chunk
+        self.times = np.empty(0)
+        self.values = np.empty(0)
+        self.index = 0
+        self.finished = False
+
+    def read_chunks(self):
+        if self.path.endswith('.xlsx'):
+            yield from self.read_xlsx_chunks()
+        else:
+            import pandas as pd
+
+            columns = [self.column] if self.time_column is None else [self.time_column, self.column]
+            for chunk in pd.read_csv(self.path, usecols=columns, chunksize=self.chunk_size):
+                times = None if self.time_column is None else chunk[self.time_column].to_numpy()
+                yield self.convert_times(times, len(chunk)), chunk[self.column].to_numpy(dtype=float)
+
+    def read_xlsx_chunks(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[self.sheet] if self.sheet is not None else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+
+            header = list(next(rows))
+            value_index = header.index(self.column)
+            time_index = None if self.time_column is None else header.index(self.time_column)
+
+            times, values = [], []
+            for row in rows:
+                values.append(row[value_index])
+                if time_index is not None:
+                    times.append(row[time_index])
+
+                if len(values) == self.chunk_size:
+                    yield self.convert_times(times if time_index is not None else None, len(values)), \
+                        np.array(values, dtype=float)
+                    times, values = [], []
+
+            if values:
+                yield self.convert_times(times if time_index is not None else None, len(values)), \
+                    np.array(values, dtype=float)
+        finally:
+            workbook.close()
+
+    def convert_times(self, times, nb_rows):
+        first_row = self.nb_rows
+        self.nb_rows += nb_rows
+
+        # Constant time step between the rows
+        if times is None:
+            return (first_row + np.arange(nb_rows)) * self.time_step
+
+        # Dates are converted to seconds since the first date of the file
+        first = times[0]
+        if isinstance(first, str):
+            dates = self.parse_dates(times)
+        elif isinstance(first, (datetime, np.datetime64)) or hasattr(first, 'to_pydatetime'):
+            dates = np.array(times, dtype='datetime64[ns]')
+        else:
+            return np.asarray(times, dtype=float)
+
+        if self.t0 is None:
+            self.t0 = dates[0]
+        return (dates - self.t0) / np.timedelta64(1, 's')
+
+    def parse_dates(self, times):
+        import pandas as pd
+
+        times = [str(time).strip() for time in times]
+        if self.date_format is None:
+            try:
+                return np.array(times, dtype='datetime64[ns]')
+            except ValueError:
+                pass
+
+        formats = date_formats if self.date_format is None else (self.date_format,)
+        for date_format in formats:
+            try:
+                dates = pd.to_datetime(times, format=date_format).to_numpy(dtype='datetime64[ns]')
+            except ValueError:
+                continue
+            self.date_format = date_format
+            return dates
+
+        raise ValueError(f'Dates of {self.path} ({times[0]}, ...) are not in ISO 8601 or in one of the formats '
+                         f"{', '.join(date_formats)}")
+
+    def next_chunk(self):
+        try:
+            times, values = next(self.chunks)
+        except StopIteration:
+            self.finished = True
+            return False
+
+        if self.scale != 1.0:
+            values = values * self.scale
+
+        # Keep the last interval of the previous chunk to interpolate between the two chunks (its last value is only
+        # final once the next time is read)
+        if len(self.times):
+            times = np.concatenate((self.times[-2:], times))
+            values = np.concatenate((self.values[-2:], values))
+
+        # Repeated times (e.g. the hour repeated by the change to winter time) keep their last value
+        steps = np.diff(times)
+        if np.any(steps < 0):
+            raise ValueError(f'Times of {self.path} go backwards after {times[int(np.argmax(steps < 0))]:g} s')
+        if np.any(steps == 0):
+            kept = np.append(steps != 0, True)
+            times = times[kept]
+            values = values[kept]
+
+        self.times = times
+        self.values = values
+        self.index = 0
+        return True
+
+    def value(self, t):
+        if not len(self.times) and not self.next_chunk():
+            raise ValueError(f'Profile {self.column} of {self.path} is empty')
+
+        # Move forward inside the file until t is before the last point of the current chunk
+        while not self.finished and (len(self.times) < 2 or t > self.times[-2]):
+            if not self.next_chunk():
+                break
+
+        if t <= self.times[0]:
+            return float(self.values[0])
+        if t >= self.times[-1]:
+            return float(self.values[-1])
+
+        # Search from the last position, times only move forward
+        index = self.index
+        while self.times[index + 1] < t:
+            index += 1
+        self.index = index
+
+        weight = (t - self.times[index]) / (self.times[index + 1] - self.times[index])
+        return float(self.values[index] + weight * (self.values[index + 1] - self.values[index]))
+
+    def get_cursor(self):
+        return {'nb_rows': self.nb_rows, 'index': self.index, 'finished': self.finished,
+                'times': self.times.copy(), 'values': self.values.copy()}
+
+    def set_cursor(self, cursor):
+        self.rewind()
+
+        # The file is read again up to the chunk of the cursor
+        while self.nb_rows < cursor['nb_rows']:
+            next(self.chunks)
+
+        self.times = np.asarray(cursor['times'], dtype=float)
+        self.values = np.asarray(cursor['values'], dtype=float)
+        self.index = int(cursor['index'])
+        self.finished = bool(cursor['finished'])
+
+
+class classProfileBinding:
+
+    def __init__(self, profile, instance, setter):
+
+        self.profile = profile  # classProfile giving the values
+        self.instance = instance  # Element receiving the values
+        self.setter = getattr(instance, setter)  # Method of the element called with the values
+
+    def apply(self, t):
+        self.setter(self.profile.value(t))
+
+
+def read_profiles_file(path):
+    profiles = []
+
+    with open(path) as pf:
+        lines = [line.split() for line in pf.read().split('\n') if line.strip()]
+
+    for line in lines:
+        element, setter, file_name, column = line[:4]
+        time_column = line[4] if len(line) > 4 else None
+        profiles.append({'element': element,
+                         'setter': setter,
+                         'path': os.path.join(os.path.dirname(path), file_name),
+                         'column': column,
+                         'time_column': time_column})
+
+    return profiles
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classPropertyCache
+
+Functions :
+__init__()
+- Initialization of the cache parameters (maximum number of entries, quantization step of each input)
+
+quantize(name, value)
+- Round an input value on the quantization grid of its variable ('T', 'P', 'Q', 'H')
+
+get(key), put(key, values)
+- Read an entry (and mark it as recently used) or store an entry, evicting the least recently used one when the
+cache is full
+
+get_statistics()
+- Return the number of hits, misses and evictions and the hit rate of the cache
+
+export_statistics(path)
+- Write the statistics of the cache into a JSON file
+
+get_property_cache()
+- Return the cache shared by all the elements, created on the first call from values_storage.property_cache_parameters
+"""
+
+
+import json
+from collections import OrderedDict
+
+import values_storage
+
+
+class classPropertyCache:
+
+    def __init__(self, max_size=100000, quantization=None):
+
+        self.max_size = int(max_size)  # [-] maximum number of entries kept in the cache
+        self.quantization = dict(quantization or {})  # Quantization step of each input variable (0 = exact)
+        self.entries = OrderedDict()
+
+        # Statistics of the cache
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_evictions = 0
+
+    def quantize(self, name, value):
+        step = self.quantization.get(name, 0.0)
+        if step > 0.0:
+            # The property is evaluated on the grid point so the result does not depend on the first caller
+            return round(value / step) * step
+
+        return value
+
+    def get(self, key):
+        values = self.entries.get(key)
+        if values is None:
+            self.nb_misses += 1
+        else:
+            self.nb_hits += 1
+            self.entries.move_to_end(key)
+
+        return values
+
+    def put(self, key, values):
+        self.entries[key] = values
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.nb_evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_evictions = 0
+
+    def get_statistics(self):
+        nb_calls = self.nb_hits + self.nb_misses
+        return {'hits': self.nb_hits,
+                'misses': self.nb_misses,
+                'evictions': self.nb_evictions,
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hit_rate': self.nb_hits / nb_calls if nb_calls else 0.0}
+
+    def export_statistics(self, path):
+        with open(path, 'w') as sf:
+            json.dump(self.get_statistics(), sf, indent=4)
+
+
+# Cache shared by all the elements of the simulation (None until the first call)
+property_cache = None
+
+
+def get_property_cache():
+    global property_cache
+
+    if property_cache is None:
+        parameters = values_storage.property_cache_parameters
+        property_cache = classPropertyCache(parameters['max_size'], parameters['quantization'])
+
+    return property_cache
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classRecorder
+
+Functions :
+__init__()
+- Initialization of an empty recorder (nb_steps preallocates the arrays, otherwise they grow by chunks of
+chunk_size steps; with a sink, e.g. a classResultStore, full chunks are written to the sink and their arrays are
+reused so the memory stays constant)
+
+add_element(name, instance)
+- Register an element and its channels: the outputs of update() (m_dot, p, T, x) and the internal values declared
+by the class inside state_channels (e.g. {'m': 'm', 'U': 'U'} for the tanks), returns the id of the element
+
+record(element_id, outputs)
+- Store the outputs of an element and its internal values on the current step
+
+values(element_id, outputs)
+- Return the outputs of an element and its internal values as one array (row of the chunk of the element)
+
+record_values(element_id, values)
+- Store a row given by values() on the current step (e.g. interpolated between two steps of the adaptive time
+stepping)
+
+append(blocks)
+- Store several steps at once (one array of shape (number of steps, number of channels) per element), e.g. the
+results saved inside a checkpoint
+
+next_step()
+- Move to the next step, adding a new chunk (or writing it to the sink) when the current one is full
+
+flush()
+- Write the steps of the current chunk not yet written to the sink
+
+get(name, channel)
+- Return the values of one channel of one element as a NumPy array (read from the sink when there is one)
+
+results()
+- Return the values of all the channels, by element name and channel name
+"""
+
+
+from operator import attrgetter
+
+import numpy as np
+
+
+class classRecorder:
+
+    # Channels recorded from the outputs of update()
+    output_channels = ('m_dot', 'p', 'T', 'x')
+
+    def __init__(self, nb_steps=None, chunk_size=4096, sink=None):
+
+        self.sink = sink  # Storage of the full chunks (None to keep all the chunks in memory)
+        self.chunk_size = int(nb_steps if nb_steps and sink is None else chunk_size)  # [-] steps of each chunk
+        self.nb_steps = 0  # [-] number of steps recorded
+
+        # Description of each element, by id
+        self.names = []
+        self.instances = []
+        self.channels = []
+        self.state_getters = []
+        self.ids = {}  # Element id of each element name
+
+        # Chunks of each element, one array of shape (chunk_size, number of channels) per chunk
+        self.chunks = []
+        self.row = 0  # Row of the current step inside the last chunk
+        self.flushed_row = 0  # First row of the last chunk not yet written to the sink
+
+    def add_element(self, name, instance):
+        state_channels = getattr(instance, 'state_channels', {})
+
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+        self.instances.append(instance)
+        self.channels.append(self.output_channels + tuple(state_channels))
+        self.state_getters.append(attrgetter(*state_channels.values()) if state_channels else None)
+        self.chunks.append([np.full((self.chunk_size, len(self.channels[-1])), np.nan)])
+
+        if self.sink is not None:
+            self.sink.add_element(name, self.channels[-1])
+
+        return self.ids[name]
+
+    def record(self, element_id, outputs):
+        chunk = self.chunks[element_id][-1]
+        chunk[self.row, :4] = outputs
+
+        getter = self.state_getters[element_id]
+        if getter is not None:
+            chunk[self.row, 4:] = getter(self.instances[element_id])
+
+    def values(self, element_id, outputs):
+        values = np.empty(len(self.channels[element_id]))
+        values[:4] = outputs
+
+        getter = self.state_getters[element_id]
+        if getter is not None:
+            values[4:] = getter(self.instances[element_id])
+
+        return values
+
+    def record_values(self, element_id, values):
+        self.chunks[element_id][-1][self.row] = values
+
+    def append(self, blocks):
+        nb_steps = len(blocks[0]) if blocks else 0
+
+        start = 0
+        while start < nb_steps:
+            # Rows left inside the current chunk
+            count = min(nb_steps - start, self.chunk_size - self.row)
+            for element_id, block in enumerate(blocks):
+                self.chunks[element_id][-1][self.row:self.row + count] = block[start:start + count]
+
+            # The last row goes through next_step() to start a new chunk when the current one is full
+            self.row += count - 1
+            self.nb_steps += count - 1
+            self.next_step()
+            start += count
+
+    def next_step(self):
+        self.nb_steps += 1
+        self.row += 1
+
+        # Start a new chunk for every element when the current one is full
+        if self.row == self.chunk_size:
+            if self.sink is not None:
+                # The full chunk is written and its arrays are reused
+                self.flush()
+                for chunks in self.chunks:
+                    chunks[-1].fill(np.nan)
+            else:
+                for chunks, channels in zip(self.chunks, self.channels):
+                    chunks.append(np.full((self.chunk_size, len(channels)), np.nan))
+
+            self.row = 0
+            self.flushed_row = 0
+
+    def flush(self):
+        if self.sink is None or self.row == self.flushed_row:
+            return
+
+        self.sink.write_steps({name: chunks[-1][self.flushed_row:self.row]
+                               for name, chunks in zip(self.names, self.chunks)})
+        self.flushed_row = self.row
+
+    def get(self, name, channel):
+        if self.sink is not None:
+            self.flush()
+            return self.sink.read(name, channel)
+
+        element_id = self.ids[name]
+        column = self.channels[element_id].index(channel)
+        chunks = self.chunks[element_id]
+
+        # A single chunk is returned as a view, several chunks are joined
+        if len(chunks) == 1:
+            return chunks[0][:self.nb_steps, column]
+
+        return np.concatenate([chunk[:, column] for chunk in chunks])[:self.nb_steps]
+
+    def results(self):
+        return {name: {channel: self.get(name, channel) for channel in channels}
+                for name, channels in zip(self.names, self.channels)}
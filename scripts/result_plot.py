@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Plots of the results written as self-contained HTML files (plotly.js is inside the file, no connection is needed).
+Run from the scripts folder :
+python result_plot.py ../Tests/Tank/results/store
+python result_plot.py ../Tests/Tank/results/store --start 1000 --end 1200
+
+Every channel is reduced to about values_storage.plot_parameters['nb_points'] points before it is written: a long
+run gives a file of the same size as a short one. The reduction keeps the shape of the curves (the minimum and the
+maximum of every bucket of steps, or the Largest-Triangle-Three-Buckets points), a time window of fewer steps than
+nb_points is plotted at full resolution: zooming on a window of a long run is done by plotting the window again from
+the result store (--start and --end, or python -m roadmap plot)
+
+Functions :
+min_max(x, y, nb_points)
+- Indices of the minimum and of the maximum of every bucket of steps (nb_points / 2 buckets), in time order;
+vectorized, the NaN values are only kept by the buckets without other values
+
+lttb(x, y, nb_points)
+- Indices of the points chosen by the Largest-Triangle-Three-Buckets method: the first and the last points, and in
+every bucket the point forming the largest triangle with the point kept in the previous bucket and the mean of the
+next bucket
+
+decimate(x, y, nb_points, method)
+- Return the points of a channel reduced by min_max or lttb (the channel itself when it has at most nb_points values)
+
+plot_results(results, path, time=None, show=False, nb_points=None, method=None, title=None)
+- Write the figure of the results (by element name and channel name, as classSimulation.results() returns them) as
+an HTML file, one WebGL trace (Scattergl) per channel of values_storage.plot_parameters['channels'] (m_dot, p in
+bar, T in Celsius and x); the x axis is the step number, or the times [s] given by time; opened in the browser when
+show is True
+
+plot_store(store_path, path=None, t_start=None, t_end=None, show=False, nb_points=None, method=None)
+- Plot the steps of a result store between two times [s] (the whole run by default), only the steps of the window
+are read from the files of the store; written as results.html next to the store, or results_<t_start>_<t_end>.html
+for a window
+"""
+
+
+import argparse
+import os
+
+import numpy as np
+
+import values_storage
+
+
+def min_max(x, y, nb_points):
+    nb_buckets = max(nb_points // 2, 1)
+    size = -(-len(y) // nb_buckets)  # [-] steps per bucket
+    nb_buckets = -(-len(y) // size)
+
+    # Buckets as the rows of a table, the last one completed with NaN
+    values = np.full(nb_buckets * size, np.nan)
+    values[:len(y)] = y
+    values = values.reshape(nb_buckets, size)
+    nan = np.isnan(values)
+
+    offsets = np.arange(nb_buckets) * size
+    lowest = np.argmin(np.where(nan, np.inf, values), axis=1) + offsets
+    highest = np.argmax(np.where(nan, -np.inf, values), axis=1) + offsets
+    indices = np.sort(np.stack((lowest, highest), axis=1), axis=1).ravel()
+
+    # Same point for a constant bucket
+    indices = np.minimum(indices, len(y) - 1)
+    return indices[np.concatenate(([True], np.diff(indices) != 0))]
+
+
+def lttb(x, y, nb_points):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, len(y) - 1, max(nb_points, 3) - 1).astype(int)
+
+    indices = np.empty(len(edges) + 1, dtype=int)
+    indices[0] = 0
+    for number in range(len(edges) - 1):
+        start, end = edges[number], edges[number + 1]
+        x_kept, y_kept = x[indices[number]], y[indices[number]]
+
+        # Mean of the next bucket (its values that are not NaN)
+        if number + 2 < len(edges):
+            y_values = y[end:edges[number + 2]]
+            y_values = y_values[~np.isnan(y_values)]
+            x_next = x[end:edges[number + 2]].mean()
+            y_next = y_values.mean() if len(y_values) else y_kept
+        else:
+            x_next, y_next = x[-1], y[-1]
+
+        areas = np.abs((x_kept - x_next) * (y[start:end] - y_kept) - (x_kept - x[start:end]) * (y_next - y_kept))
+        indices[number + 1] = start + (int(np.nanargmax(areas)) if not np.all(np.isnan(areas)) else 0)
+    indices[-1] = len(y) - 1
+
+    return indices
+
+
+def decimate(x, y, nb_points=None, method=None):
+    parameters = values_storage.plot_parameters
+    nb_points = parameters['nb_points'] if nb_points is None else nb_points
+    method = parameters['method'] if method is None else method
+
+    if len(y) <= nb_points:
+        return np.asarray(x), np.asarray(y)
+
+    if method == 'minmax':
+        indices = min_max(x, y, nb_points)
+    elif method == 'lttb':
+        indices = lttb(x, y, nb_points)
+    else:
+        raise ValueError(f'Unknown decimation method {method}, minmax or lttb is expected')
+
+    return np.asarray(x)[indices], np.asarray(y)[indices]
+
+
+def plot_results(results, path, time=None, show=False, nb_points=None, method=None, title=None):
+    # Library for graphics outputs
+    import plotly.graph_objects as go
+
+    channels = values_storage.plot_parameters['channels']
+
+    fig = go.Figure()
+    for element, outputs in results.items():
+        for channel, (factor, offset) in channels.items():
+            if channel not in outputs:
+                continue
+            values = outputs[channel]
+            steps = np.arange(len(values)) if time is None else time[:len(values)]
+
+            x, y = decimate(steps, values, nb_points, method)
+            fig.add_trace(go.Scattergl(x=x, y=y * factor + offset, mode='lines', name=f'{channel}_{element}'))
+
+    fig.update_layout(xaxis_title='Step №' if time is None else 'Time [s]',
+                      yaxis_title='Value',
+                      title=title)
+
+    fig.write_html(path, include_plotlyjs=True, full_html=True, auto_open=show)
+
+    return path
+
+
+def plot_store(store_path, path=None, t_start=None, t_end=None, show=False, nb_points=None, method=None):
+    from result_store import classResultStore
+
+    store = classResultStore(store_path, 'r')
+    if path is None:
+        name = 'results.html'
+        if t_start is not None or t_end is not None:
+            name = f"results_{t_start or 0:g}_{'end' if t_end is None else f'{t_end:g}'}.html"
+        path = os.path.join(os.path.dirname(os.path.abspath(store_path)), name)
+
+    # Only the steps of the window are read (memory-mapped files)
+    results = {element: {channel: store.read(element, channel, t_start, t_end) for channel in channels}
+               for element, channels in store.index['elements'].items()}
+    time = store.time(t_start, t_end)
+
+    nb_points = values_storage.plot_parameters['nb_points'] if nb_points is None else nb_points
+    resolution = 'full resolution' if len(time) <= nb_points else f'{nb_points} points per channel'
+    title = f'{len(time)} steps ({time[0]:g} s to {time[-1]:g} s), {resolution}' if len(time) else 'No steps'
+
+    return plot_results(results, path, time, show, nb_points, method, title)
+
+
+def main(argv=None):
+    parameters = values_storage.plot_parameters
+
+    parser = argparse.ArgumentParser(description='Plot the results of a result store as an HTML file')
+    parser.add_argument('store', help='result store folder')
+    parser.add_argument('--output', default=None, help='HTML file written (next to the store by default)')
+    parser.add_argument('--start', type=float, default=None, help='start of the time window [s]')
+    parser.add_argument('--end', type=float, default=None, help='end of the time window [s]')
+    parser.add_argument('--points', type=int, default=parameters['nb_points'], help='points per channel')
+    parser.add_argument('--method', default=parameters['method'], choices=('minmax', 'lttb'),
+                        help='decimation method')
+    parser.add_argument('--show', action='store_true', help='open the file in the browser')
+    arguments = parser.parse_args(argv)
+
+    print(plot_store(arguments.store, arguments.output, arguments.start, arguments.end, arguments.show,
+                     arguments.points, arguments.method))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classResultStore
+
+Functions :
+__init__()
+- Creation (mode 'w') or opening (mode 'r', or 'a' to append new steps) of a result folder: one raw binary file per
+element and channel (<element>/<channel>.bin) and a small index.json describing the elements, channels, time step
+and number of steps
+
+add_element(name, channels)
+- Register the channels of an element before writing its values (in mode 'a', an element already stored with the
+same channels keeps its values)
+
+truncate(nb_steps)
+- Remove the steps written after nb_steps (e.g. after the last checkpoint of an interrupted run)
+
+write(name, block)
+- Append a block of steps (array of shape (number of steps, number of channels)) at the end of the files of an element
+(the steps are only published in the index by write_steps())
+
+write_steps(blocks)
+- Append the same steps for every element (one block per element name), then publish them in the index
+
+close()
+- Write the index of the store (it is also rewritten after every call of write_steps())
+
+read(name, channel, t_start, t_end)
+- Return the values of a channel between two times [s] as a slice of a memory-mapped array (no copy)
+
+time(t_start, t_end)
+- Return the times [s] of the steps between two times
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+
+class classResultStore:
+
+    def __init__(self, path, mode='r', time_step=1.0, dtype='float64'):
+
+        self.path = path  # Folder of the store
+        self.mode = mode  # 'w' to write a new store, 'r' to read an existing one, 'a' to append to an existing one
+        self.maps = {}  # Memory-mapped files already opened by read()
+
+        if mode == 'w':
+            os.makedirs(path, exist_ok=True)
+            self.index = {'version': 1, 'dtype': dtype, 'time_step': time_step, 'nb_steps': 0, 'elements': {}}
+        else:
+            with open(os.path.join(path, 'index.json')) as fi:
+                self.index = json.load(fi)
+
+        self.dtype = np.dtype(self.index['dtype'])
+
+    def add_element(self, name, channels):
+        if self.mode == 'a' and self.index['elements'].get(name) == list(channels):
+            return
+
+        self.index['elements'][name] = list(channels)
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+
+        # Start from empty files
+        for channel in channels:
+            open(self.file_path(name, channel), 'wb').close()
+
+    def truncate(self, nb_steps):
+        for name, channels in self.index['elements'].items():
+            for channel in channels:
+                os.truncate(self.file_path(name, channel), nb_steps * self.dtype.itemsize)
+
+        self.index['nb_steps'] = nb_steps
+        self.maps = {}
+        self.close()
+
+    def file_path(self, name, channel):
+        return os.path.join(self.path, name, f'{channel}.bin')
+
+    def write(self, name, block):
+        block = np.asarray(block, dtype=self.dtype)
+        for column, channel in enumerate(self.index['elements'][name]):
+            with open(self.file_path(name, channel), 'ab') as cf:
+                cf.write(np.ascontiguousarray(block[:, column]).tobytes())
+
+    def write_steps(self, blocks):
+        # Files of every element first: a reader never maps steps that some files do not have yet
+        nb_steps = None
+        for name, block in blocks.items():
+            if nb_steps is not None and len(block) != nb_steps:
+                raise ValueError(f'Block of {name} has {len(block)} steps, {nb_steps} are expected')
+            nb_steps = len(block)
+            self.write(name, block)
+
+        if nb_steps:
+            self.index['nb_steps'] += nb_steps
+            self.close()
+
+    def close(self):
+        # Atomic replacement so that a reader never sees a partial index
+        index_path = os.path.join(self.path, 'index.json')
+        with open(index_path + '.tmp', 'w') as fi:
+            json.dump(self.index, fi)
+        os.replace(index_path + '.tmp', index_path)
+
+    def step_range(self, t_start=None, t_end=None):
+        start = 0 if t_start is None else max(int(np.ceil(t_start / self.index['time_step'] - 1e-9)), 0)
+        end = self.index['nb_steps'] if t_end is None else int(np.floor(t_end / self.index['time_step'] + 1e-9)) + 1
+
+        return start, min(end, self.index['nb_steps'])
+
+    def read(self, name, channel, t_start=None, t_end=None):
+        key = (name, channel)
+        if key not in self.maps or len(self.maps[key]) != self.index['nb_steps']:
+            if self.index['nb_steps'] == 0:
+                return np.empty(0, dtype=self.dtype)
+            self.maps[key] = np.memmap(self.file_path(name, channel), dtype=self.dtype, mode='r',
+                                       shape=(self.index['nb_steps'],))
+
+        start, end = self.step_range(t_start, t_end)
+        return self.maps[key][start:end]
+
+    def time(self, t_start=None, t_end=None):
+        start, end = self.step_range(t_start, t_end)
+        return np.arange(start, end) * self.index['time_step']
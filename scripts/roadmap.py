@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Command line entry point of the simulation.
+Run from the scripts folder :
+python -m roadmap run ../Tests/Tank/ --steps 1000 --headless
+python -m roadmap plot ../Tests/Tank/results/store --start 10 --end 20
+python -m roadmap convert ../Tests/Tank/ ../Tests/Tank.json
+python -m roadmap importtime
+
+Only the standard library is imported with this module: the simulation, the plots (plotly) and the schema
+(matplotlib) are imported by the commands that use them, so that the batch and sweep workers do not pay for them
+
+Functions :
+run_scenario(arguments)
+- Load a scenario (folder or file, see scenario.py) and run it; the results are streamed to a result store inside
+the results folder, the schema (drawn by a separate process during the run) and the plot of the results are only
+drawn when they are asked for (with --profile, the summary and the trace of the instrumentation are written next
+to them, see instrumentation.py)
+
+plot_scenario_results(arguments)
+- Plot a result store, or a time window of a result store at full resolution, as a self-contained HTML file (the
+channels are decimated to a fixed number of points, see result_plot.py)
+
+convert_scenario(arguments)
+- Convert a scenario folder into a scenario file
+
+measure_import_time(module)
+- Import a module inside a new interpreter with python -X importtime, returns the level, name, self time [s] and
+cumulative time [s] of every module imported
+
+check_import_time(arguments)
+- Print the slowest imports of a batch worker (import simulation) and compare the total, every module counted, with
+the budget of values_storage.cli_parameters; CoolProp is only imported by the first fluid state (see
+fluid_properties.py), its import time is printed apart: a worker pays it once, when it loads its first scenario, and
+it is larger than the budget by itself (the fluid library is initialized by the import)
+"""
+
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import values_storage
+
+
+def run_scenario(arguments):
+    # Without display, matplotlib must not look for a window system
+    if arguments.headless:
+        os.environ.setdefault('MPLBACKEND', 'Agg')
+
+    from simulation import classSimulation
+
+    start = time.perf_counter()
+
+    scenario_path = arguments.scenario
+    if not os.path.exists(scenario_path):
+        raise FileNotFoundError(f'Scenario {scenario_path} does not exist')
+
+    results_path = arguments.results
+    if results_path is None:
+        base_path = scenario_path if os.path.isdir(scenario_path) else os.path.dirname(scenario_path)
+        results_path = os.path.join(base_path, 'results')
+    os.makedirs(results_path, exist_ok=True)
+
+    # Timers and counters installed before the elements are created
+    instrumentation = None
+    if arguments.profile:
+        from instrumentation import classInstrumentation
+        instrumentation = classInstrumentation().start()
+
+    store_path = arguments.store if arguments.store is not None else os.path.join(results_path, 'store')
+    simulation = classSimulation(scenario_path, results_path, verbose=arguments.verbose, store_path=store_path,
+                                 implicit=arguments.implicit or None, progress=arguments.progress)
+
+    # The schema only depends on the network: drawn during the run by a separate process
+    schema = None
+    if arguments.schema:
+        from schema_painter import draw_schema, draw_schema_in_background, get_network
+        if values_storage.schema_parameters['background']:
+            schema = draw_schema_in_background(**get_network(simulation), file_format=arguments.schema_format,
+                                               results_path=results_path)
+        else:
+            draw_schema(**get_network(simulation), file_format=arguments.schema_format, results_path=results_path)
+
+    checkpoint_path = arguments.checkpoint
+    if arguments.resume:
+        checkpoint_path = checkpoint_path or os.path.join(results_path, 'checkpoint.npz')
+        if os.path.exists(checkpoint_path):
+            simulation.resume(checkpoint_path)
+
+    simulation.run(max(arguments.steps - simulation.step_index, 0), checkpoint_path=checkpoint_path)
+    print(f'{simulation.step_index} steps ({simulation.time:g} s) computed in {time.perf_counter() - start:.2f} s, '
+          f'results in {store_path}')
+
+    if instrumentation is not None:
+        instrumentation.stop()
+        instrumentation.collect(simulation)
+        instrumentation.export_summary(os.path.join(results_path, 'instrumentation.json'))
+        instrumentation.export_trace(os.path.join(results_path, 'trace.json'))
+
+    if schema is not None:
+        schema.join()
+
+    if arguments.plot:
+        from result_plot import plot_store
+        plot_store(store_path, os.path.join(results_path, 'results.html'), show=not arguments.headless)
+
+    return simulation
+
+
+def plot_scenario_results(arguments):
+    from result_plot import plot_store
+
+    print(plot_store(arguments.store, arguments.output, arguments.start, arguments.end, show=not arguments.headless,
+                     nb_points=arguments.points, method=arguments.method))
+
+
+def convert_scenario(arguments):
+    from scenario import import_directory, write_scenario
+
+    write_scenario(import_directory(arguments.folder), arguments.file)
+
+
+def measure_import_time(module):
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if process.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{process.stderr}')
+
+    # Lines "import time: self [us] | cumulative [us] | module", nested modules are indented by 2 spaces per level
+    imports = []
+    for line in process.stderr.split('\n'):
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((level, name.strip(), int(self_time) * 1e-6, int(cumulative) * 1e-6))
+
+    return imports
+
+
+def check_import_time(arguments):
+    parameters = values_storage.cli_parameters
+    budget = parameters['import_budget'] if arguments.budget is None else arguments.budget
+
+    imports = measure_import_time(arguments.module)
+    total = sum(cumulative for level, name, self_time, cumulative in imports if level == 0)
+
+    for level, name, self_time, cumulative in sorted(imports, key=lambda item: -item[2])[:10]:
+        print(f'{self_time * 1e3:10.1f} ms  {name}')
+
+    print(f'Import time of {arguments.module}: {total * 1e3:.1f} ms (budget {budget * 1e3:.0f} ms)')
+
+    # Fluid library imported by the first fluid state of the worker
+    if not any(name == 'CoolProp' for level, name, self_time, cumulative in imports):
+        coolprop = sum(cumulative for level, name, self_time, cumulative in measure_import_time('CoolProp.CoolProp')
+                       if name.split('.')[0] == 'CoolProp' and level == 0)
+        print(f'CoolProp is imported by the first scenario loaded: {coolprop * 1e3:.1f} ms more, '
+              f'{(total + coolprop) * 1e3:.1f} ms to start a worker')
+
+    return total <= budget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m roadmap', description='Simulation of a CO2 network')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run a scenario')
+    run_parser.add_argument('scenario', help='scenario folder (main.txt and the element files) or scenario file')
+    run_parser.add_argument('--steps', type=int, default=values_storage.cli_parameters['nb_steps'],
+                            help='total number of time steps')
+    run_parser.add_argument('--results', default=None, help='results folder (<scenario>/results by default)')
+    run_parser.add_argument('--store', default=None, help='result store (<results>/store by default)')
+    run_parser.add_argument('--implicit', action='store_true', help='implicit coupling of the tanks')
+    run_parser.add_argument('--checkpoint', default=None, help='checkpoint written during the run')
+    run_parser.add_argument('--resume', action='store_true', help='continue from the checkpoint when it exists')
+    run_parser.add_argument('--schema', action='store_true', help='draw the schema of the network (schema.png)')
+    run_parser.add_argument('--schema-format', default=None, choices=('png', 'svg'),
+                            help='format of the schema (values_storage.schema_parameters by default)')
+    run_parser.add_argument('--plot', action='store_true', help='plot the results (results.html)')
+    run_parser.add_argument('--headless', action='store_true', help='never open a window or a browser')
+    run_parser.add_argument('--verbose', action='store_true', help='print the elements and their outputs')
+    run_parser.add_argument('--progress', type=int, default=None, choices=range(4),
+                            help='0 silent, 1 progress line, 2 progress and outputs, 3 outputs of every step')
+    run_parser.add_argument('--profile', action='store_true',
+                            help='time the methods of the elements and count the property calls '
+                                 '(instrumentation.json and trace.json)')
+
+    plot_parser = commands.add_parser('plot', help='plot a result store (or a time window of it) as an HTML file')
+    plot_parser.add_argument('store', help='result store folder')
+    plot_parser.add_argument('--output', default=None, help='HTML file written (next to the store by default)')
+    plot_parser.add_argument('--start', type=float, default=None, help='start of the time window [s]')
+    plot_parser.add_argument('--end', type=float, default=None, help='end of the time window [s]')
+    plot_parser.add_argument('--points', type=int, default=None, help='points per channel')
+    plot_parser.add_argument('--method', default=None, choices=('minmax', 'lttb'), help='decimation method')
+    plot_parser.add_argument('--headless', action='store_true', help='do not open the file in the browser')
+
+    convert_parser = commands.add_parser('convert', help='convert a scenario folder into a scenario file')
+    convert_parser.add_argument('folder', help='scenario folder')
+    convert_parser.add_argument('file', help='scenario file written')
+
+    import_parser = commands.add_parser('importtime', help='measure the import time of a batch worker')
+    import_parser.add_argument('--module', default='simulation', help='module imported')
+    import_parser.add_argument('--budget', type=float, default=None, help='budget [s]')
+
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'run':
+        run_scenario(arguments)
+    elif arguments.command == 'plot':
+        plot_scenario_results(arguments)
+    elif arguments.command == 'convert':
+        convert_scenario(arguments)
+    elif arguments.command == 'importtime':
+        if not check_import_time(arguments):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
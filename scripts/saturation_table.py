@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classSaturationTable
+
+Functions :
+__init__()
+- Initialization of the table parameters (fluid, temperature range, number of points)
+
+build()
+- Evaluate p_sat, rho_l, rho_v, u_l, u_v, mu_l and mu_v with CoolProp on a uniform temperature grid and compute the node
+derivatives used by the cubic Hermite interpolation
+
+check_accuracy()
+- Compare the interpolation with CoolProp in the middle of every interval and store the maximum relative error of
+each property inside error_bound (the interpolation itself is checked, also when use_coolprop is True)
+
+saturated(T)
+- Return (p_sat, rho_l, rho_v, u_l, u_v) at the temperature T (CoolProp is used outside the table range or when
+use_coolprop is True)
+
+pressure(T), density(T, Q), internal_energy(T, Q)
+- Return a single saturation property, mixing liquid and vapour values with the quality Q
+
+interpolate(name, T)
+- Vectorized interpolation of one property for a NumPy array of temperatures (inside the table range)
+
+evaluate(name, T)
+- Same as interpolate(), with CoolProp outside the table range or when use_coolprop is True
+
+get_saturation_table(fluid)
+- Return the table shared by all the elements of the simulation, building it on the first call
+"""
+
+
+import numpy as np
+
+import values_storage
+from fluid_properties import load_coolprop
+
+
+class classSaturationTable:
+
+    # Properties stored in the table and their CoolProp output names and qualities
+    properties = {
+        'p': ('P', 0),
+        'rho_l': ('D', 0),
+        'rho_v': ('D', 1),
+        'u_l': ('U', 0),
+        'u_v': ('U', 1),
+        'mu_l': ('V', 0),
+        'mu_v': ('V', 1),
+    }
+
+    # Properties returned together by saturated()
+    saturated_properties = ('p', 'rho_l', 'rho_v', 'u_l', 'u_v')
+
+    def __init__(self, fluid='R744', T_min=217.0, T_max=303.5, nb_points=1500, use_coolprop=False):
+
+        self.fluid = fluid  # [-] CoolProp fluid name
+        self.T_min = T_min  # [K] lowest temperature of the table
+        self.T_max = T_max  # [K] highest temperature of the table (stay below the critical point)
+        self.nb_points = int(nb_points)  # [-] number of nodes of the table
+        self.use_coolprop = use_coolprop  # [-] bypass the table and call CoolProp (accuracy check)
+
+        self.dT = (self.T_max - self.T_min) / (self.nb_points - 1)  # [K] distance between two nodes
+        self.values = {}  # Node values of each property
+        self.slopes = {}  # Node derivatives (multiplied by dT) of each property
+        self.error_bound = {}  # Maximum relative error of each property, filled by check_accuracy()
+
+    def build(self, check=True):
+        CP = load_coolprop()
+        T_nodes = np.linspace(self.T_min, self.T_max, self.nb_points)
+
+        for name, (output, Q) in self.properties.items():
+            values = np.array([CP.PropsSI(output, 'T', T, 'Q', Q, self.fluid) for T in T_nodes])
+
+            # Fourth order central differences inside the table, second order on both edges
+            slopes = np.gradient(values, edge_order=2)
+            slopes[2:-2] = (-values[4:] + 8 * values[3:-1] - 8 * values[1:-3] + values[:-4]) / 12
+
+            self.values[name] = values
+            self.slopes[name] = slopes
+
+        # Python lists are faster than NumPy arrays to index with a single scalar
+        self._rows = list(zip(*(self.values[name].tolist() for name in self.saturated_properties)))
+        self._slope_rows = list(zip(*(self.slopes[name].tolist() for name in self.saturated_properties)))
+
+        if check:
+            self.check_accuracy()
+
+        return self
+
+    def check_accuracy(self):
+        CP = load_coolprop()
+
+        # The error of a cubic Hermite interpolation is the largest in the middle of the intervals
+        T_check = np.linspace(self.T_min, self.T_max, self.nb_points)[:-1] + self.dT / 2
+
+        for name, (output, Q) in self.properties.items():
+            reference = np.array([CP.PropsSI(output, 'T', T, 'Q', Q, self.fluid) for T in T_check])
+            self.error_bound[name] = float(np.max(np.abs(self.interpolate(name, T_check) / reference - 1)))
+
+        return self.error_bound
+
+    def saturated(self, T):
+        position = (T - self.T_min) / self.dT
+
+        # Outside of the table (or in check mode) the properties come directly from CoolProp
+        if self.use_coolprop or not 0.0 <= position < self.nb_points - 1:
+            CP = load_coolprop()
+            return tuple(CP.PropsSI(self.properties[name][0], 'T', T, 'Q', self.properties[name][1], self.fluid)
+                         for name in self.saturated_properties)
+
+        # Cubic Hermite basis functions
+        i = int(position)
+        t = position - i
+        t2 = t * t
+        t3 = t2 * t
+        h00 = 2 * t3 - 3 * t2 + 1
+        h10 = t3 - 2 * t2 + t
+        h01 = -2 * t3 + 3 * t2
+        h11 = t3 - t2
+
+        left, right = self._rows[i], self._rows[i + 1]
+        slope_left, slope_right = self._slope_rows[i], self._slope_rows[i + 1]
+
+        return tuple(h00 * left[j] + h10 * slope_left[j] + h01 * right[j] + h11 * slope_right[j]
+                     for j in range(5))
+
+    def pressure(self, T):
+        return self.saturated(T)[0]
+
+    def density(self, T, Q):
+        _, rho_l, rho_v, _, _ = self.saturated(T)
+        # Specific volumes are mixed linearly with the quality
+        return 1.0 / ((1.0 - Q) / rho_l + Q / rho_v)
+
+    def internal_energy(self, T, Q):
+        _, _, _, u_l, u_v = self.saturated(T)
+        return u_l + Q * (u_v - u_l)
+
+    def interpolate(self, name, T):
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        position = (T - self.T_min) / self.dT
+        i = np.clip(position.astype(int), 0, self.nb_points - 2)
+
+        t = position - i
+        t2 = t * t
+        t3 = t2 * t
+
+        values = self.values[name]
+        slopes = self.slopes[name]
+        return ((2 * t3 - 3 * t2 + 1) * values[i] + (t3 - 2 * t2 + t) * slopes[i]
+                + (-2 * t3 + 3 * t2) * values[i + 1] + (t3 - t2) * slopes[i + 1])
+
+    def evaluate(self, name, T):
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        position = (T - self.T_min) / self.dT
+        result = self.interpolate(name, T)
+
+        # Points outside of the table (or all the points in check mode) are computed by CoolProp
+        outside = (position < 0) | (position > self.nb_points - 1) | self.use_coolprop
+        if np.any(outside):
+            CP = load_coolprop()
+            output, Q = self.properties[name]
+            result = np.where(outside, 0.0, result)
+            result[outside] = [CP.PropsSI(output, 'T', value, 'Q', Q, self.fluid) for value in T[outside]]
+
+        return result
+
+
+# Tables already built in this process, one per fluid
+saturation_tables = {}
+
+
+def get_saturation_table(fluid='R744'):
+    if fluid not in saturation_tables:
+        saturation_tables[fluid] = classSaturationTable(fluid, **values_storage.saturation_parameters).build()
+
+    return saturation_tables[fluid]
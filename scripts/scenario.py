@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Functions :
+read_scenario(path)
+- Read a scenario file (JSON), check it against the schema below and return its compiled network: the compiled
+network is kept as JSON next to the scenario (<scenario>.compiled.json) and reused as long as the content of the
+scenario does not change (key: SHA-256 hash of the file)
+
+read_compiled(path, key) / write_compiled(path, key, compiled)
+- Read or write the compiled network of a scenario file, a cache file of another content or version is ignored
+
+check_scenario(scenario)
+- Check a scenario against the schema, raise a ValueError listing every error found
+
+compile_scenario(scenario)
+- Convert a checked scenario into its compiled network: the constructor arguments of every element in the order of
+its class, the connections and the profiles
+
+import_directory(path)
+- Compatibility importer of the scenario folders (main.txt, one text file per element, default_parameters.txt and
+the optional topology.txt and profiles.txt): the positional values of the element files are named after the
+parameters of the constructor of their class
+
+write_scenario(scenario, path)
+- Write a scenario as a JSON file (e.g. python scenario.py ../Tests/Tank ../Tests/Tank.json)
+
+load_scenario(path, network=values_storage, verbose=True)
+- Create the elements of a scenario file or folder inside a network (as main_reader_script() and
+get_default_parameters() of main_functions.py), returns the compiled network
+
+Scenario file:
+{"version": 1,
+ "parameters": {"m_dot_in": 0.5, "p_in": 64.35, "T_in": 10.0},  [kg/s], [bar], [°C] (as default_parameters.txt)
+ "elements": [{"name": "tankC_1", "class": "classTankC", "parameters": {"x": 0.7, "T": 298.15, "V": 1.0, "ts": 0.5}},
+              {"name": "splitter_1", "class": "classSplitter", "parameters": {"fractions": [0.5, 0.5]}}, ...],
+ "connections": [["tankC_1", "pipe_1"], ...],  optional, as topology.txt (the elements form a chain otherwise)
+ "profiles": [{"element": "tankS_1", "setter": "set_m_dot_out", "path": "demand.csv", "column": "m",
+               "time_column": "t"}, ...]}  optional, as profiles.txt (paths relative to the scenario file)
+"""
+
+
+import hashlib
+import inspect
+import json
+import os
+import re
+
+import values_storage
+from main_functions import get_instance_parameters, known_classes, set_default_parameters
+
+
+# Version of the scenario files, and of the compiled networks kept in the cache files
+scenario_version = 1
+
+# Parameters of the constructor of each class, read once
+constructors_parameters = {}
+
+
+def read_scenario(path):
+    with open(path, 'rb') as sf:
+        content = sf.read()
+    key = hashlib.sha256(content).hexdigest()
+
+    # Compiled network of the same content
+    cache_path = path + '.compiled.json'
+    if values_storage.scenario_parameters['cache']:
+        compiled = read_compiled(cache_path, key)
+        if compiled is not None:
+            return compiled
+
+    try:
+        scenario = json.loads(content.decode('utf-8'))
+    except ValueError as e:
+        raise ValueError(f'Scenario {path} is not a valid JSON file: {e}') from e
+
+    check_scenario(scenario)
+    compiled = compile_scenario(scenario)
+
+    if values_storage.scenario_parameters['cache']:
+        write_compiled(cache_path, key, compiled)
+
+    return compiled
+
+
+def read_compiled(path, key):
+    # Plain JSON data: the cache never runs code, a file of another content or version is ignored
+    try:
+        with open(path, 'r') as cf:
+            cache = json.load(cf)
+        if cache['key'] != key or cache['version'] != scenario_version:
+            return None
+        compiled = cache['compiled']
+        elements = [(name, class_name, tuple(arguments)) for name, class_name, arguments in compiled['elements']]
+        if any(class_name not in known_classes for _, class_name, _ in elements):
+            return None
+
+        return {'version': compiled['version'],
+                'parameters': {name: float(value) for name, value in compiled['parameters'].items()},
+                'elements': elements,
+                'connections': [tuple(connection) for connection in compiled['connections']],
+                'profiles': compiled['profiles']}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_compiled(path, key, compiled):
+    # Atomic replacement so that a concurrent load never reads a partial cache
+    try:
+        with open(path + '.tmp', 'w') as cf:
+            json.dump({'key': key, 'version': scenario_version, 'compiled': compiled}, cf)
+        os.replace(path + '.tmp', path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def get_constructor_parameters(class_name):
+    if class_name not in constructors_parameters:
+        signature = inspect.signature(known_classes[class_name].__init__)
+        constructors_parameters[class_name] = list(signature.parameters.values())[1:]
+
+    return constructors_parameters[class_name]
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_scenario(scenario):
+    errors = []
+
+    if not isinstance(scenario, dict):
+        raise ValueError('Scenario must be a JSON object')
+
+    for key in scenario:
+        if key not in ('version', 'parameters', 'elements', 'connections', 'profiles'):
+            errors.append(f'unknown key {key}')
+    if scenario.get('version') != scenario_version:
+        errors.append(f"version {scenario.get('version')}, version {scenario_version} is expected")
+
+    # Inlet stream
+    parameters = scenario.get('parameters')
+    if not isinstance(parameters, dict):
+        errors.append('parameters must be an object')
+    else:
+        for name in ('m_dot_in', 'p_in', 'T_in'):
+            if not is_number(parameters.get(name)):
+                errors.append(f'parameters.{name} must be a number')
+
+    # Elements and the parameters of their constructor
+    elements = scenario.get('elements')
+    names = set()
+    if not isinstance(elements, list) or not elements:
+        errors.append('elements must be a non-empty list')
+        elements = []
+
+    for number, element in enumerate(elements):
+        if not isinstance(element, dict):
+            errors.append(f'elements[{number}] must be an object')
+            continue
+
+        name = element.get('name')
+        if not isinstance(name, str) or not name:
+            errors.append(f'elements[{number}].name must be a non-empty string')
+            continue
+        if name in names:
+            errors.append(f'element {name} is defined twice')
+        names.add(name)
+
+        class_name = element.get('class')
+        if class_name not in known_classes:
+            errors.append(f'element {name}: unknown class {class_name}')
+            continue
+
+        values = element.get('parameters')
+        if not isinstance(values, dict):
+            errors.append(f'element {name}: parameters must be an object')
+            continue
+
+        expected = get_constructor_parameters(class_name)
+        expected_names = [parameter.name for parameter in expected]
+        for parameter in expected:
+            value = values.get(parameter.name)
+            if parameter.kind == parameter.VAR_POSITIONAL:
+                if not isinstance(value, list) or not all(is_number(item) for item in value):
+                    errors.append(f'element {name}: {parameter.name} must be a list of numbers')
+            elif parameter.name not in values:
+                if parameter.default is parameter.empty:
+                    errors.append(f'element {name}: missing parameter {parameter.name}')
+            elif not is_number(value):
+                errors.append(f'element {name}: {parameter.name} must be a number')
+
+        for parameter_name in values:
+            if parameter_name not in expected_names:
+                errors.append(f'element {name}: unknown parameter {parameter_name} of {class_name}')
+
+    # Connections between the elements
+    connections = scenario.get('connections', [])
+    if not isinstance(connections, list):
+        errors.append('connections must be a list')
+        connections = []
+    for connection in connections:
+        if not isinstance(connection, list) or len(connection) != 2:
+            errors.append(f'connection {connection} must be a [source, target] pair')
+            continue
+        for name in connection:
+            if name not in names:
+                errors.append(f'connection {connection}: unknown element {name}')
+
+    # Time-series bound to the elements
+    profiles = scenario.get('profiles', [])
+    if not isinstance(profiles, list):
+        errors.append('profiles must be a list')
+        profiles = []
+    for profile in profiles:
+        if not isinstance(profile, dict):
+            errors.append(f'profile {profile} must be an object')
+            continue
+        if profile.get('element') not in names:
+            errors.append(f"profile: unknown element {profile.get('element')}")
+        for key in ('setter', 'path', 'column'):
+            if not isinstance(profile.get(key), str):
+                errors.append(f"profile of {profile.get('element')}: {key} must be a string")
+
+    if errors:
+        raise ValueError('Invalid scenario:\n' + '\n'.join(f'- {error}' for error in errors))
+
+
+def compile_scenario(scenario):
+    elements = []
+
+    for element in scenario['elements']:
+        # Positional arguments in the order of the constructor
+        arguments = []
+        for parameter in get_constructor_parameters(element['class']):
+            if parameter.kind == parameter.VAR_POSITIONAL:
+                arguments.extend(float(value) for value in element['parameters'][parameter.name])
+            elif parameter.name in element['parameters']:
+                arguments.append(float(element['parameters'][parameter.name]))
+            else:
+                arguments.append(parameter.default)
+
+        elements.append((element['name'], element['class'], tuple(arguments)))
+
+    profiles = [{'element': profile['element'],
+                 'setter': profile['setter'],
+                 'path': profile['path'],
+                 'column': profile['column'],
+                 'time_column': profile.get('time_column')} for profile in scenario.get('profiles', [])]
+
+    return {'version': scenario_version,
+            'parameters': {name: float(value) for name, value in scenario['parameters'].items()},
+            'elements': elements,
+            'connections': [tuple(connection) for connection in scenario.get('connections', [])],
+            'profiles': profiles}
+
+
+def import_directory(path):
+    from profiles import read_profiles_file
+
+    scenario = {'version': scenario_version, 'parameters': {}, 'elements': []}
+
+    with open(os.path.join(path, 'default_parameters.txt')) as dp:
+        for line in dp.read().split('\n'):
+            if line.strip():
+                name, value = line.split()
+                scenario['parameters'][name] = float(value)
+
+    with open(os.path.join(path, 'main.txt')) as mf:
+        lines = [line.split() for line in mf.read().split('\n') if line.strip()]
+
+    for file_name, class_name in lines:
+        if class_name not in known_classes:
+            raise ValueError(f'Unknown class {class_name} of {file_name}')
+
+        values = []
+        with open(os.path.join(path, file_name)) as pf:
+            for line in pf.read().split('\n'):
+                if not line.strip():
+                    continue
+                try:
+                    _, value = line.split()
+                    values.append(float(value))
+                except ValueError as e:
+                    raise ValueError(f"Error reading {file_name}, line '{line}': {e}") from e
+
+        # Values named after the parameters of the constructor, in order
+        parameters = {}
+        expected = get_constructor_parameters(class_name)
+        for number, parameter in enumerate(expected):
+            if parameter.kind == parameter.VAR_POSITIONAL:
+                parameters[parameter.name] = values[number:]
+                break
+            if number < len(values):
+                parameters[parameter.name] = values[number]
+        else:
+            if len(values) > len(expected):
+                raise ValueError(f'{file_name} has {len(values)} values for the {len(expected)} parameters of '
+                                 f'{class_name}')
+
+        scenario['elements'].append({'name': re.sub(r'\.txt$', '', file_name), 'class': class_name,
+                                     'parameters': parameters})
+
+    topology_path = os.path.join(path, 'topology.txt')
+    if os.path.exists(topology_path):
+        with open(topology_path) as tf:
+            scenario['connections'] = [line.split() for line in tf.read().split('\n') if line.strip()]
+
+    profiles_path = os.path.join(path, 'profiles.txt')
+    if os.path.exists(profiles_path):
+        scenario['profiles'] = [{**profile, 'path': os.path.relpath(profile['path'], path)}
+                                for profile in read_profiles_file(profiles_path)]
+
+    return scenario
+
+
+def write_scenario(scenario, path):
+    with open(path, 'w') as sf:
+        json.dump(scenario, sf, indent=2)
+
+
+def load_scenario(path, network=values_storage, verbose=True):
+    if os.path.isdir(path):
+        # Scenario folder: imported and checked at every load
+        scenario = import_directory(path)
+        check_scenario(scenario)
+        compiled = compile_scenario(scenario)
+        base_path = path
+    else:
+        compiled = read_scenario(path)
+        base_path = os.path.dirname(path)
+
+    for name, class_name, arguments in compiled['elements']:
+        try:
+            instance = known_classes[class_name](*arguments)
+        except Exception as e:
+            raise ValueError(f'Error creating element {name} of class {class_name} with parameters {arguments}: '
+                             f'{repr(e)}') from e
+
+        network.created_instances.append(instance)
+        network.elements_with_no_extension.append(name)
+        network.elements.append(re.sub(r'_\d+$', '', name))  # Remove index from element name
+
+    if verbose:
+        for ci in network.created_instances:
+            print(f"Instance type: {type(ci)}\nInstance parameters: {get_instance_parameters(ci)}")
+
+    set_default_parameters(compiled['parameters'], network, verbose)
+
+    # Profile files relative to the scenario
+    compiled = {**compiled, 'profiles': [{**profile, 'path': os.path.join(base_path, profile['path'])}
+                                         for profile in compiled['profiles']]}
+
+    return compiled
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert a scenario folder into a scenario file')
+    parser.add_argument('folder', help='scenario folder (main.txt and the element files)')
+    parser.add_argument('file', help='scenario file written')
+    arguments = parser.parse_args()
+
+    write_scenario(import_directory(arguments.folder), arguments.file)
@@ -8,229 +8,279 @@ Jessen Page
 Florian Desmons
 
 Functions :
-draw_schema(elements)
-- Main function that takes list of the elements and starts to draw a scheme based on received list and screen_parameters
-that is already provided in code
-
-get_coordinates(row)
-- Function that creates 2 rows of elements and gives them coordinates based on their quantity and taking into account
-that they always should be centered
-
-draw_simple_arrow(posA, posB, delta_x=0.0, delta_y=0.0)
-- Draw a simple arrow based on coordinates of start, coordinates of end,
-offset on x axes(if required) and offset on y axes(if required)
-
-draw_curved_arrow(posA, posB, rad=0.0)
-- Draw a curved arrow based on coordinates of start, coordinates of end and curvature modifier
-
-draw_image(path, posXY)
-- Draw an image based on its path + name + image extension(.png) and coordinates where this image will be created
+draw_schema(elements, results_path=None, names=None, connections=None, file_format=None)
+- Main function that takes list of the elements (types, e.g. tankC), their names and connections and draws the schema
+of the network (saved as schema.png or schema.svg inside results_path, values_storage.results_path by default); the
+elements form a chain closed by the last element when there are no connections (as main.txt)
+
+draw_schema_in_background(elements, results_path=None, names=None, connections=None, file_format=None)
+- Draw the schema inside a separate process so that the simulation is not held up, returns the process (join() waits
+for the schema)
+
+get_network(simulation)
+- Return the element types, names and connections of a loaded simulation (keyword arguments of draw_schema)
+
+get_icon(element)
+- Return the image of an element type, decoded once per process (None when the type has no icon)
+
+compute_layout(nb_elements, connections)
+- Layered layout of the network graph: the elements are placed in columns by longest path from the sources (cycles
+are broken at their first element as in network_graph.py, the connections that close a cycle are returned apart),
+ordered inside their column by the mean position of their inputs, and the columns are folded in rows (one row out
+of two from right to left) so that the schema keeps the ratio of a screen; linear in the number of connections
+
+The schema is drawn with one artist per group (connections, arrow heads, icons of an element type or markers of an
+element type above values_storage.schema_parameters['icon_limit'] elements), a 1 000-element network takes a few
+seconds
 """
 
 
-# Define the main function which creates the schema
-def draw_schema(elements):
-    # Libraries that are required to draw an image
-    from matplotlib.patches import FancyArrowPatch
+import math
+import os
+
+# Folder of the icons of the elements
+icons_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'icons')
+
+# Images of the element types, decoded once
+icons = {}
+
+
+def get_icon(element):
+    if element not in icons:
+        from matplotlib.image import imread
+
+        path = os.path.join(icons_path, f'{element}.png')
+        icons[element] = imread(path) if os.path.exists(path) else None
+
+    return icons[element]
+
+
+def get_network(simulation):
+    connections = None
+    if simulation.graph is not None:
+        connections = [(simulation.graph.names[source], simulation.graph.names[target])
+                       for source, target in simulation.graph.connections]
+
+    return {'elements': list(simulation.elements), 'names': list(simulation.elements_with_no_extension),
+            'connections': connections}
+
+
+def compute_layout(nb_elements, connections):
+    inputs = [[] for element_id in range(nb_elements)]
+    outputs = [[] for element_id in range(nb_elements)]
+    for source, target in connections:
+        outputs[source].append(target)
+        inputs[target].append(source)
+
+    # Topological order, a cycle is broken at its first element (its inputs inside the cycle close the cycle)
+    in_degree = [len(element_inputs) for element_inputs in inputs]
+    remaining = set(range(nb_elements))
+    ready = [element_id for element_id in range(nb_elements) if in_degree[element_id] == 0]
+    order = []
+    closing = set()
+
+    while remaining:
+        if not ready:
+            element_id = min(remaining)
+            for source in inputs[element_id]:
+                if source in remaining:
+                    closing.add((source, element_id))
+            in_degree[element_id] = 0
+            ready.append(element_id)
+            continue
+
+        element_id = ready.pop()
+        if element_id not in remaining:
+            continue
+        order.append(element_id)
+        remaining.remove(element_id)
+        for target in outputs[element_id]:
+            if (element_id, target) not in closing and target in remaining:
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    ready.append(target)
+
+    # Column of each element: longest path from the sources
+    column = [0] * nb_elements
+    for element_id in order:
+        for target in outputs[element_id]:
+            if (element_id, target) not in closing:
+                column[target] = max(column[target], column[element_id] + 1)
+
+    nb_columns = max(column) + 1
+    columns = [[] for number in range(nb_columns)]
+    for element_id in order:
+        columns[column[element_id]].append(element_id)
+
+    # Order inside each column: mean position of the inputs in the previous columns
+    slot = [0.0] * nb_elements
+    for elements_of_column in columns:
+        for element_id in elements_of_column:
+            previous = [slot[source] for source in inputs[element_id] if (source, element_id) not in closing]
+            slot[element_id] = sum(previous) / len(previous) if previous else element_id
+        elements_of_column.sort(key=lambda element_id: slot[element_id])
+        for number, element_id in enumerate(elements_of_column):
+            slot[element_id] = number
+
+    # Columns folded in rows of the ratio of a screen
+    height = max(len(elements_of_column) for elements_of_column in columns)
+    row_length = min(nb_columns, max(int(math.ceil(math.sqrt(16 / 9 * nb_columns * (height + 1)))), 1))
+
+    positions = [(0.0, 0.0)] * nb_elements
+    for number, elements_of_column in enumerate(columns):
+        row, x = divmod(number, row_length)
+        if row % 2 == 1:
+            x = row_length - 1 - x
+        offset = row * (height + 1) + (height - len(elements_of_column)) / 2
+        for position, element_id in enumerate(elements_of_column):
+            positions[element_id] = (float(x), -(offset + position))
+
+    return positions, closing
+
+
+def draw_schema(elements, results_path=None, names=None, connections=None, file_format=None):
+    # Libraries that are required to draw an image (no window: the figure is only written)
+    from matplotlib.collections import PathCollection
+    from matplotlib.figure import Figure
+    from matplotlib.path import Path
 
-    import matplotlib.pyplot as plt
     import values_storage
 
-    # Define screen parameters
-    screen_parameters = {
-        'width': 1920,
-        'height': 1080,
-        'px': 1 / plt.rcParams['figure.dpi'],
-        'zoom': 0.3,
-        'xMinValue': 0,
-        'xMaxValue': 20,
-        'yMinValue': 0,
-        'yMaxValue': 10,
-        'arrowStyle': 'simple',
-        'arrowColor': 'black',
-        'arrowMutation': 25,
-    }
-
-    # Function to get coordinates for elements
-    def get_coordinates(row):
-        modifier = 0
-        # Calculate coordinates for row 1
-        if row == 1:
-            # Change modifier if number of elements is odd
-            if len(elements) % 2 == 1:
-                modifier = 1
-            coord.append([((screen_parameters['xMaxValue'] / (
-                    len(elements) // 2 + modifier)) * (half_one + 1) -
-                    (screen_parameters['xMaxValue'] // (len(elements) // 2 + modifier)) / 2),
-                    screen_parameters['yMaxValue'] / 2 + screen_parameters
-                    ['yMaxValue'] / 6])
-
-        # Calculate coordinates for row 2
-        elif row == 2:
-            coord.append([((screen_parameters['xMaxValue'] / (
-                    len(elements) // 2)) * (half_one + 1) -
-                    (screen_parameters['xMaxValue'] // (len(elements) // 2)) / 2),
-                    screen_parameters['yMaxValue'] / 2 - screen_parameters
-                    ['yMaxValue'] / 6])
-
-    # Function to draw a simple arrow between two points
-    def draw_simple_arrow(posA, posB, delta_x=0.0, delta_y=0.0):
-        # Draw a simple arrow between two points
-        arrow = FancyArrowPatch(posA, (posB[0] + delta_x, posB[1] + delta_y),
-                    color=screen_parameters['arrowColor'],
-                    arrowstyle=screen_parameters['arrowStyle'],
-                    mutation_scale=screen_parameters['arrowMutation'])
-        ax.add_patch(arrow)
-
-    # Function to draw a curved arrow between two points
-    def draw_curved_arrow(posA, posB, rad=0.0):
-        # Draw a curved arrow between two points
-        arrow = FancyArrowPatch(posA, posB,
-                    color=screen_parameters['arrowColor'],
-                    arrowstyle=screen_parameters['arrowStyle'],
-                    mutation_scale=screen_parameters['arrowMutation'],
-                    connectionstyle=f'arc3, rad = {rad}')
-        ax.add_patch(arrow)
-
-    # Function to draw an image at a specified position
-    def draw_image(path, posXY):
-        from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-        # Draw an image at a specified position
-        ab = AnnotationBbox(OffsetImage(plt.imread(path), zoom=screen_parameters['zoom']), posXY)
-        ax.add_artist(ab)
-
-    # Create a figure and axes
-    fig, ax = plt.subplots(figsize=(
-        screen_parameters['width'] * screen_parameters['px'], screen_parameters['height'] * screen_parameters['px']))
-    # Set axis properties
-    plt.axis('off')
-    ax.set_xlim([screen_parameters['xMinValue'], screen_parameters['xMaxValue']])
-    ax.set_ylim([screen_parameters['yMinValue'], screen_parameters['yMaxValue']])
-    # Check if there are elements to draw
-    if len(elements) != 0:
-        # Logic to draw elements based on the number of elements
-        coord = []
-        if len(elements) == 1:
-            # Draw elements and arrows for a single element
-            draw_image(f'../icons/{elements[0]}.png',
-                       (screen_parameters['xMaxValue'] / 2, screen_parameters['yMaxValue'] / 2))
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2 + 0.5, screen_parameters['yMaxValue'] / 2 + 0.45), (
-                screen_parameters['xMaxValue'] / 2 - 0.5, screen_parameters['yMaxValue'] / 2 + 0.45), 0.5)
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2 - 0.5, screen_parameters['yMaxValue'] / 2 - 0.45), (
-                screen_parameters['xMaxValue'] / 2 + 0.5, screen_parameters['yMaxValue'] / 2 - 0.45), 0.5)
-
-        elif len(elements) == 2:
-            # Draw elements and arrows for two elements
-            draw_image(f'../icons/{elements[0]}.png', (
-                screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2))
-            draw_image(f'../icons/{elements[1]}.png', (
-                screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2))
-
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8,
-                               screen_parameters['yMaxValue'] / 2),
-                              (screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8,
-                               screen_parameters['yMaxValue'] / 2 - 0.45),
-                              0.5)
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8,
-                               screen_parameters['yMaxValue'] / 2),
-                              (screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8,
-                               screen_parameters['yMaxValue'] / 2 + 0.45),
-                              0.5)
-
-        elif len(elements) == 3:
-            # Draw elements and arrows for three elements
-            draw_image(f'../icons/{elements[0]}.png', (
-                screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2 + screen_parameters['yMaxValue'] / 8))
-            draw_image(f'../icons/{elements[1]}.png', (
-                screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2 + screen_parameters['yMaxValue'] / 8))
-            draw_image(f'../icons/{elements[2]}.png', (screen_parameters['xMaxValue'] / 2,
-                                                       screen_parameters['yMaxValue'] / 2 - screen_parameters[
-                                                           'yMaxValue'] / 8))
-
-            draw_simple_arrow((screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8, 6.25), (
-                screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2 + screen_parameters['yMaxValue'] / 8), -0.5)
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2 + screen_parameters['xMaxValue'] / 8, 6.25), (
-                screen_parameters['xMaxValue'] / 2 + 0.5,
-                screen_parameters['yMaxValue'] / 2 - screen_parameters['yMaxValue'] / 8), -0.5)
-            draw_curved_arrow((screen_parameters['xMaxValue'] / 2, 3.75), (
-                screen_parameters['xMaxValue'] / 2 - screen_parameters['xMaxValue'] / 8,
-                screen_parameters['yMaxValue'] / 2 + screen_parameters['yMaxValue'] / 8 - 0.45), -0.5)
-
-        elif len(elements) % 2 == 0:
-            # Draw elements and arrows for an even number of elements
-            for half_one in range(len(elements) // 2):
-                get_coordinates(1)
-                draw_image(f'../icons/{elements[half_one]}.png', coord[half_one])
-
-            first_half_reversed = range(len(elements) // 2 - 1, -1, -1)
-            second_half = list(range(len(elements) // 2, len(elements)))
-
-            for half_one, half_two in zip(first_half_reversed, second_half):
-                get_coordinates(2)
-                draw_image(f'../icons/{elements[half_two]}.png', coord[half_two])
-
-            for pos in range(1, len(coord)):
-                if pos == len(coord) - 1:
-                    draw_simple_arrow(coord[pos - 1], coord[pos], 0.5)
-                    draw_simple_arrow(coord[pos], coord[0], 0.0, -0.45)
-
-                elif pos == len(coord) // 2:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), 0.0, 0.45)
-
-                elif pos < len(coord) // 2:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), -0.5)
-
-                elif pos > len(coord) // 2:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), 0.5)
-
-        elif len(elements) % 2 == 1:
-            # Draw elements and arrows for an odd number of elements
-            for half_one in range(len(elements) // 2 + 1):
-                get_coordinates(1)
-                draw_image(f'../icons/{elements[half_one]}.png', coord[half_one])
-
-            first_half_reversed = range(len(elements) // 2 - 1, -1, -1)
-            second_half = list(range(len(elements) // 2 + 1, len(elements)))
-
-            for half_one, half_two in zip(first_half_reversed, second_half):
-                get_coordinates(2)
-                draw_image(f'../icons/{elements[half_two]}.png', coord[half_two])
-
-            for pos in range(1, len(coord)):
-                if pos == len(coord) - 1:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), 0.5)
-                    draw_simple_arrow((coord[pos]), (coord[0]), 0.0, -0.45)
-
-                elif pos == len(coord) // 2 + 1:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), 0.0, 0.45)
-
-                elif pos < len(coord) // 2 + 1:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), -0.5)
-
-                elif pos > len(coord) // 2:
-                    draw_simple_arrow((coord[pos - 1]), (coord[pos]), 0.5)
-
-        # Draw unique elements at the bottom with annotations
-        unique_elements = sorted(list(set(elements)))
-
-        for element_index in range(len(unique_elements)):
-            draw_image(f'../icons/{unique_elements[element_index]}.png', (element_index * 1.25, 0.5))
-            ax.annotate(unique_elements[element_index], xy=(element_index * 1.25, 1), ha='center')
-
-        # Adjust layout and save the schema as a PNG file
-        fig.tight_layout()
-        plt.savefig(values_storage.results_path+'\schema.png')
-
-        ## Uncomment to plot the graph directly into matplotlib (not into file)
-        # plt.get_current_fig_manager().full_screen_toggle()
-        # plt.show()
-
-    # Exit if there are no elements
-    elif len(elements) == 0:
-        print('Error: 0 elements have been detected')
-        exit()
+    if len(elements) == 0:
+        raise ValueError('Error: 0 elements have been detected')
+
+    parameters = values_storage.schema_parameters
+    if results_path is None:
+        results_path = values_storage.results_path
+    if file_format is None:
+        file_format = parameters['format']
+    if names is None:
+        names = [f'{element}_{number + 1}' for number, element in enumerate(elements)]
+
+    # Connections by element ids, the chain of main.txt is closed by the last element
+    ids = {name: element_id for element_id, name in enumerate(names)}
+    if connections is None:
+        links = [(element_id, element_id + 1) for element_id in range(len(elements) - 1)]
+        if len(elements) > 1:
+            links.append((len(elements) - 1, 0))
+    else:
+        links = [(ids[source], ids[target]) for source, target in connections]
+
+    positions, closing = compute_layout(len(elements), links)
+
+    # Figure of the size of the layout
+    x_values = [x for x, y in positions]
+    y_values = [y for x, y in positions]
+    x_min, x_max = min(x_values) - 1.0, max(x_values) + 1.0
+    y_min, y_max = min(y_values) - 2.5, max(y_values) + 1.0
+    scale = min(parameters['cell_size'], parameters['max_size'] / max(x_max - x_min, y_max - y_min))  # [in]
+
+    fig = Figure(figsize=(max((x_max - x_min) * scale, 4.0), max((y_max - y_min) * scale, 3.0)))
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_axis_off()
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+    ax.set_aspect('equal')
+
+    # Connections: straight lines, curved ones for the connections closing a cycle and between two elements of the
+    # same column; one arrow head per connection at the border of the target
+    radius = parameters['icon_size'] / 2
+    x_center = (min(x_values) + max(x_values)) / 2
+
+    # Connections between two rows start at the same column: one bend each (outwards), from the top to the bottom
+    vertical = {}
+    for source, target in links:
+        if (source, target) not in closing and abs(positions[target][0] - positions[source][0]) < 0.5:
+            vertical.setdefault(positions[source][0], []).append((source, target))
+    bends = {}
+    for x, vertical_links in vertical.items():
+        vertical_links.sort(key=lambda link: -positions[link[0]][1])
+        step = min(0.2, 1.2 / len(vertical_links))
+        for number, link in enumerate(vertical_links):
+            bends[link] = 0.3 + step * number
+
+    paths = []
+    heads = []
+    for source, target in links:
+        (x_source, y_source), (x_target, y_target) = positions[source], positions[target]
+        length = math.hypot(x_target - x_source, y_target - y_source)
+        if length == 0.0:
+            continue
+        ux, uy = (x_target - x_source) / length, (y_target - y_source) / length
+
+        if (source, target) in closing or (source, target) in bends:
+            bend = 0.3 * length if (source, target) in closing else bends[(source, target)]
+            if (source, target) in bends and (x_source < x_center) == (y_target < y_source):
+                bend = -bend
+            control = ((x_source + x_target) / 2 - uy * bend, (y_source + y_target) / 2 + ux * bend)
+            start = (x_source - uy * radius, y_source + ux * radius)
+            end = (x_target - uy * radius, y_target + ux * radius)
+            paths.append(Path([start, control, end], [Path.MOVETO, Path.CURVE3, Path.CURVE3]))
+            dx, dy = end[0] - control[0], end[1] - control[1]
+            norm = math.hypot(dx, dy)
+            heads.append((end[0], end[1], dx / norm, dy / norm))
+        else:
+            end = (x_target - ux * radius, y_target - uy * radius)
+            paths.append(Path([(x_source + ux * radius, y_source + uy * radius), end]))
+            heads.append((end[0], end[1], ux, uy))
+
+    ax.add_collection(PathCollection(paths, facecolors='none', edgecolors=parameters['arrow_color'],
+                                     linewidths=parameters['line_width']))
+    if heads:
+        head = parameters['head_size']
+        ax.quiver([x - dx * head for x, y, dx, dy in heads], [y - dy * head for x, y, dx, dy in heads],
+                  [dx * head for x, y, dx, dy in heads], [dy * head for x, y, dx, dy in heads],
+                  angles='xy', scale_units='xy', scale=1, units='xy', width=head / 8, headwidth=5, headlength=7,
+                  headaxislength=6, color=parameters['arrow_color'], zorder=2)
+
+    # Elements: icons of their type (markers above icon_limit elements or without icon) grouped by type
+    unique_elements = sorted(set(elements))
+    colors = {element: f'C{number % 10}' for number, element in enumerate(unique_elements)}
+    with_icons = len(elements) <= parameters['icon_limit']
+    for element in unique_elements:
+        element_positions = [positions[element_id] for element_id in range(len(elements))
+                             if elements[element_id] == element]
+        icon = get_icon(element) if with_icons else None
+        if icon is not None:
+            for x, y in element_positions:
+                ax.imshow(icon, extent=(x - radius, x + radius, y - radius, y + radius), zorder=3)
+        else:
+            ax.scatter([x for x, y in element_positions], [y for x, y in element_positions], marker='s',
+                       s=(radius * 72 * scale) ** 2, color=colors[element], zorder=3)
+
+    if len(elements) <= parameters['label_limit']:
+        for name, (x, y) in zip(names, positions):
+            ax.annotate(name, xy=(x, y - radius), xytext=(0, -2), textcoords='offset points', ha='center', va='top',
+                        fontsize=8, zorder=4)
+
+    # Unique elements at the bottom with annotations (icons decoded once)
+    for number, element in enumerate(unique_elements):
+        x, y = x_min + 0.75 + number * 1.25 * parameters['icon_size'], y_min + 1.0
+        icon = get_icon(element)
+        if icon is not None and with_icons:
+            ax.imshow(icon, extent=(x - radius, x + radius, y - radius, y + radius), zorder=3)
+        else:
+            ax.scatter([x], [y], marker='s', s=(radius * 72 * scale) ** 2, color=colors[element], zorder=3)
+        ax.annotate(element, xy=(x, y - radius), xytext=(0, -2), textcoords='offset points', ha='center', va='top',
+                    fontsize=8)
+
+    # The images keep the limits of the layout
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+
+    os.makedirs(results_path, exist_ok=True)
+    path = os.path.join(results_path, f'schema.{file_format}')
+    fig.savefig(path, dpi=parameters['dpi'])
+
+    return path
+
+
+def draw_schema_in_background(elements, results_path=None, names=None, connections=None, file_format=None):
+    import multiprocessing
+
+    # New interpreter: nothing of the simulation is copied, matplotlib is only imported by the schema process
+    process = multiprocessing.get_context('spawn').Process(
+        target=draw_schema, args=(list(elements), results_path, names, connections, file_format), name='schema')
+    process.start()
+
+    return process
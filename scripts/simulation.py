@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classSimulation
+
+Functions :
+__init__()
+- Initialization of an empty simulation owning its network, parameters and result buffers (the progress of the runs
+is printed by a classProgressReporter of the given level, see instrumentation.py; verbose prints the elements when
+they are created and selects the level 2 by default)
+
+load(path)
+- Read a scenario file, or main.txt, the element files and default_parameters.txt of a scenario folder, and create
+the elements (see scenario.py; the time-series of the profiles are bound to their elements, see profiles.py; the
+connections replace the chain of main.txt when the scenario has some, see network_graph.py); the dynamic variables of
+the elements are moved to one state table per element type owned by the simulation (see state_arrays.py)
+
+add_profile(element, setter, path, column, **options)
+- Bind a column of a CSV or xlsx file to a setter of an element (e.g. setQdot of an exchanger), the value is set
+before every step with the simulation time
+
+compute_elements()
+- Apply the boundary conditions and run the execution plan: update every element with the output of the previous
+one (or with the streams of its connections in the order of the topological sort when the scenario has a
+topology.txt, see execution_plan.py)
+
+couple_pressures()
+- Give the pressure of their substation tank to the central tanks for the next step (explicit coupling)
+
+advance()
+- Compute one time step without recording it, returns the outputs of every element: compute_elements() followed by
+couple_pressures(), or the implicit solve of the pressure-flow balance of the tanks when implicit is True (see
+network_solver.py)
+
+save_state() / restore_state(state)
+- Save and restore the internal values of the elements and the streams between the elements (a step can be
+computed again from the saved state)
+
+save_counters() / restore_counters(counters)
+- Save and restore the statistics of the solvers of the elements (mass/energy passes and temperature solver of the
+tanks, friction solvers, see their counters attribute), so that a step computed again is only counted once
+
+state_snapshot() / state_diff(snapshot)
+- Copy the dynamic variables of all the elements (one array per element type, one row per element, see
+state_arrays.py) or compare them with a previous snapshot, in one array operation per element type
+
+step()
+- Compute one time step with advance(), record the outputs and report the progress (at most once per interval of
+wall time, except with the level 3)
+
+create_recorder(nb_steps)
+- Create the recorder of the results and register the channels of every element (the results are streamed to a
+classResultStore when store_path is given, see result_store.py), called by the first step so that loading a scenario
+does not empty an existing store
+
+run(nb_steps, checkpoint_path, checkpoint_interval)
+- Compute nb_steps time steps after the steps of the previous runs (with a checkpoint_path, a checkpoint is written
+every checkpoint_interval seconds of wall time and at the end of the run)
+
+checkpoint(path)
+- Write a binary checkpoint of the simulation (see checkpoint.py): time, step, state tables of the elements, streams
+between the elements, reading positions of the profiles and position of the recorder (the results themselves when
+they are kept in memory, they are already written inside the store otherwise)
+
+resume(path)
+- Continue the simulation from a checkpoint written by the same scenario: the following steps give the same results
+bit for bit as a run without interruption (the steps of the store written after the checkpoint are removed)
+
+run_adaptive(t_end, output_step)
+- Compute the simulation until t_end [s] with an adaptive time step (see values_storage.adaptive_parameters): the
+local error of the mass and internal energy of the tanks is estimated from the change of their derivatives between
+two steps, a step above the tolerance is rejected and computed again with a smaller time step (the statistics of the
+solvers only count the accepted steps), the time step grows in steady periods and is bounded by max_time_step() of
+the tanks; the tanks are coupled by the implicit network solver during the run (the pressure of the substation of
+the previous step is only stable over short steps); the outputs are interpolated on a uniform grid of output_step [s]
+recorded after the steps of the previous runs, the time step and the coupling of the elements are given back at the
+end (a result store only takes the rows of its own time step)
+
+convergence_statistics()
+- Return the statistics of the mass/energy passes of each tank (see classTankIteration), the steps that did not
+converge (and the steps of the implicit network solver that did not converge) are reported at the end of run() and
+run_adaptive()
+
+results()
+- Return the results recorded by the classRecorder of the simulation: for each element, the arrays of m_dot [kg/s],
+p [Pa], T [K] and x [-] of its output and of the internal values declared by its class (see recorder.py)
+"""
+
+
+import os
+import time
+
+import numpy as np
+
+import values_storage
+from checkpoint import read_checkpoint, write_checkpoint
+from execution_plan import classExecutionPlan
+from instrumentation import classProgressReporter
+from network_graph import classNetworkGraph
+from network_solver import classNetworkSolver
+from profiles import classProfile, classProfileBinding
+from recorder import classRecorder
+from result_store import classResultStore
+from scenario import load_scenario
+from state_arrays import classStateTable
+
+
+class classSimulation:
+
+    def __init__(self, data_path=None, results_path=None, verbose=False, store_path=None, implicit=None,
+                 progress=None):
+
+        self.data_path = data_path  # Folder of the scenario (main.txt, element files, default_parameters.txt)
+        self.results_path = results_path  # Folder where the results are written
+        self.verbose = verbose  # Print the elements when they are created
+        # Console reporter of the runs (level 2 with verbose, values_storage.instrumentation_parameters otherwise)
+        self.progress = classProgressReporter(2 if verbose and progress is None else progress)
+        self.store_path = store_path  # Folder of the on-disk result store (None to keep the results in memory)
+        # Implicit pressure coupling of the tanks (values_storage.network_solver_parameters by default)
+        self.implicit = values_storage.network_solver_parameters['implicit'] if implicit is None else implicit
+
+        # Network of the simulation
+        self.created_instances = []
+        self.elements = []
+        self.elements_with_no_extension = []
+        self.graph = None  # Connections of topology.txt (None for the chain of main.txt)
+        self.plan = None  # Compiled execution plan of the network (see execution_plan.py)
+        self.state_rows = {}  # State table and rows of the elements of each element type (see state_arrays.py)
+        self.network_solver = None  # Implicit solver of the tank coupling (None for the explicit coupling)
+        self.counted = []  # Solvers of the elements keeping statistics (see save_counters())
+
+        # Values of m_dot, p, T and x of default_parameters.txt (the streams between the elements are kept by the
+        # execution plan)
+        self.parameters = {}
+        self.time_step = 1.0  # [s] time step of the elements (smallest ts of the scenario)
+        self.time = 0.0  # [s] simulation time
+        self.adaptive_statistics = {}  # Accepted and rejected steps of run_adaptive
+
+        # Time-series boundary conditions applied before every step
+        self.profiles = []
+
+        # Number of steps already computed and recorder of the outputs of each element
+        self.step_index = 0
+        self.recorder = classRecorder()
+
+        if data_path is not None:
+            self.load(data_path)
+
+    def load(self, path):
+        self.data_path = path
+        if self.results_path is None:
+            self.results_path = os.path.join(path if os.path.isdir(path) else os.path.dirname(path), 'results')
+
+        # A new load replaces the network of the previous one (its elements and state tables are freed with it)
+        self.created_instances = []
+        self.elements = []
+        self.elements_with_no_extension = []
+        self.parameters = {}
+        scenario = load_scenario(path, self, verbose=self.verbose)
+
+        # Branches and loops declared by the connections of the scenario (topology.txt)
+        self.graph = None
+        if scenario['connections']:
+            self.graph = classNetworkGraph(self.elements_with_no_extension, self.created_instances)
+            for source, target in scenario['connections']:
+                self.graph.add_connection(source, target)
+            self.graph.schedule()
+
+        # State table of each element type, owned by the simulation: one row per element (freed with the elements)
+        groups = {}
+        for instance in self.created_instances:
+            if hasattr(instance, 'state_defaults'):
+                groups.setdefault(type(instance).__name__, []).append(instance)
+        self.state_rows = {}
+        for name, instances in groups.items():
+            table = classStateTable(instances[0].state_defaults, len(instances))
+            self.state_rows[name] = (table, table.attach(instances))
+
+        # Neighbours, connections and per-step callables resolved once (the chains of pipes write into their table)
+        self.plan = classExecutionPlan(self)
+
+        # Solvers of the elements whose statistics are set back when a step is computed again
+        self.counted = []
+        for instance in self.created_instances:
+            for name in ('iteration', 'solver', 'friction'):
+                counted = getattr(instance, name, None)
+                if hasattr(counted, 'counters'):
+                    self.counted.append(counted)
+        self.network_solver = classNetworkSolver(self) if self.implicit else None
+
+        self.time_step = min((instance.ts for instance in self.created_instances if hasattr(instance, 'ts')),
+                             default=1.0)
+
+        # Boundary conditions read from data files
+        self.time = 0.0
+        self.profiles = []
+        for profile in scenario['profiles']:
+            self.add_profile(profile['element'], profile['setter'], profile['path'], profile['column'],
+                             time_column=profile['time_column'])
+
+        # The recorder is created by the first step, an existing result store is kept until then (see resume())
+        self.step_index = 0
+        self.recorder = None
+
+        return self
+
+    def add_profile(self, element, setter, path, column, **options):
+        instance = self.created_instances[self.elements_with_no_extension.index(element)]
+        binding = classProfileBinding(classProfile(path, column, **options), instance, setter)
+        self.profiles.append(binding)
+
+        return binding
+
+    def create_recorder(self, nb_steps=None, time_step=None):
+        # Long runs stream their results to disk by chunks
+        sink = None
+        if self.store_path is not None:
+            sink = classResultStore(self.store_path, 'w', self.time_step if time_step is None else time_step)
+
+        self.recorder = classRecorder(nb_steps, sink=sink)
+        for element, instance in zip(self.elements_with_no_extension, self.created_instances):
+            self.recorder.add_element(element, instance)
+
+    def compute_elements(self):
+        # Boundary conditions of the current time
+        for binding in self.profiles:
+            binding.apply(self.time)
+
+        return self.plan.run()
+
+    def couple_pressures(self):
+        # Pressure for central tank and substation tank
+        self.plan.couple_pressures()
+
+    def advance(self):
+        if self.network_solver is not None:
+            return self.network_solver.solve()
+
+        outputs_list = self.compute_elements()
+        self.couple_pressures()
+
+        return outputs_list
+
+    def save_state(self):
+        return self.state_snapshot(), list(self.plan.slots)
+
+    def restore_state(self, state):
+        snapshot, slots = state
+
+        for name, (table, rows) in self.state_rows.items():
+            table.restore(rows, snapshot[name])
+
+        # The callables of the plan keep a reference to the list of slots
+        self.plan.slots[:] = slots
+
+    def save_counters(self):
+        return [[getattr(counted, name) for name in counted.counters] for counted in self.counted]
+
+    def restore_counters(self, counters):
+        for counted, values in zip(self.counted, counters):
+            for name, value in zip(counted.counters, values):
+                setattr(counted, name, value)
+
+    def state_snapshot(self):
+        return {name: table.snapshot(rows) for name, (table, rows) in self.state_rows.items()}
+
+    def state_diff(self, snapshot):
+        return {name: table.diff(rows, snapshot[name]) for name, (table, rows) in self.state_rows.items()}
+
+    def step(self):
+        if self.recorder is None:
+            self.create_recorder()
+
+        outputs_list = self.advance()
+
+        for element_id, outputs in enumerate(outputs_list):
+            self.recorder.record(element_id, outputs)
+
+        self.recorder.next_step()
+        self.step_index += 1
+        # The time is accumulated: the steps of run_adaptive() are not multiples of time_step
+        self.time += self.time_step
+
+        if self.progress.level:
+            self.progress.report(self, outputs_list)
+
+    def run(self, nb_steps, checkpoint_path=None, checkpoint_interval=None):
+        # The result arrays are allocated once for all the steps of the run, the steps of a previous run are kept
+        if self.recorder is None:
+            self.create_recorder(nb_steps)
+        self.check_recorder(self.time_step)
+
+        if checkpoint_interval is None:
+            checkpoint_interval = values_storage.checkpoint_parameters['interval']
+        last_checkpoint = time.perf_counter()
+        self.progress.start(self.step_index, self.step_index + nb_steps)
+
+        for step in range(nb_steps):
+            self.step()
+
+            if checkpoint_path is not None and time.perf_counter() - last_checkpoint >= checkpoint_interval:
+                self.checkpoint(checkpoint_path)
+                last_checkpoint = time.perf_counter()
+
+        self.recorder.flush()
+        if checkpoint_path is not None:
+            self.checkpoint(checkpoint_path)
+        self.progress.finish(self)
+        self.report_convergence()
+
+        return self.results()
+
+    def checkpoint(self, path):
+        if self.recorder is None:
+            self.create_recorder()
+
+        # The results are written to the store before its position is saved
+        self.recorder.flush()
+
+        header = {'data_path': self.data_path,
+                  'elements': self.elements_with_no_extension,
+                  'time': self.time,
+                  'step_index': self.step_index,
+                  'time_step': self.time_step,
+                  'nb_recorded': self.recorder.nb_steps,
+                  'store': self.recorder.sink is not None,
+                  'profiles': []}
+
+        arrays = {f'state/{name}': snapshot for name, snapshot in self.state_snapshot().items()}
+        arrays['slots'] = np.array(self.plan.slots, dtype=float)
+
+        for number, binding in enumerate(self.profiles):
+            cursor = binding.profile.get_cursor()
+            arrays[f'profile/{number}/times'] = cursor.pop('times')
+            arrays[f'profile/{number}/values'] = cursor.pop('values')
+            header['profiles'].append(cursor)
+
+        # Results kept in memory are saved with the checkpoint
+        if self.recorder.sink is None:
+            for name, channels in zip(self.recorder.names, self.recorder.channels):
+                arrays[f'results/{name}'] = np.column_stack([self.recorder.get(name, channel) for channel in channels])
+
+        write_checkpoint(path, header, arrays)
+
+    def resume(self, path):
+        header, arrays = read_checkpoint(path)
+
+        if header['elements'] != self.elements_with_no_extension:
+            raise ValueError(f"Checkpoint {path} was written for the elements {header['elements']}")
+        if len(header['profiles']) != len(self.profiles):
+            raise ValueError(f"Checkpoint {path} has {len(header['profiles'])} profiles for {len(self.profiles)}")
+
+        snapshot = {name: arrays[f'state/{name}'] for name in self.state_rows}
+        self.restore_state((snapshot, [tuple(slot) for slot in arrays['slots'].tolist()]))
+
+        for number, (binding, cursor) in enumerate(zip(self.profiles, header['profiles'])):
+            binding.profile.set_cursor({**cursor, 'times': arrays[f'profile/{number}/times'],
+                                        'values': arrays[f'profile/{number}/values']})
+
+        self.time = header['time']
+        self.step_index = header['step_index']
+        self.time_step = header['time_step']
+
+        # Recorder at the position of the checkpoint
+        if header['store']:
+            if self.store_path is None:
+                raise ValueError(f'Checkpoint {path} continues a result store, store_path is required')
+            sink = classResultStore(self.store_path, 'a')
+            sink.truncate(header['nb_recorded'])
+
+            self.recorder = classRecorder(sink=sink)
+            for element, instance in zip(self.elements_with_no_extension, self.created_instances):
+                self.recorder.add_element(element, instance)
+            self.recorder.nb_steps = header['nb_recorded']
+        else:
+            self.create_recorder()
+            self.recorder.append([arrays[f'results/{name}'] for name in self.elements_with_no_extension])
+
+        return self
+
+    def check_recorder(self, time_step):
+        # The times of a result store are given by a uniform time step
+        sink = self.recorder.sink
+        if sink is not None and self.recorder.nb_steps and abs(sink.index['time_step'] - time_step) > 1e-12:
+            raise ValueError(f"The result store {sink.path} has a time step of {sink.index['time_step']} s, "
+                             f"the steps of {time_step} s cannot be appended")
+
+    def set_time_step(self, time_step):
+        for instance in self.created_instances:
+            if hasattr(instance, 'ts'):
+                instance.ts = time_step
+
+    def run_adaptive(self, t_end, output_step, **parameters):
+        parameters = {**values_storage.adaptive_parameters, **parameters}
+        tolerance = parameters['tolerance']
+
+        # Elements with internal values integrated over time (the tanks)
+        storages = [instance for instance in self.created_instances if hasattr(instance, 'get_state')]
+
+        # The rows of the output grid follow the steps of the previous runs
+        nb_outputs = int(round((t_end - self.time) / output_step))
+        if self.recorder is None:
+            self.create_recorder(nb_outputs, output_step)
+        self.check_recorder(output_step)
+        first_output = self.recorder.nb_steps
+        nb_outputs += first_output
+        t_output = self.time + output_step  # [s] time of the next row of the output grid
+
+        # Time step of each element, given back at the end of the run
+        time_steps = [(instance, instance.ts) for instance in self.created_instances if hasattr(instance, 'ts')]
+
+        # The pressure of the substation of the previous step is only stable over short steps: the tanks are coupled
+        # by the implicit network solver during the run
+        run_solver = None
+        if parameters['implicit'] and self.network_solver is None:
+            self.network_solver = run_solver = classNetworkSolver(self)
+
+        time_step = min(max(self.time_step, parameters['dt_min']), parameters['dt_max'])
+        previous_values = None  # Outputs of the elements at the end of the last accepted step
+        previous_rates = None  # dm/dt and dU/dt of the tanks over the last accepted step
+        previous_step = time_step  # [s] length of the last accepted step
+        nb_accepted = nb_rejected = 0
+        rejected = False  # The time step does not grow right after a rejected step
+        self.progress.start(self.step_index)
+
+        try:
+            while t_end - self.time > 1e-9 * output_step:
+                # Bound given by the fastest element and by the end of the simulation
+                bound = min([parameters['dt_max'], t_end - self.time] +
+                            [storage.max_time_step(parameters['max_mass_change'], parameters['m_scale'])
+                             for storage in storages])
+                time_step = max(min(time_step, bound), min(parameters['dt_min'], t_end - self.time))
+
+                saved = self.save_state()
+                counters = self.save_counters()
+                masses = [storage.m for storage in storages]
+                energies = [storage.U for storage in storages]
+
+                self.set_time_step(time_step)
+                outputs_list = self.advance()
+
+                rates = [((storage.m - m) / time_step, (storage.U - U) / time_step)
+                         for storage, m, U in zip(storages, masses, energies)]
+
+                # Local error of the explicit update: dt ** 2 / 2 times the second derivative, estimated from the
+                # change of the derivative between the middles of the previous and of the current step
+                error = 0.0
+                if previous_rates is not None:
+                    weight = time_step ** 2 / (time_step + previous_step)  # [s]
+                    for storage, (m_rate, U_rate), (m_previous, U_previous) in zip(storages, rates, previous_rates):
+                        m_error = abs(m_rate - m_previous) / (abs(storage.m) + parameters['m_scale'])
+                        U_error = abs(U_rate - U_previous) / (abs(storage.U) + parameters['U_scale'])
+                        error = max(error, weight * m_error, weight * U_error)
+                error /= tolerance
+
+                if error > 1.0 and time_step > parameters['dt_min']:
+                    # The step is computed again from the saved state with a smaller time step (and counted once)
+                    self.restore_state(saved)
+                    self.restore_counters(counters)
+                    time_step = max(time_step * max(parameters['min_shrink'], parameters['safety'] / error ** 0.5),
+                                    parameters['dt_min'])
+                    nb_rejected += 1
+                    rejected = True
+                    continue
+
+                values = [self.recorder.values(element_id, outputs) for element_id, outputs in enumerate(outputs_list)]
+                t_next = self.time + time_step
+
+                # Rows of the output grid inside the step, linearly interpolated between the two accepted steps
+                while t_output <= t_next + 1e-9 * output_step and self.recorder.nb_steps < nb_outputs:
+                    weight = 1.0 if previous_values is None else (t_output - self.time) / time_step
+                    for element_id, value in enumerate(values):
+                        row = value if previous_values is None else \
+                            previous_values[element_id] + weight * (value - previous_values[element_id])
+                        self.recorder.record_values(element_id, row)
+                    self.recorder.next_step()
+                    t_output += output_step
+
+                previous_values = values
+                previous_rates = rates
+                previous_step = time_step
+                self.time = t_next
+                nb_accepted += 1
+                self.step_index += 1
+
+                if self.progress.level:
+                    self.progress.report(self, outputs_list, f'time step {time_step:.3g} s | error {error:.3g}')
+
+                growth = 1.0 if rejected else parameters['max_growth']
+                time_step *= growth if error == 0.0 else min(growth, parameters['safety'] / error ** 0.5)
+                rejected = False
+        finally:
+            for instance, ts in time_steps:
+                instance.ts = ts
+            if run_solver is not None:
+                for central in run_solver.centrals:
+                    central.implicit_coupling = False
+                self.network_solver = None
+
+        self.recorder.flush()
+        self.progress.finish(self)
+        self.report_convergence()
+        self.adaptive_statistics = {'accepted': nb_accepted, 'rejected': nb_rejected,
+                                   'outputs': self.recorder.nb_steps - first_output}
+
+        return self.results()
+
+    def convergence_statistics(self):
+        return {element: instance.iteration.get_statistics()
+                for element, instance in zip(self.elements_with_no_extension, self.created_instances)
+                if hasattr(instance, 'iteration')}
+
+    def report_convergence(self):
+        for element, statistics in self.convergence_statistics().items():
+            if statistics['not_converged']:
+                print(f"Warning: {element} did not converge on {statistics['not_converged']} of "
+                      f"{statistics['steps']} steps (largest residual {statistics['max_residual']:.3g})")
+
+        if self.network_solver is not None and self.network_solver.nb_failures:
+            print(f'Warning: the implicit network solver did not converge on {self.network_solver.nb_failures} of '
+                  f'{self.network_solver.nb_solves} steps')
+
+    def results(self):
+        if self.recorder is None:
+            self.create_recorder()
+
+        return self.recorder.results()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classSplitter
+
+Functions :
+__init__()
+- Initialization of the splitter with the fraction of the mass flow rate sent to each of its outputs (in the order
+of the connections of topology.txt, the fractions are normalized to a sum of 1)
+
+set_fractions()
+- Change the fractions of the outputs (can be used for data stored in datafile)
+
+split()
+- Return the stream of each output: the mass flow rate is divided, the pressure, temperature and quality are kept
+
+update()
+- update function using new parameters (the splitter returns its input stream, the streams of the outputs are given
+by split())
+"""
+
+
+class classSplitter:
+
+    fractions = []
+
+    def __init__(self, *fractions):  # [-]
+
+        self.set_fractions(*fractions)
+
+    def set_fractions(self, *fractions):
+        total = sum(fractions)
+        if not fractions or total <= 0:
+            raise ValueError(f'Splitter fractions {fractions} must have a positive sum')
+
+        self.fractions = [fraction / total for fraction in fractions]  # [-] part of m_dot sent to each output
+
+    def split(self, m_dot, p, T, x):
+        return [(m_dot * fraction, p, T, x) for fraction in self.fractions]
+
+    def update(self, m_dot, p, T, x):
+        return [m_dot, p, T, x]
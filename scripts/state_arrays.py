@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classStateTable
+-classStateView
+-classStateField
+
+Functions :
+classStateTable.__init__()
+- Initialization of the array of one element type: one row per element, one column per dynamic variable (e.g. m, U,
+T, p, x of the tanks), filled with the default value of each column
+
+classStateTable.attach(instances)
+- Move the values of the elements into the rows of the table (the view of each element is replaced by a view of its
+row), returns the rows; the table is owned by the classSimulation of the elements and freed with it
+
+classStateTable.snapshot(rows) / restore(rows, snapshot) / diff(rows, snapshot)
+- Copy, write back or compare the rows of a group of elements in one array operation
+
+classStateView
+- Row of one element inside its table (__slots__ object), values is a NumPy view of the row
+
+classStateField
+- Descriptor giving access to one column of the row of an element as a normal attribute (self.m, self.U, ...)
+
+add_state_fields(element_class, defaults)
+- Declare the dynamic variables of an element class and replace its class attributes by fields, the elements call
+new_state(self) first in their __init__()
+
+new_state(element)
+- Return the view of a table of one row holding the values of an element until its simulation attaches it
+"""
+
+
+import numpy as np
+
+
+class classStateTable:
+
+    def __init__(self, defaults, nb_rows=1):
+
+        self.fields = tuple(defaults)  # Names of the columns
+        self.columns = {field: column for column, field in enumerate(self.fields)}
+        self.defaults = np.array([defaults[field] for field in self.fields], dtype=float)
+
+        self.values = np.tile(self.defaults, (nb_rows, 1))  # One row per element
+        self.nb_rows = nb_rows
+
+    def attach(self, instances):
+        if len(instances) != self.nb_rows:
+            raise ValueError(f'The table has {self.nb_rows} rows for {len(instances)} elements')
+
+        for row, instance in enumerate(instances):
+            self.values[row] = instance.state.values
+            instance.state = classStateView(self, row)
+
+        return np.arange(self.nb_rows)
+
+    def snapshot(self, rows):
+        return self.values[rows]
+
+    def restore(self, rows, snapshot):
+        self.values[rows] = snapshot
+
+    def diff(self, rows, snapshot):
+        return self.values[rows] - snapshot
+
+
+class classStateView:
+
+    __slots__ = ('table', 'row', 'values')
+
+    def __init__(self, table, row):
+
+        self.table = table  # classStateTable of the element type
+        self.row = row  # Row of the element
+        self.values = table.values[row]  # NumPy view of the row
+
+    def as_dict(self):
+        return dict(zip(self.table.fields, self.values.tolist()))
+
+
+class classStateField:
+
+    __slots__ = ('column',)
+
+    def __init__(self, column):
+
+        self.column = column  # Column of the variable inside the table
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.state.values.item(self.column)
+
+    def __set__(self, instance, value):
+        instance.state.values[self.column] = value
+
+
+def add_state_fields(element_class, defaults):
+    element_class.state_defaults = dict(defaults)
+    for column, field in enumerate(element_class.state_defaults):
+        setattr(element_class, field, classStateField(column))
+
+    return element_class
+
+
+def new_state(element):
+    return classStateView(classStateTable(element.state_defaults), 0)
@@ -15,87 +15,101 @@ Functions :
 __init__()
 - Initialization of the tank central parameters
 
-dichotomous_method()
-- Calculate the temperature corresponding to the system while using a dichotomous method
+solve_state(m, U, T)
+- Return the temperature, quality and pressure corresponding to the mass and internal energy of the tank with the
+shared tank solver warm-started from the temperature T of the previous pass (see tank_solver.py)
 
-findMassFlowRate()
-- Compute the output mass flow rate
+findMassFlowRate(Q, mDotIn, T)
+- Compute the output mass flow rate at the temperature T of the current pass
 
 compute_fd_colebrook_white()
 - Compute the fd coefficient used in findMassFlowRate function by solving the Colebrook white equation
+(shared solver of friction.py)
 
 state_change()
-- Change the simulation values inside the tank for 1 step
+- Change the simulation values inside the tank for 1 step (mass/energy passes repeated until the residual of
+classTankIteration is under its tolerances, the number of passes and the final residual are kept with the state).
+The passes work on local values, the row of the tank in the state table is written once at the end of the step
+
+set_network()
+- Search the pipe and the tank substation inside a list of elements (values_storage.created_instances by default,
+searched once on the first step when the tank is not bound by set_neighbours())
+
+set_neighbours()
+- Bind the output pipe and the tank substation of the tank (resolved once by the execution plan of classSimulation,
+see execution_plan.py)
 
 set_delta_pressure()
 - Change the delta pressure value stored in the tank (should be used with tank substation instance)
 
+get_state() / set_state(state)
+- Save and restore the internal values of the tank, the row of the tank inside the shared state table (used by the
+adaptive time stepping to reject a step)
+
+max_time_step(max_mass_change, m_scale)
+- Largest time step keeping the change of mass of the tank under max_mass_change of its mass (plus m_scale [kg])
+over one step, no bound when the tank is empty
+
 update()
-- update function using new parameters
+- update function using new parameters (saturated liquid or gas, two-phase input with its quality, or single phase
+input with x = -1)
 """
 
 
-import CoolProp.CoolProp as CP
 import values_storage
+from fluid_properties import classFluidState
+from friction import classFrictionSolver
+from saturation_table import get_saturation_table
+from state_arrays import add_state_fields, new_state
+from tank_solver import classTankIteration, classTankStateSolver
 
 
 class classTankC:
 
-    delta_p = 0
-    m = 0
-    p = 0
-    p_tankS = 0
-    T = 0
+    implicit_coupling = False
+    pipe = None
+    substation = None
     ts = 0
-    U = 0
     V = 0
-    x = 0
 
     # Pipe Parameters
     pipe_parameters = [] # Dictionary of pipe parameters
 
+    # Internal values recorded at every step with the outputs (see recorder.py)
+    state_channels = {'m': 'm', 'U': 'U', 'quality': 'x', 'delta_p': 'delta_p',
+                      'iterations': 'iterations', 'residual': 'residual'}
+
     def __init__(self, x, T, V, ts):  # [], [K], [m3], [s]
 
-        self.m = CP.PropsSI('D', 'T', T, 'Q', x, 'R744') * V  # [kg] total mass of refrigerant in tank
-        self.p = CP.PropsSI('P', 'T', T, 'Q', x, 'R744')
+        self.state = new_state(self)  # Row of the element, moved to the state table of its simulation by load()
+
+        self.fluid = classFluidState('R744')  # CoolProp state reused by the tank
+        density, self.p, internal_energy = self.fluid.TQ(T, x, 'D', 'P', 'U')
+
+        self.m = density * V  # [kg] total mass of refrigerant in tank
         self.T = T  # [K] temperature of refrigerant
         self.ts = ts  # [s] time-step
-        self.U = (CP.PropsSI('U', 'T', T, 'Q', x,'R744')) * self.m  # [J] internal energy of refrigerant in tank
+        self.U = internal_energy * self.m  # [J] internal energy of refrigerant in tank
         self.V = V  # [m3] total volume of the tank
         self.x = x  # [-] quality (ratio between mass of gas over total mass) of refrigerant
 
-    def dichotomous_method(self):
-        T_left = self.T - 5
-        T_right = self.T + 5
-
-        while abs(T_left - T_right) > 1e-12:
-
-            T = (T_left + T_right) / 2
+        self.saturation = get_saturation_table('R744')  # Saturation properties shared by all the tanks
+        self.solver = classTankStateSolver()  # Solver of the (m, U, V) -> (T, x, p) closure
+        self.iteration = classTankIteration()  # Convergence criteria of the mass/energy passes of each step
+        self.friction = classFrictionSolver()  # Friction factor solver of the output pipe
 
-            UL = (CP.PropsSI('U', 'T', T, 'Q', 0, 'R744'))
-            UG = (CP.PropsSI('U', 'T', T, 'Q', 1, 'R744'))
-            DL = (CP.PropsSI('D', 'T', T, 'Q', 0, 'R744'))
-            DG = (CP.PropsSI('D', 'T', T, 'Q', 1, 'R744'))
+        self.network = values_storage.created_instances  # Elements searched for the pipe and the substation tank
 
-            Q = (self.U / self.m - UL) / (UG - UL)
+    def solve_state(self, m, U, T):
+        # Temperature, quality and pressure from the mass, internal energy and volume of the tank
+        return self.solver.solve(m, U, self.V, T)
 
-            Volume = 1.0 / DL * self.m * (1.0 - Q) + 1.0 / DG * self.m * Q
-
-            if Volume > self.V:
-                T_left = T
-            else:
-                T_right = T
-
-        self.T = T
-        self.p = CP.PropsSI('P', 'T', T, 'Q', Q, 'R744')
-        self.x = Q
-
-    def findMassFlowRate(self, Q, mDotIn):
+    def findMassFlowRate(self, Q, mDotIn, T):
         import math
-        rho = CP.PropsSI('D', 'T', self.T, 'Q', Q, 'R744')
-        mu = CP.PropsSI('V', 'T', self.T, 'Q', Q, 'R744')
+        rho, mu = self.fluid.TQ(T, Q, 'D', 'V')
 
         mDotOut = 0.0
+        delta_p = self.delta_p  # [Pa] read once from the state table
 
         for step in range(10):
 
@@ -109,8 +123,8 @@ class classTankC:
                 Re = rho * V * self.pipe_parameters['r'] * 2 / mu
 
             fd = self.compute_fd_colebrook_white(0.00001, Re)
-            if (self.delta_p > 0.0):
-                mDotOut = self.delta_p ** 0.5 * 2 * math.pi * self.pipe_parameters['r'] ** 2 * (rho * self.pipe_parameters['r'] / fd / self.pipe_parameters['L']) ** 0.5
+            if (delta_p > 0.0):
+                mDotOut = delta_p ** 0.5 * 2 * math.pi * self.pipe_parameters['r'] ** 2 * (rho * self.pipe_parameters['r'] / fd / self.pipe_parameters['L']) ** 0.5
             else:
                 mDotOut = 0.0
                 break
@@ -118,53 +132,89 @@ class classTankC:
         return mDotOut
 
     def compute_fd_colebrook_white(self, k, Re):
-        from math import log10
-
-        lamda_n = 0.0
-        lamda_np1 = 0.05
-        count = 0
-        while abs(lamda_n - lamda_np1) / lamda_np1 > 1e-9 and count < 1000:
-            count += 1
-            lamda_n = lamda_np1
-            lamda_np1 = -2 * log10(2.51 / Re / lamda_n ** 0.5 + k / 3.71 / (self.pipe_parameters['r'] * 2))
-            lamda_np1 = lamda_np1 ** 2
-            lamda_np1 = 1.0 / lamda_np1
-
-        return lamda_np1
+        # Shared Colebrook-White solver (explicit seed and Newton steps, see friction.py)
+        return self.friction.friction_factor(Re, k, self.pipe_parameters['r'] * 2)
 
     def state_change(self, m_dot_in, p_in, T_in, x_in):
-        from pipeline import classPipes
-        from tank_substation import classTankS
 
-        for element in values_storage.created_instances:
-            if isinstance(element, classPipes):
-                self.pipe_parameters = element.get_pipe_parameters()
-            else:
-                continue
+        # Neighbours searched once when the tank is not bound by an execution plan (see execution_plan.py)
+        if self.pipe is None:
+            self.set_network(self.network)
 
-        for element in values_storage.created_instances:
-            if isinstance(element, classTankS):
-                self.set_delta_pressure(element.get_pressure())
-            else:
-                continue
+        # With the implicit coupling, delta_p is given by the network solver (see network_solver.py)
+        if not self.implicit_coupling and self.substation is not None:
+            self.set_delta_pressure(self.substation.p)
 
         mass = self.m
         internalEnergy = self.U
+        ts = self.ts
+        u_in = self.saturation.internal_energy(T_in, x_in)  # [J/kg] internal energy of the input stream
+        iteration_criteria = self.iteration
+
+        # Mass/energy passes until m, U and T stop changing (see classTankIteration)
+        m, U, T = mass, internalEnergy, self.T
+        for iteration in range(1, iteration_criteria.max_iterations + 1):
+            m_previous, U_previous, T_previous = m, U, T
+            m_dot_out = self.findMassFlowRate(1, m_dot_in, T)
+
+            m = iteration_criteria.relax(mass + (m_dot_in - m_dot_out) * ts, m_previous)  # [kg]
+            U = iteration_criteria.relax(internalEnergy
+                                         + m_dot_in * ts * u_in
+                                         - m_dot_out * ts * self.saturation.internal_energy(T, 1),
+                                         U_previous)  # [J]
+            T, x, p = self.solve_state(m, U, T)
+
+            residual = iteration_criteria.residual(m, U, T, m_previous, U_previous, T_previous)
+            if residual <= 1.0:
+                break
 
-        for i in range(5):
-            m_dot_out = self.findMassFlowRate(1, m_dot_in)
-
-            self.m = mass + (m_dot_in - m_dot_out) * self.ts  # [kg]
-            self.U = (internalEnergy
-                    + m_dot_in * self.ts * CP.PropsSI('U', 'T', T_in, 'Q', x_in, 'R744')
-                    - m_dot_out * self.ts * CP.PropsSI('U', 'T', self.T, 'Q', 1, 'R744'))  # [J]
-            self.dichotomous_method()
+        iteration_criteria.finish(iteration, residual)
 
+        # Values of the step written once into the row of the tank (flow rates used to bound the adaptive time step)
+        self.m = m
         self.U = (internalEnergy
-                + m_dot_in * self.ts * CP.PropsSI('U', 'T', T_in, 'Q', x_in, 'R744')
-                - m_dot_out * self.ts * CP.PropsSI('U', 'T', self.T, 'Q', 1, 'R744'))
+                  + m_dot_in * ts * u_in
+                  - m_dot_out * ts * self.saturation.internal_energy(T, 1))
+        self.T = T
+        self.x = x
+        self.p = p
+        self.iterations = iteration
+        self.residual = residual
+        self.m_dot_in = m_dot_in
+        self.m_dot_out = m_dot_out
+
+        return m_dot_out, p, T, 1
+
+    def get_state(self):
+        return self.state.values.copy()
+
+    def set_state(self, state):
+        self.state.values[:] = state
+
+    def max_time_step(self, max_mass_change, m_scale=0.0):
+        # An empty (or overdrawn) tank has no mass to keep, its step is only bounded by the local error
+        net_flow = abs(self.m_dot_in - self.m_dot_out)
+        if net_flow <= 0 or self.m <= 0:
+            return float('inf')
+        return max_mass_change * (self.m + m_scale) / net_flow
 
-        return m_dot_out, self.p, self.T, 1
+    def set_network(self, created_instances):
+        from pipeline import classPipes
+        from tank_substation import classTankS
+
+        self.network = created_instances
+
+        # The last pipe and the last substation tank of the network
+        pipes = [element for element in created_instances if isinstance(element, classPipes)]
+        substations = [element for element in created_instances if isinstance(element, classTankS)]
+        self.set_neighbours(pipes[-1] if pipes else None, substations[-1] if substations else None)
+
+    def set_neighbours(self, pipe, substation):
+        self.pipe = pipe  # Output pipe of the tank
+        self.substation = substation  # Substation tank giving the pressure difference
+
+        if pipe is not None:
+            self.pipe_parameters = pipe.get_pipe_parameters()
 
     def set_delta_pressure(self, p_tank_substation):
         self.p_tankS = p_tank_substation
@@ -178,16 +228,19 @@ class classTankC:
             result = list(self.state_change(m_dot, p, T, 0.0))
         elif 1.0 - 1e-4 < x < 1.0 + 1e-4:
             result = list(self.state_change(m_dot, p, T, 1.0))
+        elif 0.0 < x < 1.0:
+            # Two-phase input (e.g. the output of a mixer), its energy is given by its quality
+            result = list(self.state_change(m_dot, p, T, x))
         elif x == -1.0:
-            phase = CP.PhaseSI('P', p, 'T', T, 'R744')
+            phase = self.fluid.phase(p, T)
             if phase == 'liquid':
                 result = list(self.state_change(m_dot, p, T, 0.0))
             elif phase == 'gas':
                 result = list(self.state_change(m_dot, p, T, 1.0))
 
-        values_storage.x_tank_c.append(self.x)
-        values_storage.p_tank_c.append(self.p / 10 ** 5)
-        values_storage.m_dot_tank_c.append(m_dot)
-        values_storage.T_tank1.append(self.T - 273.15)
-
         return result
+
+
+# Dynamic variables of the central tanks, one row per tank in the table of their simulation (see state_arrays.py)
+add_state_fields(classTankC, {'m': 0.0, 'U': 0.0, 'T': 0.0, 'p': 0.0, 'x': 0.0, 'delta_p': 0.0, 'p_tankS': 0.0,
+                              'm_dot_in': 0.0, 'm_dot_out': 0.0, 'iterations': 0.0, 'residual': 0.0})
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Version 1.0
+
+Listing authors :
+Vadym Chobu
+Tristan Rey
+Jessen Page
+Florian Desmons
+
+Classes :
+-classTankStateSolver
+-classTankIteration
+
+Functions :
+__init__()
+- Initialization of the solver parameters (tolerance, maximum number of iterations, safeguard bracket)
+
+volume_residual(T, m, U, V)
+- Relative difference between the volume occupied by the two-phase mass m with internal energy U at the
+temperature T and the volume of the tank
+
+find_bracket(m, U, V, T_guess)
+- Return a temperature interval around T_guess whose two ends have residuals of opposite signs (the half width bracket
+is multiplied by 4 until the root is inside, within the range of the saturation table), None without root
+
+solve(m, U, V, T_guess)
+- Find the temperature, quality and pressure of a two-phase tank from its mass, internal energy and volume with a
+safeguarded Newton method warm-started from T_guess (bisection steps are used when Newton leaves the bracket); a
+tank state without root inside the saturation table is counted as a failure
+
+get_statistics()
+- Return the number of solves, iterations and failures of the solver
+
+classTankIteration.__init__()
+- Initialization of the convergence criteria of the mass/energy passes of the tank models (tolerances on m, U and
+T, relaxation factor and maximum number of passes)
+
+classTankIteration.relax(value, previous)
+- Under (or over) relaxed update of m or U between two passes
+
+classTankIteration.residual(m, U, T, m_previous, U_previous, T_previous)
+- Largest change of m, U and T between two passes divided by its tolerance (the passes have converged below 1)
+
+classTankIteration.finish(iterations, residual)
+- Record the number of passes and the final residual of one step, non-converged steps are counted
+
+classTankIteration.get_statistics()
+- Return the number of steps, passes, non-converged steps and the largest final residual
+"""
+
+
+import values_storage
+from saturation_table import get_saturation_table
+
+
+class classTankStateSolver:
+
+    # Statistics saved and restored by the implicit network solver around its trial evaluations
+    counters = ('nb_solves', 'nb_iterations', 'nb_failures')
+
+    def __init__(self, tolerance=None, max_iterations=None, bracket=None, fluid='R744'):
+        parameters = values_storage.tank_solver_parameters
+
+        self.tolerance = parameters['tolerance'] if tolerance is None else tolerance  # [K] step tolerance
+        self.max_iterations = int(parameters['max_iterations'] if max_iterations is None else max_iterations)
+        self.bracket = parameters['bracket'] if bracket is None else bracket  # [K] half width of the safeguard
+        self.saturation = get_saturation_table(fluid)
+
+        # Statistics of the solver
+        self.nb_solves = 0
+        self.nb_iterations = 0
+        self.nb_failures = 0
+        self.last_iterations = 0
+
+    def volume_residual(self, T, m, U, V):
+        _, DL, DG, UL, UG = self.saturation.saturated(T)
+
+        Q = (U / m - UL) / (UG - UL)
+        Volume = m * ((1.0 - Q) / DL + Q / DG)
+
+        return Volume / V - 1.0, Q
+
+    def find_bracket(self, m, U, V, T_guess):
+        # The residual decreases with the temperature: the root is between a positive and a negative residual
+        T_min, T_max = self.saturation.T_min, self.saturation.T_max
+        width = self.bracket
+        while True:
+            T_left = max(T_guess - width, T_min)
+            T_right = min(T_guess + width, T_max)
+            if self.volume_residual(T_left, m, U, V)[0] >= 0.0 >= self.volume_residual(T_right, m, U, V)[0]:
+                return T_left, T_right
+            if T_left == T_min and T_right == T_max:
+                return None
+            width *= 4
+
+    def solve(self, m, U, V, T_guess):
+        # The residual decreases with the temperature: a positive residual means T is too low
+        bracket = self.find_bracket(m, U, V, min(max(T_guess, self.saturation.T_min), self.saturation.T_max))
+        if bracket is None:
+            # No root inside the saturation table: the closest edge is returned and the solve is counted as failed
+            T_min, T_max = self.saturation.T_min, self.saturation.T_max
+            T = T_min if self.volume_residual(T_min, m, U, V)[0] < 0.0 else T_max
+            _, Q = self.volume_residual(T, m, U, V)
+            self.nb_solves += 1
+            self.nb_failures += 1
+            self.last_iterations = 0
+            return T, Q, self.saturation.pressure(T)
+        T_left, T_right = bracket
+
+        T = min(max(T_guess, T_left), T_right)
+        converged = False
+        iteration = 0
+
+        while iteration < self.max_iterations:
+            iteration += 1
+
+            residual, Q = self.volume_residual(T, m, U, V)
+            if residual > 0:
+                T_left = T
+            else:
+                T_right = T
+
+            # Derivative of the residual with a forward difference
+            dT = 1e-6
+            slope = (self.volume_residual(T + dT, m, U, V)[0] - residual) / dT
+
+            # Newton step, replaced by a bisection step when it leaves the bracket
+            step = residual / slope if slope != 0.0 else 0.0
+            if abs(step) < self.tolerance and slope != 0.0:
+                T = T - step
+                converged = True
+                break
+
+            T_new = T - step
+            if not T_left < T_new < T_right:
+                T_new = (T_left + T_right) / 2
+
+            if abs(T_right - T_left) < self.tolerance:
+                T = T_new
+                converged = True
+                break
+
+            T = T_new
+
+        _, Q = self.volume_residual(T, m, U, V)
+        p = self.saturation.pressure(T)
+
+        self.nb_solves += 1
+        self.nb_iterations += iteration
+        self.last_iterations = iteration
+        if not converged:
+            self.nb_failures += 1
+
+        return T, Q, p
+
+    def get_statistics(self):
+        return {'solves': self.nb_solves,
+                'iterations': self.nb_iterations,
+                'failures': self.nb_failures,
+                'mean_iterations': self.nb_iterations / self.nb_solves if self.nb_solves else 0.0}
+
+
+class classTankIteration:
+
+    # Statistics saved and restored by the implicit network solver around its trial evaluations
+    counters = ('nb_steps', 'nb_iterations', 'nb_not_converged', 'max_residual')
+
+    def __init__(self, tolerance_m=None, tolerance_U=None, tolerance_T=None, relaxation=None, max_iterations=None):
+        parameters = values_storage.tank_iteration_parameters
+
+        self.tolerance_m = parameters['tolerance_m'] if tolerance_m is None else tolerance_m  # [-] relative to m
+        self.tolerance_U = parameters['tolerance_U'] if tolerance_U is None else tolerance_U  # [-] relative to U
+        self.tolerance_T = parameters['tolerance_T'] if tolerance_T is None else tolerance_T  # [K]
+        self.relaxation = parameters['relaxation'] if relaxation is None else relaxation  # [-] 1 = no relaxation
+        self.max_iterations = int(parameters['max_iterations'] if max_iterations is None else max_iterations)
+
+        # Statistics of the passes
+        self.nb_steps = 0
+        self.nb_iterations = 0
+        self.nb_not_converged = 0
+        self.max_residual = 0.0
+
+    def relax(self, value, previous):
+        if self.relaxation == 1.0:
+            return value
+        return previous + self.relaxation * (value - previous)
+
+    def residual(self, m, U, T, m_previous, U_previous, T_previous):
+        return max(abs(m - m_previous) / (self.tolerance_m * max(abs(m), 1e-12)),
+                   abs(U - U_previous) / (self.tolerance_U * max(abs(U), 1.0)),
+                   abs(T - T_previous) / self.tolerance_T)
+
+    def finish(self, iterations, residual):
+        self.nb_steps += 1
+        self.nb_iterations += iterations
+        self.max_residual = max(self.max_residual, residual)
+        if residual > 1.0:
+            self.nb_not_converged += 1
+
+    def get_statistics(self):
+        return {'steps': self.nb_steps,
+                'iterations': self.nb_iterations,
+                'not_converged': self.nb_not_converged,
+                'max_residual': self.max_residual,
+                'mean_iterations': self.nb_iterations / self.nb_steps if self.nb_steps else 0.0}
@@ -15,92 +15,127 @@ Functions :
 __init__()
 - Initialization of the tank substation parameters
 
-dichotomous_method()
-- Calculate the temperature corresponding to the system while using a dichotomous method
+solve_state(m, U, T)
+- Return the temperature, quality and pressure corresponding to the mass and internal energy of the tank with the
+shared tank solver warm-started from the temperature T of the previous pass (see tank_solver.py)
 
 state_change()
-- Change the simulation values inside the tank for 1 step
+- Change the simulation values inside the tank for 1 step (mass/energy passes repeated until the residual of
+classTankIteration is under its tolerances, the number of passes and the final residual are kept with the state).
+The passes work on local values, the row of the tank in the state table is written once at the end of the step
 
 set_m_dot_out()
 - Change the output mass flow rate at each step (can be used for data stored in datafile)
 
+get_state() / set_state(state)
+- Save and restore the internal values of the tank, the row of the tank inside the shared state table (used by the
+adaptive time stepping to reject a step)
+
+max_time_step(max_mass_change, m_scale)
+- Largest time step keeping the change of mass of the tank under max_mass_change of its mass (plus m_scale [kg])
+over one step, no bound when the tank is empty
+
 update()
-- update function using new parameters
+- update function using new parameters (saturated liquid or gas, two-phase input with its quality, or single phase
+input with x = -1)
 """
 
 
-import CoolProp.CoolProp as CP
-import values_storage
+from fluid_properties import classFluidState
+from saturation_table import get_saturation_table
+from state_arrays import add_state_fields, new_state
+from tank_solver import classTankIteration, classTankStateSolver
 
 
 
 class classTankS:
 
-    m = 0
-    m_dot_out = 0.5
-    p = 0
-    Q_dot = 0
-    T = 0
     ts = 0
-    U = 0
     V = 0
-    x = 0
 
     # Pipe Parameters
     pipe_parameters = [] # Dictionary of pipe parameters
 
+    # Internal values recorded at every step with the outputs (see recorder.py)
+    state_channels = {'m': 'm', 'U': 'U', 'quality': 'x', 'iterations': 'iterations', 'residual': 'residual'}
+
     def __init__(self, x, T, V, ts, Q_dot):   # [-], [K], [m3], [s], [W]
 
-        self.m = CP.PropsSI('D', 'T', T, 'Q', x, 'R744') * V  # [kg] total mass of refrigerant in tank
-        self.p = CP.PropsSI('P', 'T', T, 'Q', x, 'R744')
+        self.state = new_state(self)  # Row of the element, moved to the state table of its simulation by load()
+
+        self.fluid = classFluidState('R744')  # CoolProp state reused by the tank
+        density, self.p, internal_energy = self.fluid.TQ(T, x, 'D', 'P', 'U')
+
+        self.m = density * V  # [kg] total mass of refrigerant in tank
         self.Q_dot = Q_dot # [W] power exchanged inside the tank
         self.T = T  # [K] temperature of refrigerant
         self.ts = ts  # [s] time-step
-        self.U = (CP.PropsSI('U', 'T', T, 'Q', x,'R744')) * self.m  # [J] internal energy of refrigerant in tank
+        self.U = internal_energy * self.m  # [J] internal energy of refrigerant in tank
         self.V = V  # [m3] total volume of the tank
         self.x = x  # [-] quality (ratio between mass of gas over total mass) of refrigerant
 
+        self.saturation = get_saturation_table('R744')  # Saturation properties shared by all the tanks
+        self.solver = classTankStateSolver()  # Solver of the (m, U, V) -> (T, x, p) closure
+        self.iteration = classTankIteration()  # Convergence criteria of the mass/energy passes of each step
 
-    def dichotomous_method(self):
-        T_left = self.T - 5
-        T_right = self.T + 5
-
-        while abs(T_left - T_right) > 1e-12:  # 273.15 * 10 ** -2:
-            T = (T_left + T_right) / 2
-
-            UL = (CP.PropsSI('U', 'T', T, 'Q', 0, 'R744'))
-            UG = (CP.PropsSI('U', 'T', T, 'Q', 1, 'R744'))
-            DL = (CP.PropsSI('D', 'T', T, 'Q', 0, 'R744'))
-            DG = (CP.PropsSI('D', 'T', T, 'Q', 1, 'R744'))
-
-            Q = (self.U / self.m - UL) / (UG - UL)
 
-            Volume = 1 / DL * self.m * (1 - Q) + 1 / DG * self.m * Q
-
-            if Volume > self.V:
-                T_left = T
-            else:
-                T_right = T
-
-        self.T = T
-        self.p = CP.PropsSI('P', 'T', T, 'Q', 0, 'R744')
-        self.x = Q
+    def solve_state(self, m, U, T):
+        # Temperature, quality and pressure from the mass, internal energy and volume of the tank
+        return self.solver.solve(m, U, self.V, T)
 
     def state_change(self, m_dot_in, p_in, T_in, x_in):
 
         mass = self.m
         internalEnergy = self.U
+        m_dot_out = self.m_dot_out  # [kg/s] constant over the passes of the step
+        Q_dot = self.Q_dot  # [W]
+        ts = self.ts
+        u_in = self.saturation.internal_energy(T_in, x_in)  # [J/kg] internal energy of the input stream
+        iteration_criteria = self.iteration
+
+        # Mass/energy passes until m, U and T stop changing (see classTankIteration)
+        m, U, T = mass, internalEnergy, self.T
+        for iteration in range(1, iteration_criteria.max_iterations + 1):
+            m_previous, U_previous, T_previous = m, U, T
+
+            m = iteration_criteria.relax(mass + (m_dot_in - m_dot_out) * ts, m_previous)  # [kg]
+            U = iteration_criteria.relax(internalEnergy
+                                         - Q_dot * ts
+                                         + m_dot_in * ts * u_in
+                                         - m_dot_out * ts * self.saturation.internal_energy(T, 0),
+                                         U_previous)  # [J]
+            T, x, p = self.solve_state(m, U, T)
+
+            residual = iteration_criteria.residual(m, U, T, m_previous, U_previous, T_previous)
+            if residual <= 1.0:
+                break
+
+        iteration_criteria.finish(iteration, residual)
+
+        # Values of the step written once into the row of the tank (flow rate used to bound the adaptive time step)
+        self.m = m
+        self.U = U
+        self.T = T
+        self.x = x
+        self.p = p
+        self.iterations = iteration
+        self.residual = residual
+        self.m_dot_in = m_dot_in
 
-        for i in range(5):
+        return m_dot_out, p, T, 0
 
-            self.m = mass + (m_dot_in - self.m_dot_out) * self.ts  # [kg]
-            self.U = (internalEnergy
-                      - self.Q_dot * self.ts
-                      + m_dot_in * self.ts * CP.PropsSI('U', 'T', T_in, 'Q', x_in, 'R744')
-                      - self.m_dot_out * self.ts * CP.PropsSI('U', 'T', self.T, 'Q', 0, 'R744'))  # [J]
-            self.dichotomous_method()
+    def get_state(self):
+        return self.state.values.copy()
 
-        return self.m_dot_out, self.p, self.T, 0
+    def set_state(self, state):
+        self.state.values[:] = state
+
+    def max_time_step(self, max_mass_change, m_scale=0.0):
+        # An empty (or overdrawn) tank has no mass to keep, its step is only bounded by the local error
+        net_flow = abs(self.m_dot_in - self.m_dot_out)
+        if net_flow <= 0 or self.m <= 0:
+            return float('inf')
+        return max_mass_change * (self.m + m_scale) / net_flow
 
     def set_m_dot_out(self, value):
         self.m_dot_out = value
@@ -112,19 +147,22 @@ class classTankS:
             result = list(self.state_change(m_dot, p, T, 0.0))
         elif 1.0 - 1e-4 < x < 1.0 + 1e-4:
             result = list(self.state_change(m_dot, p, T, 1.0))
+        elif 0.0 < x < 1.0:
+            # Two-phase input (e.g. the output of a mixer), its energy is given by its quality
+            result = list(self.state_change(m_dot, p, T, x))
         elif x == -1.0:
-            phase = CP.PhaseSI('P', p, 'T', T, 'R744')
+            phase = self.fluid.phase(p, T)
             if phase == 'liquid':
                 result = list(self.state_change(m_dot, p, T, 0.0))
             elif phase == 'gas':
                 result = list(self.state_change(m_dot, p, T, 1.0))
 
-        values_storage.x_tank_s.append(self.x)
-        values_storage.p_tank_s.append(self.p / 10 ** 5)
-        values_storage.T_tank2.append(self.T - 273.15)
-        values_storage.m_dot_tank_s.append(m_dot)
-
         return result
 
     def get_pressure(self):
-        return self.p
\ No newline at end of file
+        return self.p
+
+
+# Dynamic variables of the substation tanks, one row per tank in the table of their simulation (see state_arrays.py)
+add_state_fields(classTankS, {'m': 0.0, 'U': 0.0, 'T': 0.0, 'p': 0.0, 'x': 0.0, 'Q_dot': 0.0, 'm_dot_in': 0.0,
+                              'm_dot_out': 0.5, 'iterations': 0.0, 'residual': 0.0})
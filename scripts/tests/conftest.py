@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the scripts, run from the repository or the scripts folder :
+python -m pytest scripts/tests
+"""
+
+
+import os
+import sys
+
+# The scripts import each other by module name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests/ scenarios of the repository
+tests_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'Tests')
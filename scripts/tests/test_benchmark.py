@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import json
+
+import numpy as np
+import pytest
+
+from benchmark import compare_with_baseline, relative_drift
+
+
+def write_baseline(path, results, trajectories):
+    with open(str(path / 'benchmark.json'), 'w') as bf:
+        json.dump(results, bf)
+    np.savez(str(path / 'trajectories.npz'), **trajectories)
+
+
+def test_relative_drift():
+    reference = np.array([1.0, np.nan, 4.0])
+
+    assert relative_drift(reference, reference.copy()) == 0.0
+    assert relative_drift(reference, np.array([1.0, np.nan, 4.2])) == pytest.approx(0.05)
+    assert relative_drift(reference, np.array([1.0, 2.0, 4.0])) == float('inf')
+    assert relative_drift(reference, reference[:2]) == float('inf')
+
+
+def test_baseline_comparison_reports_slow_runs_and_drift(tmp_path):
+    baseline = {'micro': {'kernel': 1e-6}, 'decks': {'Tank': {'step_time': 1e-3}}, 'networks': {}}
+    write_baseline(tmp_path, baseline, {'decks/Tank/tankC_1/p': np.array([60e5, 61e5])})
+
+    # The runs missing from the baseline are not compared
+    results = {'micro': {'kernel': 1.5e-6, 'new_kernel': 1.0}, 'decks': {'Tank': {'step_time': 1e-3}},
+               'networks': {'10': {'step_time': 1.0}}}
+    trajectories = {'decks/Tank/tankC_1/p': np.array([60e5, 61.1e5]), 'networks/10/tankC_1/p': np.zeros(2)}
+    comparison, regressions = compare_with_baseline(results, trajectories, str(tmp_path), time_tolerance=0.2,
+                                                    drift_tolerance=1e-3)
+
+    assert comparison['micro'] == {'kernel': 1.5}
+    assert comparison['networks'] == {}
+    assert comparison['drift']['decks/Tank'] == pytest.approx(0.1 / 61)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('micro kernel')
+    assert regressions[1].startswith('decks/Tank')
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import enthalpy_table
+import values_storage
+from enthalpy_table import classEnthalpyTable
+
+
+@pytest.fixture(scope='module')
+def table():
+    # Same node spacing as the table of the simulation, on the range of the saturation dome below 40 bar
+    return classEnthalpyTable('R744', p_min=6e5, p_max=40e5, h_min=100e3, h_max=480e3, nb_p=22, nb_h=88).build()
+
+
+def test_valid_cells_are_within_the_tolerance(table):
+    rng = np.random.default_rng(0)
+    h = rng.uniform(table.h_min, table.h_max, 4000)
+    p = rng.uniform(table.p_min, table.p_max, 4000)
+    inside = table.valid[((h - table.h_min) / table.dh).astype(int), ((p - table.p_min) / table.dp).astype(int)]
+    h, p = h[inside], p[inside]
+
+    reference = np.array([table.flash(h_point, p_point)[0] for h_point, p_point in zip(h, p)])
+    error = np.abs(table.evaluate(h, p) - reference)
+
+    assert len(h) > 3000
+    assert table.error_bound <= table.tolerance
+    assert np.max(error) <= table.tolerance
+
+
+def test_slopes_do_not_cross_the_saturation_lines(table):
+    # Nodes next to another phase group only use the nodes of their own group
+    phases = table.phases
+    i, j = np.nonzero((phases[1:-2] != phases[:-3]) & (phases[1:-2] == phases[2:-1]) & (phases[1:-2] == phases[3:]))
+    i += 1
+    forward = (-3 * table.values[i, j] + 4 * table.values[i + 1, j] - table.values[i + 2, j]) / 2
+
+    assert len(i) > 0
+    np.testing.assert_allclose(table.slopes[0][i, j], forward)
+
+
+def test_cells_crossed_by_a_saturation_line_use_coolprop(table):
+    corners = (table.phases[:-1, :-1], table.phases[1:, :-1], table.phases[:-1, 1:], table.phases[1:, 1:])
+    mixed = np.any([corner != corners[0] for corner in corners[1:]], axis=0)
+    i, j = np.argwhere(mixed)[0]
+
+    assert not np.any(table.valid[mixed])
+    h = table.h_min + (i + 0.5) * table.dh
+    p = table.p_min + (j + 0.5) * table.dp
+    assert table.temperature(h, p) == table.fluid_state.HP(h, p, 'T')
+
+
+def test_table_is_not_built_in_check_mode(monkeypatch):
+    monkeypatch.setitem(values_storage.enthalpy_table_parameters, 'use_coolprop', True)
+    monkeypatch.setattr(enthalpy_table, 'enthalpy_tables', {})
+
+    table = enthalpy_table.get_enthalpy_table('R744')
+
+    assert table.values is None
+    assert table.temperature(300e3, 30e5) == table.fluid_state.HP(300e3, 30e5, 'T')
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import pytest
+
+from conftest import tests_path
+from simulation import classSimulation
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+
+def tank_scenario(tmp_path, main, topology=None):
+    path = tmp_path / 'Scenario'
+    path.mkdir()
+    for name in ('default_parameters.txt', 'tankC_1.txt', 'tankS_1.txt', 'pipe_1.txt'):
+        shutil.copy(os.path.join(tank_path, name), path / name)
+    (path / 'main.txt').write_text(main)
+    if topology is not None:
+        (path / 'topology.txt').write_text(topology)
+
+    return os.path.join(str(path), '')
+
+
+def test_central_tank_without_pipe_is_rejected(tmp_path):
+    path = tank_scenario(tmp_path, 'tankC_1.txt classTankC\ntankS_1.txt classTankS')
+
+    with pytest.raises(ValueError, match='Central tank tankC_1 has no output pipe'):
+        classSimulation(path, str(tmp_path / 'results'), progress=0)
+
+
+def test_central_tank_without_substation_is_rejected(tmp_path):
+    path = tank_scenario(tmp_path, 'tankC_1.txt classTankC\npipe_1.txt classPipes')
+
+    with pytest.raises(ValueError, match='Central tank tankC_1 has no substation tank'):
+        classSimulation(path, str(tmp_path / 'results'), progress=0)
+
+
+def test_pipe_upstream_of_the_central_tank_is_not_its_output_pipe(tmp_path):
+    # The pipe feeds the central tank: it is in main.txt but not downstream of the tank
+    path = tank_scenario(tmp_path, 'tankC_1.txt classTankC\npipe_1.txt classPipes\ntankS_1.txt classTankS',
+                         'pipe_1 tankC_1\ntankC_1 tankS_1')
+
+    with pytest.raises(ValueError, match='Central tank tankC_1 has no output pipe'):
+        classSimulation(path, str(tmp_path / 'results'), progress=0)
+
+
+def test_central_tank_is_bound_to_its_neighbours(tmp_path):
+    simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+    tank, pipe, substation = simulation.created_instances
+
+    assert (tank.pipe, tank.substation) == (pipe, substation)
+    assert simulation.plan.couplings == [(tank, substation)]
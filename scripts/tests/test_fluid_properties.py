@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import CoolProp.CoolProp as CP
+import pytest
+
+from fluid_properties import classFluidState
+
+
+@pytest.mark.parametrize('T', [230.0, 263.15, 290.0])
+@pytest.mark.parametrize('Q', [0.0, 0.4, 1.0])
+def test_TQ_matches_PropsSI(T, Q):
+    fluid = classFluidState('R744', backend='HEOS')
+
+    rho, mu, U = fluid.TQ(T, Q, 'D', 'V', 'U')
+
+    assert rho == pytest.approx(CP.PropsSI('D', 'T', T, 'Q', Q, 'R744'), rel=1e-12)
+    assert mu == pytest.approx(CP.PropsSI('V', 'T', T, 'Q', Q, 'R744'), rel=1e-12)
+    assert U == pytest.approx(CP.PropsSI('U', 'T', T, 'Q', Q, 'R744'), rel=1e-12)
+
+
+def test_PQ_PT_and_HP_match_PropsSI():
+    fluid = classFluidState('R744', backend='HEOS')
+
+    assert fluid.PQ(40e5, 0.0, 'T') == pytest.approx(CP.PropsSI('T', 'P', 40e5, 'Q', 0.0, 'R744'), rel=1e-12)
+    assert fluid.PT(100e5, 320.0, 'D') == pytest.approx(CP.PropsSI('D', 'P', 100e5, 'T', 320.0, 'R744'), rel=1e-12)
+
+    h = CP.PropsSI('H', 'P', 40e5, 'Q', 0.3, 'R744')
+    T, Q = fluid.HP(h, 40e5, 'T', 'Q')
+    assert T == pytest.approx(CP.PropsSI('T', 'H', h, 'P', 40e5, 'R744'), rel=1e-12)
+    assert Q == pytest.approx(0.3, rel=1e-9)
+
+
+def test_single_output_is_a_float_and_single_phase_quality_is_minus_one():
+    fluid = classFluidState('R744', backend='HEOS')
+
+    assert isinstance(fluid.TQ(263.15, 0.0, 'P'), float)
+    assert fluid.PT(100e5, 320.0, 'Q') == -1.0
+
+
+@pytest.mark.parametrize('p, T, phase', [(60e5, 250.0, 'liquid'), (20e5, 280.0, 'gas'),
+                                         (100e5, 320.0, 'supercritical')])
+def test_phase_uses_the_names_of_PhaseSI(p, T, phase):
+    fluid = classFluidState('R744', backend='HEOS')
+
+    assert fluid.phase(p, T) == phase == CP.PhaseSI('P', p, 'T', T, 'R744')
+
+
+def test_tabular_backend_stays_close_to_PropsSI():
+    fluid = classFluidState('R744', backend='BICUBIC&HEOS')
+
+    assert fluid.TQ(263.15, 1.0, 'D') == pytest.approx(CP.PropsSI('D', 'T', 263.15, 'Q', 1.0, 'R744'), rel=1e-4)
+    assert fluid.PT(100e5, 320.0, 'Q') == -1.0
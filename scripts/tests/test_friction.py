@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from math import log10, sqrt
+
+import numpy as np
+import pytest
+
+from friction import classFrictionSolver, colebrook_white, friction_factors
+
+
+@pytest.mark.parametrize('Re', [4e3, 1e5, 1e7])
+@pytest.mark.parametrize('k', [0.0, 1e-5, 1e-3])
+def test_friction_factor_solves_colebrook_white(Re, k):
+    fd = colebrook_white(Re, k, 0.03)[0]
+
+    # 1 / sqrt(fd) = -2 log10(k / (3.71 d) + 2.51 / (Re sqrt(fd)))
+    assert 1 / sqrt(fd) == pytest.approx(-2 * log10(k / 3.71 / 0.03 + 2.51 / (Re * sqrt(fd))), rel=1e-10)
+
+
+def test_vectorized_friction_factors_match_the_scalar_solve():
+    Re = np.geomspace(4e3, 1e7, 50)
+
+    expected = [colebrook_white(value, 1e-5, 0.03)[0] for value in Re]
+    np.testing.assert_allclose(friction_factors(Re, 1e-5, 0.03), expected, rtol=1e-12)
+
+
+def test_solver_reuses_the_last_result():
+    solver = classFrictionSolver()
+    for Re in (1e5, 1e5, 2e5, 2e5, 2e5):
+        solver.friction_factor(Re, 1e-5, 0.03)
+
+    statistics = solver.get_statistics()
+    assert statistics['calls'] == 5
+    assert statistics['solves'] == 2
+    assert solver.fd == colebrook_white(2e5, 1e-5, 0.03)[0]
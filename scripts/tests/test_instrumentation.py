@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+
+from conftest import tests_path
+from fluid_properties import classFluidState
+from instrumentation import classInstrumentation, classProgressReporter
+from simulation import classSimulation
+from tank_central import classTankC
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+
+def test_timers_count_every_call_of_the_run(tmp_path):
+    instrumentation = classInstrumentation(trace=True).start()
+    try:
+        simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+        simulation.run(5)
+    finally:
+        instrumentation.stop()
+    instrumentation.collect(simulation)
+    summary = instrumentation.get_summary()
+
+    # One update of each tank per step, every timed call is an event of the trace
+    assert summary['timers']['classTankC.update']['calls'] == 5
+    assert summary['timers']['classTankS.update']['calls'] == 5
+    assert summary['nb_events'] == sum(timer['calls'] for timer in summary['timers'].values())
+    assert summary['total_property_calls'] == sum(summary['property_calls'].values()) > 0
+    assert summary['solvers']['tankC_1']['mass_energy_passes']['steps'] == 5
+
+
+def test_property_calls_are_counted_per_call_site():
+    fluid = classFluidState('R744')
+    instrumentation = classInstrumentation(trace=False).start(classes=[])
+    try:
+        for _ in range(3):
+            fluid.PQ(30e5, 0.0, 'T')
+        fluid.TQ(280.0, 1.0, 'P')
+    finally:
+        instrumentation.stop()
+
+    site = 'test_instrumentation.test_property_calls_are_counted_per_call_site'
+    assert instrumentation.property_calls[f'{site}:PQ'] == 3
+    assert instrumentation.property_calls[f'{site}:TQ'] == 1
+    assert instrumentation.events == []
+
+
+def test_stop_puts_the_original_methods_back():
+    originals = (vars(classFluidState)['PQ'], vars(classTankC)['update'])
+
+    classInstrumentation().start().stop()
+
+    assert (vars(classFluidState)['PQ'], vars(classTankC)['update']) == originals
+
+
+def test_progress_reporter_is_silent_at_level_0(tmp_path):
+    stream = io.StringIO()
+    simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+    simulation.progress = classProgressReporter(level=0, stream=stream)
+    simulation.run(3)
+
+    assert stream.getvalue() == ''
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from fluid_properties import classFluidState
+from mixer import classMixer
+
+
+def test_saturated_inputs_give_a_saturated_output():
+    fluid = classFluidState('R744')
+    mixer = classMixer(2e4)
+    streams = [[0.3, fluid.TQ(268.0, 0.0, 'P'), 268.0, 0.2], [0.1, fluid.TQ(275.0, 0.0, 'P'), 275.0, 0.6]]
+
+    m_dot, p, T, x = mixer.mix(streams)
+
+    assert m_dot == pytest.approx(0.4)
+    assert p == pytest.approx(streams[0][1] - 2e4)
+    assert fluid.TQ(T, 0.0, 'P') == pytest.approx(p, rel=1e-6)
+    assert 0.0 < x < 1.0
+
+    # The enthalpy of the inputs is kept
+    h = sum(stream[0] * fluid.TQ(stream[2], stream[3], 'H') for stream in streams) / m_dot
+    assert fluid.TQ(T, x, 'H') == pytest.approx(h, rel=1e-9)
+
+
+def test_single_phase_inputs_are_mixed_at_the_output_pressure():
+    fluid = classFluidState('R744')
+    mixer = classMixer(0.0)
+    streams = [[0.2, 50e5, 290.0, -1.0], [0.2, 50e5, 300.0, -1.0]]
+
+    m_dot, p, T, x = mixer.mix(streams)
+
+    assert 290.0 < T < 300.0
+    assert fluid.PT(p, T, 'H') == pytest.approx((fluid.PT(50e5, 290.0, 'H') + fluid.PT(50e5, 300.0, 'H')) / 2)
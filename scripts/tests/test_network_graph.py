@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import tests_path
+from network_graph import classNetworkGraph
+from simulation import classSimulation
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+# Central tank feeding two parallel pipes merged back into the substation tank, which closes the loop
+branched_files = {
+    'main.txt': 'tankC_1.txt classTankC\nsplitter_1.txt classSplitter\npipe_1.txt classPipes\npipe_2.txt classPipes\n'
+                'mixer_1.txt classMixer\ntankS_1.txt classTankS',
+    'topology.txt': 'tankC_1 splitter_1\nsplitter_1 pipe_1\nsplitter_1 pipe_2\npipe_1 mixer_1\npipe_2 mixer_1\n'
+                    'mixer_1 tankS_1\ntankS_1 tankC_1',
+    'splitter_1.txt': 'fraction_1 0.5\nfraction_2 0.5',
+    'mixer_1.txt': 'delta_p 0.0',
+}
+
+
+def branched_scenario(tmp_path):
+    path = tmp_path / 'Branched'
+    path.mkdir()
+    for name in ('default_parameters.txt', 'tankC_1.txt', 'tankS_1.txt', 'pipe_1.txt'):
+        shutil.copy(os.path.join(tank_path, name), path / name)
+    shutil.copy(path / 'pipe_1.txt', path / 'pipe_2.txt')
+    for name, text in branched_files.items():
+        (path / name).write_text(text)
+
+    return os.path.join(str(path), '')
+
+
+def test_loop_is_broken_at_the_storage_element(tmp_path):
+    simulation = classSimulation(branched_scenario(tmp_path), str(tmp_path / 'results'), progress=0)
+    graph = simulation.graph
+
+    assert [graph.names[element_id] for element_id in graph.order] == \
+        ['tankC_1', 'splitter_1', 'pipe_1', 'pipe_2', 'mixer_1', 'tankS_1']
+    assert graph.lagged == {(graph.ids['tankS_1'], graph.ids['tankC_1'])}
+
+
+@pytest.mark.parametrize('implicit', [False, True])
+def test_branched_network_runs_with_a_two_phase_mixer_output(tmp_path, implicit):
+    simulation = classSimulation(branched_scenario(tmp_path), str(tmp_path / 'results'), progress=0,
+                                 implicit=implicit)
+    results = simulation.run(20)
+
+    # The mixer merges the two saturated gas streams into a two-phase stream accepted by the substation tank
+    assert 0.0 < results['mixer_1']['x'][0] < 1.0
+    assert not any(np.any(np.isnan(values)) for channels in results.values() for values in channels.values())
+
+    # Mass balance of the splitter and of the mixer
+    np.testing.assert_allclose(results['pipe_1']['m_dot'] + results['pipe_2']['m_dot'], results['tankC_1']['m_dot'])
+    np.testing.assert_allclose(results['mixer_1']['m_dot'], results['tankC_1']['m_dot'])
+    np.testing.assert_allclose(results['mixer_1']['p'], np.minimum(results['pipe_1']['p'], results['pipe_2']['p']))
+
+
+def test_cycle_without_storage_element_is_rejected(tmp_path):
+    simulation = classSimulation(branched_scenario(tmp_path), str(tmp_path / 'results'), progress=0)
+    graph = classNetworkGraph(simulation.elements_with_no_extension, simulation.created_instances)
+    for source, target in (('splitter_1', 'pipe_1'), ('splitter_1', 'pipe_2'), ('pipe_1', 'mixer_1'),
+                           ('pipe_2', 'mixer_1'), ('mixer_1', 'splitter_1')):
+        graph.add_connection(source, target)
+
+    with pytest.raises(ValueError, match='Cycle without storage element'):
+        graph.schedule()
+
+
+def test_element_without_output_is_named(tmp_path):
+    simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+    # Supercritical inlet: the central tank only takes saturated or two-phase streams
+    simulation.plan.slots[0] = (0.5, 100e5, 320.0, -1.0)
+
+    with pytest.raises(ValueError, match='Element tankC_1 has no output'):
+        simulation.step()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+
+from conftest import tests_path
+from simulation import classSimulation
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+
+def load(tmp_path):
+    return classSimulation(tank_path, str(tmp_path), progress=0, implicit=True)
+
+
+def test_implicit_steps_close_the_pressure_balance(tmp_path):
+    simulation = load(tmp_path)
+    simulation.run(10)
+
+    solver = simulation.network_solver
+    assert solver.nb_failures == 0
+    for central, substation in zip(solver.centrals, solver.substations):
+        assert abs(central.delta_p - (central.p - substation.p)) < solver.tolerance
+
+
+def test_statistics_count_one_evaluation_per_step(tmp_path):
+    simulation = load(tmp_path)
+    simulation.run(10)
+
+    # The Jacobian probes and the trial steps of the line search are not counted
+    assert simulation.network_solver.nb_evaluations > 10
+    for element, statistics in simulation.convergence_statistics().items():
+        assert statistics['steps'] == 10
+    for instance in simulation.created_instances:
+        if hasattr(instance, 'solver'):
+            assert instance.solver.nb_solves == instance.iteration.nb_iterations
+
+
+def test_failed_line_search_keeps_the_current_iterate(tmp_path):
+    simulation = load(tmp_path)
+    solver = simulation.network_solver
+    guess = [central.delta_p for central in solver.centrals]
+
+    # Newton steps in the wrong direction never decrease the residual
+    solver.solve_linear = lambda values, residual: -1e3 * np.sign(residual) * np.maximum(np.abs(residual), 1e5)
+    state, counters = simulation.save_state(), simulation.save_counters()
+    expected, _ = solver.residual(np.array(guess, dtype=float), state)
+    simulation.restore_state(state)
+    simulation.restore_counters(counters)
+    simulation.step()
+
+    assert solver.nb_failures == 1
+    assert [central.delta_p for central in solver.centrals] == guess
+    for central, substation in zip(solver.centrals, solver.substations):
+        assert central.delta_p - (central.p - substation.p) == expected[0]
+    for statistics in simulation.convergence_statistics().values():
+        assert statistics['steps'] == 1
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from conftest import tests_path
+from parameter_sweep import grid_variants, write_variant
+
+
+def test_write_variant_changes_the_values(tmp_path):
+    write_variant(os.path.join(tests_path, 'Tank'), {'default_parameters.txt:m_dot_in': 0.25}, str(tmp_path))
+
+    with open(tmp_path / 'default_parameters.txt') as dp:
+        assert 'm_dot_in 0.25' in dp.read().split('\n')
+
+
+@pytest.mark.parametrize('name', ['default_parameters.txt:unknown', 'unknown.txt:m_dot_in'])
+def test_write_variant_rejects_unknown_parameters(tmp_path, name):
+    with pytest.raises(ValueError, match=name):
+        write_variant(os.path.join(tests_path, 'Tank'), {name: 1.0}, str(tmp_path))
+
+
+def test_grid_variants():
+    assert grid_variants({'a:x': [1, 2], 'b:y': [3]}) == [{'a:x': 1, 'b:y': 3}, {'a:x': 2, 'b:y': 3}]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import numpy as np
+import pytest
+
+import values_storage
+from conftest import tests_path
+from pipe_bank import classPipeBank
+from pipeline import classPipes
+from simulation import classSimulation
+
+pipeline_path = os.path.join(tests_path, 'Pipeline', '')
+
+# Pipes of different lengths and diameters
+pipe_values = [(15.0, 0.03, 1e-5), (0.6, 0.02, 1e-5), (40.0, 0.05, 1e-4)]
+
+
+@pytest.mark.parametrize('x', [0.0, 1.0, 0.3, -1.0])
+def test_chain_matches_the_pipes_computed_one_after_the_other(x):
+    pipes = [classPipes(*values) for values in pipe_values]
+    bank = classPipeBank.from_pipes(pipes, use_table=False)
+
+    stream = [0.5, 60e5, 280.0, x]
+    expected_p_in = []
+    for pipe in pipes:
+        expected_p_in.append(stream[1])
+        stream = pipe.update(*stream)
+
+    p_in, p_out = bank.compute_output_chain(0.5, 60e5, 280.0, bank.quality(60e5, 280.0, x))
+
+    np.testing.assert_allclose(p_in, expected_p_in, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(p_out[-1], stream[1], rtol=0, atol=1e-6)
+    np.testing.assert_allclose(bank.fd, [pipe.fd for pipe in pipes], rtol=1e-12)
+
+
+@pytest.mark.parametrize('use_table', [True, False])
+@pytest.mark.parametrize('x', [0.0, 1.0, 0.3])
+def test_parallel_bank_matches_the_update_of_each_pipe(use_table, x):
+    pipes = [classPipes(*values) for values in pipe_values]
+    bank = classPipeBank.from_pipes(pipes, use_table=use_table)
+
+    p_out = bank.update(0.5, 60e5, 280.0, x)[1]
+
+    np.testing.assert_allclose(p_out, [pipe.update(0.5, 60e5, 280.0, x)[1] for pipe in pipes], rtol=0, atol=1e-6)
+
+
+def test_stream_not_handled_by_the_pipes_has_no_quality():
+    bank = classPipeBank.from_pipes([classPipes(*values) for values in pipe_values], use_table=False)
+
+    # Supercritical stream
+    assert bank.quality(100e5, 320.0, -1.0) is None
+    assert bank.quality(60e5, 280.0, 1.5) is None
+
+
+def run_pipeline(tmp_path, enabled, monkeypatch, path=pipeline_path):
+    monkeypatch.setitem(values_storage.pipe_bank_parameters, 'enabled', enabled)
+    simulation = classSimulation(path, str(tmp_path / f'results_{enabled}'), progress=0)
+
+    return simulation, simulation.run(10)
+
+
+def test_plan_computes_the_chain_of_main_txt_with_one_bank(tmp_path, monkeypatch):
+    simulation, results = run_pipeline(tmp_path, True, monkeypatch)
+    reference, expected = run_pipeline(tmp_path, False, monkeypatch)
+
+    assert len(simulation.plan.operations) == 1
+    assert len(reference.plan.operations) == 2
+    for name in expected:
+        for channel in expected[name]:
+            np.testing.assert_array_equal(results[name][channel], expected[name][channel])
+
+    # The variables of the pipes are written into their rows of the state table
+    for pipe, pipe_reference in zip(simulation.created_instances, reference.created_instances):
+        assert pipe.state.as_dict() == pipe_reference.state.as_dict()
+
+
+def test_chains_of_a_topology_stop_at_branches(tmp_path, monkeypatch):
+    pipes = {'L': 15.0, 'd': 0.03, 'k': 1e-5}
+    scenario = {
+        'version': 1,
+        'parameters': {'m_dot_in': 0.5, 'p_in': 64.35, 'T_in': 10.0},
+        'elements': [{'name': 'splitter_1', 'class': 'classSplitter', 'parameters': {'fractions': [0.5, 0.5]}}] +
+                    [{'name': f'pipe_{i}', 'class': 'classPipes', 'parameters': pipes} for i in range(1, 6)],
+        'connections': [['splitter_1', 'pipe_1'], ['pipe_1', 'pipe_2'], ['pipe_2', 'pipe_3'],
+                        ['splitter_1', 'pipe_4'], ['pipe_4', 'pipe_5']],
+    }
+    path = tmp_path / 'chains.json'
+    path.write_text(json.dumps(scenario))
+
+    simulation, results = run_pipeline(tmp_path, True, monkeypatch, str(path))
+    ids = simulation.graph.ids
+    assert simulation.plan.find_pipe_chains() == [[ids['pipe_1'], ids['pipe_2'], ids['pipe_3']],
+                                                  [ids['pipe_4'], ids['pipe_5']]]
+
+    reference, expected = run_pipeline(tmp_path, False, monkeypatch, str(path))
+    for name in expected:
+        for channel in expected[name]:
+            np.testing.assert_array_equal(results[name][channel], expected[name][channel])
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pytest
+
+from profiles import classProfile
+
+
+def write_csv(path, lines):
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def test_interpolation_across_chunks(tmp_path):
+    path = write_csv(tmp_path / 'p.csv', ['t,q'] + [f'{t},{2 * t}' for t in range(0, 100, 10)])
+    profile = classProfile(path, 'q', 't', chunk_size=3, scale=0.5)
+
+    assert [profile.value(t) for t in (-5, 5, 25, 31, 89, 200)] == [0.0, 5.0, 25.0, 31.0, 89.0, 90.0]
+
+
+def test_repeated_times_keep_the_last_value(tmp_path):
+    path = write_csv(tmp_path / 'p.csv', ['t,q', '0,0', '10,1', '10,3', '20,5', '20,7', '30,9'])
+    for chunk_size in (1, 2, 10):
+        profile = classProfile(path, 'q', 't', chunk_size=chunk_size)
+        assert [profile.value(t) for t in (5, 10, 15, 25)] == [1.5, 3.0, 5.0, 8.0]
+
+
+def test_times_going_backwards_are_rejected(tmp_path):
+    path = write_csv(tmp_path / 'p.csv', ['t,q', '0,0', '20,1', '10,2'])
+    with pytest.raises(ValueError, match='backwards'):
+        classProfile(path, 'q', 't').value(15)
+
+
+@pytest.mark.parametrize('dates', [['2023-01-01 00:00', '2023-01-01 00:15'],
+                                   ['01.01.2023 00:00', '01.01.2023 00:15'],
+                                   ['01/01/2023 00:00', '01/01/2023 00:15'],
+                                   ['31.12.2023 23:45:00', '01.01.2024 00:00:00']])
+def test_date_formats(tmp_path, dates):
+    path = write_csv(tmp_path / 'p.csv', ['date,q', f'{dates[0]},0', f'{dates[1]},900'])
+    assert classProfile(path, 'q', 'date').value(450.0) == 450.0
+
+
+def test_xlsx_dates(tmp_path):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(['date', 'text', 'q'])
+    worksheet.append([datetime(2023, 10, 29, 2, 0), '29.10.2023 02:00', 0.0])
+    worksheet.append([datetime(2023, 10, 29, 2, 0), '29.10.2023 02:00', 10.0])
+    worksheet.append([datetime(2023, 10, 29, 3, 0), '29.10.2023 03:00', 20.0])
+    workbook.save(tmp_path / 'p.xlsx')
+
+    for time_column in ('date', 'text'):
+        profile = classProfile(str(tmp_path / 'p.xlsx'), 'q', time_column)
+        assert profile.value(1800.0) == 15.0
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import property_cache
+import values_storage
+from fluid_properties import classFluidState
+from property_cache import classPropertyCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = classPropertyCache(max_size=2)
+    cache.put('a', 1.0)
+    cache.put('b', 2.0)
+    cache.get('a')  # 'b' becomes the least recently used entry
+    cache.put('c', 3.0)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1.0, 3.0)
+    assert cache.get_statistics()['evictions'] == 1
+    assert cache.get_statistics()['size'] == 2
+
+
+def test_inputs_are_rounded_on_their_grid():
+    cache = classPropertyCache(quantization={'T': 0.01, 'P': 0.0})
+
+    assert cache.quantize('T', 263.1549) == pytest.approx(263.15)
+    assert cache.quantize('T', 263.1549) == cache.quantize('T', 263.1451)
+    assert cache.quantize('P', 40e5 + 0.3) == 40e5 + 0.3
+    assert cache.quantize('H', 1.5) == 1.5
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = classPropertyCache()
+    for key in ('a', 'a', 'b', 'a'):
+        if cache.get(key) is None:
+            cache.put(key, 0.0)
+
+    statistics = cache.get_statistics()
+    assert (statistics['hits'], statistics['misses']) == (2, 2)
+    assert statistics['hit_rate'] == 0.5
+
+    cache.export_statistics(str(tmp_path / 'cache.json'))
+    with open(str(tmp_path / 'cache.json')) as sf:
+        assert json.load(sf) == statistics
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    monkeypatch.setitem(values_storage.property_cache_parameters, 'enabled', True)
+    monkeypatch.setitem(values_storage.property_cache_parameters, 'quantization',
+                        {'T': 0.01, 'P': 0.0, 'Q': 0.0, 'H': 0.0})
+    monkeypatch.setattr(property_cache, 'property_cache', None)
+
+    yield property_cache.get_property_cache()
+
+
+def test_fluid_state_reads_the_quantized_property_from_the_cache(enabled_cache):
+    fluid = classFluidState('R744', backend='HEOS')
+    reference = classFluidState('R744', backend='HEOS')
+    reference.cache = None
+
+    first = fluid.TQ(263.1549, 1.0, 'D', 'V')
+    second = fluid.TQ(263.1451, 1.0, 'D', 'V')
+
+    # Both temperatures are on the 263.15 K grid point, the second call is a hit
+    assert first == second == reference.TQ(263.15, 1.0, 'D', 'V')
+    assert (enabled_cache.nb_hits, enabled_cache.nb_misses) == (1, 1)
+
+    # Other outputs are another entry
+    fluid.TQ(263.15, 1.0, 'D')
+    assert enabled_cache.nb_misses == 2
+
+
+def test_phase_is_cached(enabled_cache):
+    fluid = classFluidState('R744', backend='HEOS')
+
+    assert fluid.phase(20e5, 280.0) == fluid.phase(20e5, 280.0) == 'gas'
+    assert (enabled_cache.nb_hits, enabled_cache.nb_misses) == (1, 1)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from recorder import classRecorder
+from result_store import classResultStore
+
+
+class classElement:
+
+    state_channels = {'mass': 'm'}
+
+    def __init__(self):
+        self.m = 0.0
+
+
+def record_steps(recorder, element_id, element, start, stop):
+    for step in range(start, stop):
+        element.m = 10.0 * step
+        recorder.record(element_id, (step, 2.0 * step, 3.0 * step, 0.0))
+        recorder.next_step()
+
+
+def test_chunks_grow_in_memory_and_keep_the_order_of_the_steps():
+    recorder = classRecorder(chunk_size=4)
+    element = classElement()
+    element_id = recorder.add_element('tank_1', element)
+    record_steps(recorder, element_id, element, 0, 10)
+
+    assert recorder.channels[element_id] == ('m_dot', 'p', 'T', 'x', 'mass')
+    assert len(recorder.chunks[element_id]) == 3
+    np.testing.assert_array_equal(recorder.get('tank_1', 'm_dot'), np.arange(10.0))
+    np.testing.assert_array_equal(recorder.get('tank_1', 'mass'), 10.0 * np.arange(10.0))
+
+
+def test_preallocated_recorder_keeps_one_chunk():
+    recorder = classRecorder(nb_steps=10, chunk_size=4)
+    element = classElement()
+    element_id = recorder.add_element('tank_1', element)
+    record_steps(recorder, element_id, element, 0, 10)
+
+    assert recorder.chunk_size == 10
+    assert len(recorder.chunks[element_id]) == 2
+    np.testing.assert_array_equal(recorder.get('tank_1', 'p'), 2.0 * np.arange(10.0))
+
+
+def test_full_chunks_are_flushed_to_the_sink_and_read_back_from_memmap(tmp_path):
+    store = classResultStore(str(tmp_path), 'w')
+    recorder = classRecorder(chunk_size=4, sink=store)
+    element = classElement()
+    element_id = recorder.add_element('tank_1', element)
+    record_steps(recorder, element_id, element, 0, 10)
+
+    # Two full chunks are written, the arrays of the chunk are reused
+    assert classResultStore(str(tmp_path), 'r').index['nb_steps'] == 8
+    assert len(recorder.chunks[element_id]) == 1
+
+    # get() writes the last steps, the values are read from the files
+    values = recorder.get('tank_1', 'mass')
+    assert isinstance(values, np.memmap)
+    np.testing.assert_array_equal(values, 10.0 * np.arange(10.0))
+    np.testing.assert_array_equal(classResultStore(str(tmp_path), 'r').read('tank_1', 'T'), 3.0 * np.arange(10.0))
+
+
+def test_appended_blocks_cross_the_chunks(tmp_path):
+    store = classResultStore(str(tmp_path), 'w')
+    recorder = classRecorder(chunk_size=4, sink=store)
+    recorder.add_element('a', classElement())
+    recorder.append([np.arange(50.0).reshape(10, 5)])
+
+    assert recorder.nb_steps == 10
+    np.testing.assert_array_equal(recorder.get('a', 'mass'), np.arange(4.0, 50.0, 5.0))
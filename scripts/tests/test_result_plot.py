@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from result_plot import decimate, lttb, min_max
+
+
+@pytest.fixture
+def signal():
+    x = np.arange(100000, dtype=float)
+    y = np.sin(x / 5000)
+    y[31234] = 5.0  # Single-step spike
+    y[77777] = -5.0
+    y[50000:50010] = np.nan
+    return x, y
+
+
+def test_min_max_keeps_the_extremes_in_time_order(signal):
+    x, y = signal
+    indices = min_max(x, y, 1000)
+
+    assert len(indices) <= 1000
+    assert np.all(np.diff(indices) > 0)
+    assert {31234, 77777} <= set(indices.tolist())
+    assert not np.any(np.isnan(y[indices]))
+
+
+def test_min_max_of_a_bucket_of_nan_keeps_one_point():
+    y = np.full(100, np.nan)
+    y[:50] = 1.0
+
+    indices = min_max(np.arange(100), y, 10)
+    assert np.all(np.diff(indices) > 0)
+    assert np.any(np.isnan(y[indices]))
+
+
+def test_lttb_keeps_the_ends_and_the_spikes(signal):
+    x, y = signal
+    indices = lttb(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert {31234, 77777} <= set(indices.tolist())
+
+
+def test_decimate_keeps_short_channels_and_rejects_unknown_methods(signal):
+    x, y = signal
+
+    x_kept, y_kept = decimate(x[:100], y[:100], 1000, 'lttb')
+    np.testing.assert_array_equal(y_kept, y[:100])
+    with pytest.raises(ValueError):
+        decimate(x, y, 1000, 'mean')
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+
+from result_store import classResultStore
+
+
+def test_steps_are_published_once_every_element_is_written(tmp_path):
+    store = classResultStore(str(tmp_path), 'w', time_step=0.5)
+    store.add_element('tankC_1', ['m_dot', 'p'])
+    store.add_element('pipe_1', ['m_dot', 'p', 'T'])
+    store.close()
+
+    # A block written for one element only is not visible to the readers
+    store.write('tankC_1', np.ones((3, 2)))
+    assert classResultStore(str(tmp_path), 'r').index['nb_steps'] == 0
+
+    store.write('pipe_1', np.ones((3, 3)))
+    store.index['nb_steps'] += 3
+    store.write_steps({'tankC_1': np.zeros((2, 2)), 'pipe_1': np.zeros((2, 3))})
+
+    reader = classResultStore(str(tmp_path), 'r')
+    assert reader.index['nb_steps'] == 5
+    for name, channels in reader.index['elements'].items():
+        for channel in channels:
+            assert os.path.getsize(reader.file_path(name, channel)) == 5 * reader.dtype.itemsize
+            assert list(reader.read(name, channel)) == [1.0] * 3 + [0.0] * 2
+
+
+def test_blocks_of_different_lengths_are_rejected(tmp_path):
+    store = classResultStore(str(tmp_path), 'w')
+    store.add_element('a', ['x'])
+    store.add_element('b', ['x'])
+
+    with pytest.raises(ValueError):
+        store.write_steps({'a': np.zeros((2, 1)), 'b': np.zeros((3, 1))})
+
+
+def test_read_time_window(tmp_path):
+    store = classResultStore(str(tmp_path), 'w', time_step=0.5)
+    store.add_element('a', ['x'])
+    store.write_steps({'a': np.arange(10.0)[:, None]})
+    store.close()
+
+    reader = classResultStore(str(tmp_path), 'r')
+    assert list(reader.read('a', 'x', 1.0, 2.0)) == [2.0, 3.0, 4.0]
+    assert list(reader.time(1.0, 2.0)) == [1.0, 1.5, 2.0]
+
+
+def test_truncate(tmp_path):
+    store = classResultStore(str(tmp_path), 'w')
+    store.add_element('a', ['x'])
+    store.write_steps({'a': np.arange(10.0)[:, None]})
+    store.truncate(4)
+
+    assert list(classResultStore(str(tmp_path), 'r').read('a', 'x')) == [0.0, 1.0, 2.0, 3.0]
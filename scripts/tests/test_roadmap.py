@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import argparse
+import os
+import subprocess
+import sys
+
+import roadmap
+import values_storage
+
+scripts_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(module):
+    process = subprocess.run([sys.executable, '-c', f'import sys, {module}; print(" ".join(sys.modules))'],
+                             capture_output=True, text=True, cwd=scripts_path, check=True)
+    return set(process.stdout.split())
+
+
+def test_worker_imports_are_under_the_budget(capsys):
+    arguments = argparse.Namespace(module='simulation', budget=None)
+
+    assert roadmap.check_import_time(arguments)
+    assert f"budget {values_storage.cli_parameters['import_budget'] * 1e3:.0f} ms" in capsys.readouterr().out
+
+
+def test_import_time_counts_every_top_level_module():
+    imports = roadmap.measure_import_time('simulation')
+
+    names = [name for level, name, self_time, cumulative in imports if level == 0]
+    assert 'simulation' in names
+    assert all(cumulative >= self_time >= 0.0 for level, name, self_time, cumulative in imports)
+
+
+def test_worker_does_not_import_the_fluid_library_or_the_plots():
+    modules = imported_modules('simulation')
+
+    assert 'simulation' in modules
+    assert not {'CoolProp', 'plotly', 'matplotlib'} & {name.split('.')[0] for name in modules}
+
+
+def test_entry_point_only_imports_the_standard_library():
+    modules = imported_modules('roadmap')
+
+    assert not {'numpy', 'CoolProp', 'plotly', 'matplotlib'} & {name.split('.')[0] for name in modules}
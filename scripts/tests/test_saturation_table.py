@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import CoolProp.CoolProp as CP
+import numpy as np
+import pytest
+
+from saturation_table import classSaturationTable
+
+
+@pytest.fixture(scope='module')
+def table():
+    return classSaturationTable(nb_points=300).build()
+
+
+def test_error_bound_holds_between_the_nodes(table):
+    T = np.random.default_rng(0).uniform(table.T_min, table.T_max, 200)
+    for name, (output, Q) in table.properties.items():
+        reference = np.array([CP.PropsSI(output, 'T', value, 'Q', Q, 'R744') for value in T])
+        error = np.max(np.abs(table.evaluate(name, T) / reference - 1))
+        assert error <= 2 * table.error_bound[name] + 1e-12
+
+
+def test_check_accuracy_checks_the_interpolation_in_coolprop_mode():
+    table = classSaturationTable(nb_points=300, use_coolprop=True).build()
+
+    assert table.error_bound['p'] > 0.0
+    assert table.pressure(280.0) == CP.PropsSI('P', 'T', 280.0, 'Q', 0, 'R744')
+
+
+def test_outside_of_the_table_uses_coolprop(table):
+    assert table.pressure(table.T_min - 1.0) == CP.PropsSI('P', 'T', table.T_min - 1.0, 'Q', 0, 'R744')
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+
+import pytest
+
+from conftest import tests_path
+from scenario import check_scenario, compile_scenario, import_directory, read_scenario, write_scenario
+
+
+def tank_scenario():
+    return import_directory(os.path.join(tests_path, 'Tank'))
+
+
+def test_scenario_file_gives_the_network_of_its_folder(tmp_path):
+    scenario = tank_scenario()
+    path = str(tmp_path / 'Tank.json')
+    write_scenario(scenario, path)
+
+    assert read_scenario(path) == compile_scenario(scenario)
+    assert sorted(os.listdir(str(tmp_path))) == ['Tank.json', 'Tank.json.compiled.json']
+
+
+def test_compiled_network_is_reused_while_the_file_does_not_change(tmp_path):
+    scenario = tank_scenario()
+    path = str(tmp_path / 'Tank.json')
+    write_scenario(scenario, path)
+    read_scenario(path)
+
+    # The cache is plain JSON keyed by the SHA-256 hash of the scenario
+    with open(path + '.compiled.json') as cf:
+        cache = json.load(cf)
+    with open(path, 'rb') as sf:
+        assert cache['key'] == hashlib.sha256(sf.read()).hexdigest()
+
+    # A cached network is used as long as the key matches
+    cache['compiled']['parameters']['m_dot_in'] = 9.0
+    with open(path + '.compiled.json', 'w') as cf:
+        json.dump(cache, cf)
+    assert read_scenario(path)['parameters']['m_dot_in'] == 9.0
+
+    # A new content is compiled again
+    scenario['parameters']['m_dot_in'] = 0.25
+    write_scenario(scenario, path)
+    assert read_scenario(path) == compile_scenario(scenario)
+
+
+@pytest.mark.parametrize('content', [b'\x80\x04\x95 pickled data', b'{"key": 1}', b'[1, 2]'])
+def test_unreadable_cache_is_ignored(tmp_path, content):
+    scenario = tank_scenario()
+    path = str(tmp_path / 'Tank.json')
+    write_scenario(scenario, path)
+    (tmp_path / 'Tank.json.compiled.json').write_bytes(content)
+
+    assert read_scenario(path) == compile_scenario(scenario)
+
+
+def test_invalid_scenario_file_is_rejected(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('{"version": 1, "elements": [')
+
+    with pytest.raises(ValueError):
+        read_scenario(str(path))
+
+
+def test_unknown_class_is_reported():
+    scenario = tank_scenario()
+    scenario['elements'][0]['class'] = 'classValve'
+
+    with pytest.raises(ValueError, match='element tankC_1: unknown class classValve'):
+        check_scenario(scenario)
+
+
+def test_missing_parameter_is_reported():
+    scenario = tank_scenario()
+    del scenario['elements'][0]['parameters']['V']
+
+    with pytest.raises(ValueError, match='element tankC_1: missing parameter V'):
+        check_scenario(scenario)
+
+
+def test_unknown_connection_endpoint_is_reported():
+    scenario = tank_scenario()
+    scenario['connections'] = [['tankC_1', 'pipe_1'], ['pipe_1', 'pipe_9']]
+
+    with pytest.raises(ValueError, match=r"connection \['pipe_1', 'pipe_9'\]: unknown element pipe_9"):
+        check_scenario(scenario)
+
+
+def test_wrong_version_is_reported():
+    scenario = tank_scenario()
+    scenario['version'] = 2
+
+    with pytest.raises(ValueError, match='version 2, version 1 is expected'):
+        check_scenario(scenario)
+
+
+def test_every_error_is_listed():
+    scenario = tank_scenario()
+    scenario['version'] = 2
+    scenario['elements'][0]['class'] = 'classValve'
+
+    with pytest.raises(ValueError) as error:
+        check_scenario(scenario)
+
+    assert str(error.value).count('\n- ') == 2
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import os
+
+from schema_painter import compute_layout, draw_schema, draw_schema_in_background, get_network
+from simulation import classSimulation
+from test_network_graph import branched_scenario
+
+
+def branched_network(tmp_path):
+    simulation = classSimulation(branched_scenario(tmp_path), str(tmp_path / 'results'), progress=0)
+
+    return get_network(simulation)
+
+
+def test_network_of_a_branched_simulation(tmp_path):
+    network = branched_network(tmp_path)
+
+    assert network['elements'] == ['tankC', 'splitter', 'pipe', 'pipe', 'mixer', 'tankS']
+    assert network['names'] == ['tankC_1', 'splitter_1', 'pipe_1', 'pipe_2', 'mixer_1', 'tankS_1']
+    assert ('splitter_1', 'pipe_1') in network['connections']
+    assert ('tankS_1', 'tankC_1') in network['connections']
+
+
+def test_branches_are_placed_side_by_side_and_the_loop_is_closed_apart():
+    # tankC_1 -> splitter_1 -> pipe_1 / pipe_2 -> mixer_1 -> tankS_1 -> tankC_1
+    links = [(0, 1), (1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (5, 0)]
+    positions, closing = compute_layout(6, links)
+
+    assert closing == {(5, 0)}
+
+    # One column per stage, the two pipes share the column between the splitter and the mixer
+    assert positions[2][0] == positions[3][0]
+    assert positions[2][1] != positions[3][1]
+    columns = sorted({x for x, y in positions})
+    assert len(columns) == 5
+    assert len(set(positions)) == 6
+
+
+def test_schema_of_a_branched_network_is_written(tmp_path):
+    network = branched_network(tmp_path)
+
+    path = draw_schema(results_path=str(tmp_path / 'schema'), file_format='svg', **network)
+
+    assert path == os.path.join(str(tmp_path / 'schema'), 'schema.svg')
+    with open(path) as sf:
+        svg = sf.read()
+    for name in network['names']:
+        assert name in svg
+
+
+def test_schema_is_drawn_in_a_separate_process(tmp_path):
+    network = branched_network(tmp_path)
+
+    process = draw_schema_in_background(results_path=str(tmp_path / 'schema'), file_format='png', **network)
+    process.join(120)
+
+    assert process.exitcode == 0
+    assert os.path.getsize(str(tmp_path / 'schema' / 'schema.png')) > 0
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import tests_path
+from simulation import classSimulation
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+
+def load(tmp_path, **options):
+    return classSimulation(tank_path, str(tmp_path / 'results'), progress=0, **options)
+
+
+def test_run_after_run_adaptive_continues_the_time_and_the_results(tmp_path):
+    simulation = load(tmp_path)
+    time_steps = [instance.ts for instance in simulation.created_instances if hasattr(instance, 'ts')]
+
+    simulation.run_adaptive(7.3, 0.5)
+    nb_outputs = simulation.recorder.nb_steps
+    assert simulation.time == pytest.approx(7.3)
+    assert [instance.ts for instance in simulation.created_instances if hasattr(instance, 'ts')] == time_steps
+
+    results = simulation.run(2)
+    assert simulation.time == pytest.approx(7.3 + 2 * simulation.time_step)
+    assert len(results['tankC_1']['p']) == nb_outputs + 2
+    assert not np.any(np.isnan(results['tankC_1']['p']))
+
+
+def test_store_rejects_rows_of_another_time_step(tmp_path):
+    simulation = load(tmp_path, store_path=str(tmp_path / 'store'))
+    simulation.run(2)
+
+    with pytest.raises(ValueError):
+        simulation.run_adaptive(5.0, 2 * simulation.time_step)
+
+
+@pytest.mark.parametrize('store', [False, True])
+def test_resumed_run_gives_the_same_results(tmp_path, store):
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    options = {'store_path': str(tmp_path / 'store')} if store else {}
+
+    straight = load(tmp_path / 'straight', **{name: path + '_straight' for name, path in options.items()})
+    expected = {name: {channel: np.array(values) for channel, values in channels.items()}
+                for name, channels in straight.run(40).items()}
+
+    load(tmp_path, **options).run(20, checkpoint_path=checkpoint_path)
+    resumed = load(tmp_path, **options).resume(checkpoint_path)
+    results = resumed.run(20)
+
+    assert resumed.time == pytest.approx(straight.time)
+    for name, channels in expected.items():
+        for channel, values in channels.items():
+            np.testing.assert_array_equal(results[name][channel], values)
+
+
+def test_adaptive_steps_follow_the_transient_of_the_tanks(tmp_path):
+    fixed = load(tmp_path)
+    expected = fixed.run(1200)
+
+    simulation = load(tmp_path)
+    results = simulation.run_adaptive(600.0, fixed.time_step)
+    statistics = simulation.adaptive_statistics
+
+    # The explicit coupling is given back, the rejected steps are not counted by the mass/energy passes
+    assert simulation.network_solver is None
+    assert not any(getattr(instance, 'implicit_coupling', False) for instance in simulation.created_instances)
+    for element, convergence in simulation.convergence_statistics().items():
+        assert convergence['steps'] == statistics['accepted']
+
+    # Fast pressure transient at the start of the deck
+    assert 5 * (statistics['accepted'] + statistics['rejected']) < 1200
+    for name in ('tankC_1', 'tankS_1'):
+        assert np.max(np.abs(results[name]['T'] - expected[name]['T'])) < 0.2
+        np.testing.assert_allclose(results[name]['p'], expected[name]['p'], rtol=1e-2)
+
+
+def test_empty_tank_does_not_bound_the_time_step(tmp_path):
+    simulation = load(tmp_path)
+    simulation.run(1)
+    tank = simulation.created_instances[simulation.elements_with_no_extension.index('tankS_1')]
+
+    assert 0.0 < tank.max_time_step(0.05, 1.0) < float('inf')
+    tank.m = -10.0
+    assert tank.max_time_step(0.05, 1.0) == float('inf')
+
+
+def test_adaptive_steps_grow_on_a_daily_draw_off_profile(tmp_path):
+    path = tmp_path / 'Daily'
+    shutil.copytree(tank_path, path, ignore=shutil.ignore_patterns('results'))
+    (path / 'tankS_1.txt').write_text((path / 'tankS_1.txt').read_text().replace('Q_in 30000.0', 'Q_in 300.0'))
+    times = np.arange(0.0, 86401.0, 900.0)
+    draw_off = 0.05 + 0.02 * np.sin(2 * np.pi * (times / 86400 - 0.25)) + 0.01 * np.sin(2 * np.pi * times / 43200)
+    (path / 'load.csv').write_text('time,m_dot_out\n' + ''.join(f'{t:.0f},{m:.4f}\n' for t, m in zip(times, draw_off)))
+    (path / 'profiles.txt').write_text('tankS_1 set_m_dot_out load.csv m_dot_out time')
+
+    simulation = classSimulation(os.path.join(str(path), ''), str(tmp_path / 'results'), progress=0)
+    simulation.run_adaptive(7200.0, 60.0)
+    statistics = simulation.adaptive_statistics
+
+    # 14 400 fixed steps of 0.5 s
+    assert statistics['outputs'] == 120
+    assert 10 * (statistics['accepted'] + statistics['rejected']) < 7200.0 / simulation.time_step
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import gc
+import os
+import weakref
+
+import numpy as np
+
+from conftest import tests_path
+from simulation import classSimulation
+from state_arrays import add_state_fields, classStateTable, new_state
+from tank_central import classTankC
+
+tank_path = os.path.join(tests_path, 'Tank', '')
+
+
+class classElement:
+
+    def __init__(self, m):
+        self.state = new_state(self)
+        self.m = m
+
+
+add_state_fields(classElement, {'m': 0.0, 'U': 1.0})
+
+
+def test_elements_keep_their_values_when_a_table_attaches_them():
+    elements = [classElement(float(number)) for number in range(3)]
+    elements[1].U = 5.0
+
+    table = classStateTable(classElement.state_defaults, 3)
+    rows = table.attach(elements)
+
+    assert table.values.tolist() == [[0.0, 1.0], [1.0, 5.0], [2.0, 1.0]]
+    snapshot = table.snapshot(rows)
+    elements[2].m = 7.0
+    assert table.diff(rows, snapshot)[:, 0].tolist() == [0.0, 0.0, 5.0]
+    table.restore(rows, snapshot)
+    assert elements[2].m == 2.0
+
+
+def test_repeated_loads_do_not_grow_the_tables(tmp_path):
+    simulation = classSimulation(progress=0, results_path=str(tmp_path))
+    for load in range(5):
+        simulation.load(tank_path)
+        assert {name: table.nb_rows for name, (table, rows) in simulation.state_rows.items()} == \
+            {'classTankC': 1, 'classPipes': 1, 'classTankS': 1}
+    assert not hasattr(classTankC, 'state_table')
+
+
+def test_tables_are_freed_with_their_simulation(tmp_path):
+    simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+    simulation.run(2)
+    tables = [weakref.ref(table) for table, rows in simulation.state_rows.values()]
+
+    del simulation
+    gc.collect()
+    assert all(table() is None for table in tables)
+
+
+def test_verbose_load_prints_the_state_fields(tmp_path, capsys):
+    simulation = classSimulation(tank_path, str(tmp_path), verbose=True)
+    printed = capsys.readouterr().out
+
+    tank = simulation.created_instances[0]
+    assert f"'m': {tank.m}" in printed
+    assert 'classStateView' not in printed
+
+
+def test_tank_step_writes_its_row_once_per_variable(tmp_path):
+    simulation = classSimulation(tank_path, str(tmp_path), progress=0)
+    tank = simulation.created_instances[0]
+    writes = []
+
+    class classCountedValues(np.ndarray):
+
+        def __setitem__(self, key, value):
+            writes.append(key)
+            super().__setitem__(key, value)
+
+    tank.state.values = tank.state.values.view(classCountedValues)
+    tank.update(*simulation.plan.slots[0])
+
+    # m, U, T, x, p, iterations, residual, m_dot_in, m_dot_out, plus p_tankS and delta_p of the explicit coupling
+    assert len(writes) == 11
+    assert len(set(writes)) == 11
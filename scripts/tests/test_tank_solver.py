@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import os
+
+import CoolProp.CoolProp as CP
+import pytest
+
+import values_storage
+from conftest import tests_path
+from simulation import classSimulation
+from tank_solver import classTankIteration, classTankStateSolver
+
+
+def tank_state(T, Q, V=1.0):
+    # Mass and internal energy of a two-phase tank at the temperature T and the quality Q
+    DL, DG = (CP.PropsSI('D', 'T', T, 'Q', q, 'R744') for q in (0, 1))
+    UL, UG = (CP.PropsSI('U', 'T', T, 'Q', q, 'R744') for q in (0, 1))
+    m = V / ((1 - Q) / DL + Q / DG)
+    return m, m * (UL + Q * (UG - UL)), V
+
+
+@pytest.mark.parametrize('T_guess', [280.2, 260.0, 230.0, 300.0])
+def test_solve_finds_root_outside_initial_bracket(T_guess):
+    solver = classTankStateSolver(bracket=5.0)
+    T, Q, p = solver.solve(*tank_state(280.0, 0.3), T_guess)
+
+    assert T == pytest.approx(280.0, abs=1e-6)
+    assert Q == pytest.approx(0.3, abs=1e-6)
+    assert p == pytest.approx(CP.PropsSI('P', 'T', 280.0, 'Q', 0, 'R744'), rel=1e-5)
+    assert solver.get_statistics()['failures'] == 0
+
+
+def test_solve_without_root_counts_a_failure():
+    solver = classTankStateSolver()
+    solver.solve(1e-3, 1.0, 1.0, 280.0)
+
+    assert solver.get_statistics()['failures'] == 1
+
+
+def test_residual_is_scaled_by_the_tolerances():
+    iteration = classTankIteration(tolerance_m=1e-6, tolerance_U=1e-6, tolerance_T=1e-3)
+
+    assert iteration.residual(100.0, 1e7, 280.0, 100.0 - 5e-5, 1e7, 280.0) == pytest.approx(0.5)
+    assert iteration.residual(100.0, 1e7, 280.0, 100.0, 1e7, 280.0 - 2e-3) == pytest.approx(2.0)
+
+    iteration.finish(3, 0.5)
+    iteration.finish(20, 2.0)
+    assert iteration.get_statistics() == {'steps': 2, 'iterations': 23, 'not_converged': 1, 'max_residual': 2.0,
+                                          'mean_iterations': 11.5}
+
+
+def run_tank(tmp_path, monkeypatch, **parameters):
+    for name, value in parameters.items():
+        monkeypatch.setitem(values_storage.tank_iteration_parameters, name, value)
+    simulation = classSimulation(os.path.join(tests_path, 'Tank', ''), str(tmp_path), progress=0)
+    results = simulation.run(10)
+
+    return simulation.created_instances[0].iteration.get_statistics(), results['tankC_1']
+
+
+def test_passes_stop_on_the_residual(tmp_path, monkeypatch):
+    statistics, results = run_tank(tmp_path, monkeypatch)
+
+    assert statistics['not_converged'] == 0
+    assert 1 < statistics['mean_iterations'] < values_storage.tank_iteration_parameters['max_iterations']
+    assert all(results['residual'] <= 1.0)
+
+
+def test_passes_stop_at_max_iterations(tmp_path, monkeypatch):
+    statistics, results = run_tank(tmp_path, monkeypatch, tolerance_m=1e-30, tolerance_U=1e-30, tolerance_T=1e-30,
+                                   max_iterations=3)
+
+    # Tolerances under the round-off: every step runs the largest number of passes and is reported as not converged
+    assert statistics['iterations'] == 3 * statistics['steps'] == 30
+    assert statistics['not_converged'] == 10
+    assert list(results['iterations']) == [3.0] * 10
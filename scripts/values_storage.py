@@ -8,8 +8,13 @@ Jessen Page
 Florian Desmons
 """
 
-data_path ="../Tests/Tank/"
-results_path = "../Tests/Tank/results"
+import os
+
+# Scenario and results of main_reader_v2.py, relative to the repository (ROADMAP_DATA_PATH and ROADMAP_RESULTS_PATH
+# environment variables to change them without editing this file)
+data_path = os.environ.get('ROADMAP_DATA_PATH',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Tests', 'Tank'))
+results_path = os.environ.get('ROADMAP_RESULTS_PATH', os.path.join(data_path, 'results'))
 
 # List of most of the elements/instances inside the simulation
 created_instances = [] # Used in : main_reader_v2.py, main_functions.py, tank_central.py
@@ -19,20 +24,146 @@ elements_with_no_extension = [] # Used in : main_reader_v2.py, main_functions.py
 # Simulation values of m_dot, p, T and x. Changing each simulation step
 parameters = {} # Used in : main_reader_v2.py, main_functions.py
 
-# Graphics parameters
-m_dot_pipe1 = []
-m_dot_pipe2 = []
-m_dot_tank_c = []
-m_dot_tank_s = []
-p_pipe1 = []
-p_pipe2 = []
-p_tank_c = []
-p_tank_s = []
-T_pipe1 = []
-T_pipe2 = []
-T_tank1 = []
-T_tank2 = []
-x_pipe1 = []
-x_pipe2 = []
-x_tank_c = []
-x_tank_s = []
+# Saturation table used by the tank models instead of CoolProp (see saturation_table.py)
+# Set 'use_coolprop' to True to call CoolProp directly and check the accuracy of the table
+saturation_parameters = {
+    'T_min': 217.0,  # [K]
+    'T_max': 303.5,  # [K]
+    'nb_points': 1500,  # [-]
+    'use_coolprop': False,
+}
+
+# Parameters of the T(h, p) table of the exchangers (see enthalpy_table.py)
+# With enabled False, or use_coolprop True, every exchanger update calls the HP flash of CoolProp
+enthalpy_table_parameters = {
+    'enabled': True,
+    'p_min': 6e5,  # [Pa]
+    'p_max': 100e5,  # [Pa]
+    'h_min': 80e3,  # [J/kg]
+    'h_max': 600e3,  # [J/kg]
+    'nb_p': 60,  # [-]
+    'nb_h': 120,  # [-]
+    'tolerance': 0.01,  # [K] largest error of the cells interpolated by the table
+    'use_coolprop': False,
+}
+
+# Chains of pipes in series computed in one vectorized call by the execution plan (see pipe_bank.py)
+# With enabled False, every pipe is computed by its own update()
+pipe_bank_parameters = {
+    'enabled': True,
+    'min_pipes': 2,  # [-] shortest chain computed by a bank
+}
+
+# Parameters of the (m, U, V) -> (T, x, p) solver of the tank models (see tank_solver.py)
+tank_solver_parameters = {
+    'tolerance': 1e-10,  # [K] convergence tolerance on the temperature step
+    'max_iterations': 50,  # [-]
+    'bracket': 5.0,  # [K] half width of the safeguard bracket around the previous temperature
+}
+
+# Convergence of the mass/energy passes of each step of the tank models (see tank_solver.py)
+# The passes stop when the changes of m, U and T between two passes are all under their tolerance
+tank_iteration_parameters = {
+    'tolerance_m': 1e-7,  # [-] change of the mass relative to the mass
+    'tolerance_U': 1e-7,  # [-] change of the internal energy relative to the internal energy
+    'tolerance_T': 1e-4,  # [K] change of the temperature
+    'relaxation': 1.0,  # [-] relaxation factor of the m and U updates (< 1 to damp oscillating passes)
+    'max_iterations': 20,  # [-] the step is reported as not converged after this number of passes
+}
+
+# CoolProp backend used by the elements of the simulation (see fluid_properties.py)
+# e.g. 'HEOS' (reference), 'BICUBIC&HEOS' or 'TTSE&HEOS' (tabular, faster)
+property_backend = 'HEOS'
+
+# Optional cache of the CoolProp property calls (see property_cache.py)
+# Inputs are rounded on the quantization step of their variable before the lookup (0 = exact match)
+property_cache_parameters = {
+    'enabled': False,
+    'max_size': 100000,  # [-] maximum number of entries, least recently used entries are evicted first
+    'quantization': {'T': 0.0, 'P': 0.0, 'Q': 0.0, 'H': 0.0},  # [K], [Pa], [-], [J/kg]
+}
+
+# Adaptive time stepping of classSimulation.run_adaptive (see simulation.py)
+# The local error of the mass and internal energy of the tanks is kept under tolerance * (|value| + scale)
+adaptive_parameters = {
+    'tolerance': 3e-5,  # [-] relative tolerance on the local error of m and U of the tanks
+    'm_scale': 1.0,  # [kg] absolute scale of the mass error
+    'U_scale': 1e5,  # [J] absolute scale of the internal energy error
+    'dt_min': 0.01,  # [s] smallest time step (the step is accepted even above the tolerance)
+    'dt_max': 3600.0,  # [s] largest time step
+    'safety': 0.9,  # [-] factor applied to the time step given by the error estimate
+    'max_growth': 2.0,  # [-] largest growth of the time step between two steps
+    'min_shrink': 0.2,  # [-] largest reduction of the time step after a rejected step
+    'max_mass_change': 0.05,  # [-] largest change of the mass of a tank over one step, relative to its mass
+    'implicit': True,  # couple the tanks with the implicit network solver (the explicit coupling needs short steps)
+}
+
+# Implicit coupling of the central and substation tanks (see network_solver.py)
+# With implicit False, the central tanks use the pressure of the substation tank of the previous step
+network_solver_parameters = {
+    'implicit': False,
+    'tolerance': 1.0,  # [Pa] residual of the pressure difference of each central tank
+    'max_iterations': 20,  # [-] Newton iterations of one step
+    'perturbation': 1.0,  # [Pa] step of the finite-difference Jacobian
+}
+
+# Checkpoints of classSimulation.run (see checkpoint.py)
+checkpoint_parameters = {
+    'interval': 300.0,  # [s] wall time between two checkpoints
+}
+
+# Scenario files (see scenario.py)
+# With cache True, the compiled network of a scenario file is kept as JSON in <scenario>.compiled.json and reused
+# while the file does not change
+scenario_parameters = {
+    'cache': True,
+}
+
+# Command line entry point (see roadmap.py)
+cli_parameters = {
+    'nb_steps': 50,  # [-] default number of time steps of python -m roadmap run
+    'import_budget': 0.5,  # [s] import time of a batch worker, all modules counted (python -m roadmap importtime)
+}
+
+# Instrumentation of the runs (see instrumentation.py)
+instrumentation_parameters = {
+    'trace': True,  # keep every timed call for the Chrome trace-event file
+    'max_events': 1000000,  # [-] timed calls kept for the trace file
+    'methods': ['update', 'state_change', 'solve_state', 'findMassFlowRate', 'compute_fd_colebrook_white',
+                'compute_output_pipe', 'mix', 'split', 'solve', 'friction_factor'],  # methods timed
+    'progress_level': 0,  # [-] 0 silent, 1 progress line, 2 progress and outputs, 3 outputs of every step
+    'progress_interval': 2.0,  # [s] wall time between two progress reports (levels 1 and 2)
+}
+
+# Schema of the network (see schema_painter.py)
+schema_parameters = {
+    'format': 'png',  # png or svg
+    'dpi': 100,  # [-] resolution of the png files
+    'cell_size': 1.0,  # [in] distance between two neighbour elements
+    'max_size': 40.0,  # [in] largest side of the figure, the cells are smaller on large networks
+    'icon_size': 0.7,  # [-] size of an icon compared with a cell
+    'head_size': 0.15,  # [-] length of an arrow head compared with a cell
+    'line_width': 1.0,  # [pt] width of the connections
+    'arrow_color': 'black',
+    'icon_limit': 300,  # [-] above this number of elements, the elements are drawn as markers
+    'label_limit': 200,  # [-] above this number of elements, the names of the elements are not written
+    'background': True,  # draw the schema in a separate process during the run
+}
+
+# Plots of the results (see result_plot.py)
+plot_parameters = {
+    'nb_points': 4000,  # [-] points per channel written in the HTML file
+    'method': 'minmax',  # minmax (minimum and maximum of every bucket of steps) or lttb
+    'channels': {'m_dot': (1.0, 0.0), 'p': (1e-5, 0.0), 'T': (1.0, -273.15), 'x': (1.0, 0.0)},  # factor, offset
+}
+
+# Benchmark suite (see benchmark.py)
+benchmark_parameters = {
+    'sizes': [10, 100, 1000, 10000],  # [-] number of elements of the generated networks
+    'nb_steps': 200,  # [-] time steps of the runs of the Tests/ scenarios
+    'network_steps': 10,  # [-] time steps of the runs of the generated networks
+    'nb_calls': 1000,  # [-] calls of each micro-benchmark
+    'repeat': 3,  # [-] series of calls of each micro-benchmark, the best one is kept
+    'time_tolerance': 0.2,  # [-] slowdown compared with the baseline reported as a regression
+    'drift_tolerance': 1e-9,  # [-] relative drift of the trajectories reported as a regression
+}